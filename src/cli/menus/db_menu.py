@@ -77,10 +77,9 @@ def _display_db_info(cli_instance: 'ScraperCLI') -> None:
                     print(f"\n{Fore.CYAN}Database {db_name.upper()}:{Style.RESET_ALL}")
                     print(f"  Dimensione: {size:.2f} MB")
                     print(f"  Tabelle ({len(tables)}):")
+                    row_counts = cli_instance.db_manager.get_table_row_counts(db_name, tables)
                     for table in tables:
-                        row_count = cli_instance.db_manager.fetch_one(f"SELECT COUNT(*) as count FROM {table}", db_name=db_name)
-                        count = row_count['count'] if row_count else 0
-                        print(f"    - {table} ({count} righe)")
+                        print(f"    - {table} ({row_counts.get(table, 0)} righe)")
                 except Exception as e:
                     print(f"{Fore.RED}Errore lettura info {db_name}: {e}{Style.RESET_ALL}")
             input(f"\n{Fore.CYAN}Premi INVIO per continuare...{Style.RESET_ALL}")
@@ -105,10 +104,9 @@ def _display_db_info(cli_instance: 'ScraperCLI') -> None:
                 print(f"\n{Fore.CYAN}Database {db_name.upper()}:{Style.RESET_ALL}")
                 print(f"  Dimensione: {size:.2f} MB")
                 print(f"  Tabelle ({len(tables)}):")
+                row_counts = cli_instance.db_manager.get_table_row_counts(db_name, tables)
                 for table in tables:
-                    row_count = cli_instance.db_manager.fetch_one(f"SELECT COUNT(*) as count FROM {table}", db_name=db_name)
-                    count = row_count['count'] if row_count else 0
-                    print(f"    - {table} ({count} righe)")
+                    print(f"    - {table} ({row_counts.get(table, 0)} righe)")
             except Exception as e:
                 print(f"{Fore.RED}Errore lettura info {db_name}: {e}{Style.RESET_ALL}")
             input(f"\n{Fore.CYAN}Premi INVIO per continuare...{Style.RESET_ALL}")
@@ -184,10 +182,9 @@ def _clear_specific_table(cli_instance: 'ScraperCLI') -> None:
                     tables = cli_instance.db_manager.get_all_table_names(db_name)
                     if tables:
                         print(f"\n{Fore.CYAN}Database {db_name.upper()}:{Style.RESET_ALL}")
+                        row_counts = cli_instance.db_manager.get_table_row_counts(db_name, tables)
                         for table in tables:
-                            row_count = cli_instance.db_manager.fetch_one(f"SELECT COUNT(*) as count FROM {table}", db_name=db_name)
-                            count = row_count['count'] if row_count else 0
-                            print(f"  - {table} ({count} righe)")
+                            print(f"  - {table} ({row_counts.get(table, 0)} righe)")
                 except Exception as e:
                     print(f"{Fore.RED}Errore lettura tabelle {db_name}: {e}{Style.RESET_ALL}")
 
@@ -236,10 +233,9 @@ def _clear_specific_table(cli_instance: 'ScraperCLI') -> None:
                 
                 print(f"\n{Fore.RED}⚠️ ATTENZIONE: Stai per eliminare tutti i dati da {db_name}!{Style.RESET_ALL}")
                 print(f"\n{Fore.CYAN}Tabelle che verranno svuotate:{Style.RESET_ALL}")
+                row_counts = cli_instance.db_manager.get_table_row_counts(db_name, tables)
                 for table in tables:
-                    row_count = cli_instance.db_manager.fetch_one(f"SELECT COUNT(*) as count FROM {table}", db_name=db_name)
-                    count = row_count['count'] if row_count else 0
-                    print(f"  - {table} ({count} righe)")
+                    print(f"  - {table} ({row_counts.get(table, 0)} righe)")
                 
                 confirm = prompt_for_input(f"\n{Fore.RED}⚠️ Confermi di voler eliminare TUTTI i dati da {db_name}? (s/N): ").strip().lower()
                 
@@ -283,10 +279,9 @@ def _clear_specific_table(cli_instance: 'ScraperCLI') -> None:
                     continue
                     
                 print(f"\n{Fore.CYAN}Tabelle disponibili in {db_name}:{Style.RESET_ALL}")
+                row_counts = cli_instance.db_manager.get_table_row_counts(db_name, tables)
                 for i, table in enumerate(tables, 1):
-                    row_count = cli_instance.db_manager.fetch_one(f"SELECT COUNT(*) as count FROM {table}", db_name=db_name)
-                    count = row_count['count'] if row_count else 0
-                    print(f"{i}. {table} ({count} righe)")
+                    print(f"{i}. {table} ({row_counts.get(table, 0)} righe)")
                 
                 table_choice = prompt_for_input("\nSeleziona numero tabella (0 per annullare): ").strip()
                 
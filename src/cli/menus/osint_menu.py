@@ -3,7 +3,7 @@ OSINT menu module for the Browsint CLI application.
 """
 from colorama import Fore, Style
 from typing import TYPE_CHECKING
-from ..utils import clear_screen, prompt_for_input, export_menu, json_serial
+from ..utils import clear_screen, prompt_for_input, confirm_action, export_menu, json_serial
 import json
 import validators
 from datetime import datetime
@@ -18,6 +18,12 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger("browsint.cli")
 
+def _ask_shodan_consent(cli_instance: 'ScraperCLI', target: str) -> bool:
+    '''Chiede prima della scansione se eseguire Shodan (solo se la API key è configurata).'''
+    if not cli_instance.osint_extractor.api_keys.get("shodan"):
+        return False
+    return confirm_action(f"Vuoi eseguire la scansione Shodan per {target}?", default_yes=False)
+
 def display_osint_menu() -> str:
     '''Visualizza il menu OSINT e restituisce la scelta dell'utente.'''
     #clear_screen()
@@ -100,11 +106,11 @@ def profile_domain_cli(cli_instance: 'ScraperCLI'):
         print(f"{Fore.RED}✗ Il dominio / url non può essere vuoto{Style.RESET_ALL}")
         return
 
-    print(f"{Fore.YELLOW}⏳ Raccolta dati OSINT per {domain}...{Style.RESET_ALL}")
-
     try:
         try:
-            profile = cli_instance.osint_extractor.profile_domain(domain)
+            run_shodan = _ask_shodan_consent(cli_instance, domain)
+            print(f"{Fore.YELLOW}⏳ Raccolta dati OSINT per {domain}...{Style.RESET_ALL}")
+            profile = cli_instance.osint_extractor.profile_domain(domain, run_shodan=run_shodan)
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}Operazione annullata dall'utente.{Style.RESET_ALL}")
             return
@@ -309,7 +315,8 @@ def anlyze_existing_profile_cli(cli_instance: 'ScraperCLI'):
             # Prendo il dominio associato al profilo
             domain = entity.get('domain')
             print(f"{Fore.YELLOW}Rieseguendo scansione sottodomini per {domain}...{Style.RESET_ALL}")
-            cli_instance.osint_extractor.profile_domain(domain, force_recheck=True)
+            run_shodan = _ask_shodan_consent(cli_instance, domain)
+            cli_instance.osint_extractor.profile_domain(domain, force_recheck=True, run_shodan=run_shodan)
             print(f"{Fore.YELLOW}Check sottodomini completato. Visualizza il profilo aggiornato per vedere i cambiamenti.{Style.RESET_ALL}")
         else:
             print(f"{Fore.YELLOW}⚠ Il profilo non ha un dominio associato per rieseguire il check sottodomini.{Style.RESET_ALL}")
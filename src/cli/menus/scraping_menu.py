@@ -15,6 +15,7 @@ from tabulate import tabulate
 from scraper.utils.formatters import format_page_analysis_report, generate_html_report, create_pdf_page_report, text_report_to_html, formal_html_report_page
 from scraper.utils.extractors import extract_emails, extract_phone_numbers
 from scraper.utils.web_analysis import detect_technologies
+from scraper.utils.clients import submit_lookup
 
 if TYPE_CHECKING:
     from ..scraper_cli import ScraperCLI
@@ -81,20 +82,24 @@ def analyze_page_structure(cli_instance: 'ScraperCLI') -> None:
             print(f"{Fore.RED}✗ Errore decodifica contenuto per {url}: {e_decode}")
             return
 
+        run_osint = hasattr(cli_instance, 'osint_extractor') and cli_instance.osint_extractor # hasattr per verificare se l'OSINT Extractor è disponibile
+        domain_for_tech = urlparse(url).netloc
+        # Il rilevamento tecnologie fa una sua richiesta di rete: parte subito e procede mentre qui si fa il parsing
+        tech_future = submit_lookup(detect_technologies, domain_for_tech, logger) if run_osint and domain_for_tech else None
+
         parsed_data = cli_instance.web_parser.parse(content, url) # parsing del contenuto HTML
 
         # Prepare OSINT data
         osint_data = {}
-        if hasattr(cli_instance, 'osint_extractor') and cli_instance.osint_extractor: # hasattr per verificare se l'OSINT Extractor è disponibile
+        if run_osint:
             try:
                 page_emails = extract_emails(content) 
                 page_phones = extract_phone_numbers(content)
                 osint_data["emails"] = page_emails
                 osint_data["phone_numbers"] = page_phones
 
-                domain_for_tech = urlparse(url).netloc
-                if domain_for_tech:
-                    tech_data = detect_technologies(domain_for_tech, logger)
+                if tech_future is not None:
+                    tech_data = tech_future.result()
                     if tech_data and not tech_data.get("error"):
                         osint_data["page_technologies"] = tech_data
 
@@ -509,6 +509,30 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Errore recupero tabelle da {db_name}: {e}")
             return []
+
+    def get_table_row_counts(self, db_name: str, tables: list[str] | None = None) -> dict[str, int]:
+        '''
+        Funzione: get_table_row_counts
+        Conta le righe di tutte le tabelle del database con un'unica query (SELECT COUNT(*) uniti da UNION ALL).
+
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str db_name -> Nome del database
+            list[str] | None tables -> Tabelle da contare, già ottenute da get_all_table_names; se None vengono recuperate
+
+        Valore di ritorno:
+            dict[str, int] -> Mappa tabella -> numero di righe, nell'ordine di tables (0 in caso di errore)
+        '''
+        if tables is None:
+            tables = self.get_all_table_names(db_name)
+        if not tables:
+            return {}
+        # I nomi arrivano da sqlite_master: vengono comunque quotati come identificatori (virgolette raddoppiate)
+        query = " UNION ALL ".join(
+            'SELECT ? AS name, COUNT(*) AS count FROM "{}"'.format(table.replace('"', '""')) for table in tables
+        )
+        counts = {row["name"]: row["count"] for row in self.fetch_all(query, tuple(tables), db_name)}
+        return {table: counts.get(table, 0) for table in tables}
         
     def backup_database(self, db_name: str) -> tuple[bool, str]:
         '''
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+from .fetcher import FetchResponse, WebFetcher
+
+logger = logging.getLogger("scraper.async_fetcher")
+
+
+class AsyncWebFetcher:
+    '''
+    Funzione: AsyncWebFetcher
+    Recupera in parallelo più URL sopra un WebFetcher, limitando la concorrenza e serializzando le richieste verso lo stesso host.
+    Parametri formali:
+        self -> Riferimento all'istanza della classe
+        WebFetcher | None fetcher -> Fetcher sincrono da riutilizzare (sessione, cache, retry e politeness)
+        str | None cache_dir -> Directory cache per il fetcher creato internamente se fetcher è None
+        str | None user_agent -> User-Agent per il fetcher creato internamente
+    Valore di ritorno:
+        None -> Il costruttore non restituisce un valore esplicito
+    '''
+
+    def __init__(self, fetcher: WebFetcher | None = None, cache_dir: str | None = None, user_agent: str | None = None):
+        self._owns_fetcher = fetcher is None # un fetcher passato dal chiamante resta suo da chiudere
+        self.fetcher = fetcher or WebFetcher(cache_dir=cache_dir, user_agent=user_agent)
+        self.headers = self.fetcher.headers
+        self._host_locks: dict[str, asyncio.Lock] = {}
+
+    async def _one(self, url: str, sem: asyncio.Semaphore, timeout: int, retries: int) -> FetchResponse | None:
+        '''
+        Funzione: _one
+        Scarica un singolo URL rispettando il semaforo globale e il lock per host.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str url -> L'URL da scaricare
+            asyncio.Semaphore sem -> Semaforo che limita le richieste contemporanee
+            int timeout -> Timeout della richiesta in secondi
+            int retries -> Numero di tentativi in caso di errore
+        Valore di ritorno:
+            FetchResponse | None -> La risposta completa o None in caso di fallimento
+        '''
+        host = urlparse(url).netloc
+        lock = self._host_locks.setdefault(host, asyncio.Lock()) # un host alla volta per la politeness
+        async with lock:
+            # L'attesa di politeness avviene nel loop senza occupare uno slot del semaforo
+            delay = self.fetcher.next_allowed_time(url) - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with sem:
+                try:
+                    # requests è bloccante: la richiesta gira in un thread, il loop resta libero per gli altri host
+                    return await asyncio.to_thread(self.fetcher.fetch_full_response, url, False, timeout, retries)
+                except Exception as e:
+                    logger.warning(f"Errore durante il download asincrono di {url}: {e}")
+                    return None
+
+    async def fetch_many(self, urls: list[str], concurrency: int = 20, timeout: int = 30, retries: int = 3) -> dict[str, FetchResponse | None]:
+        '''
+        Funzione: fetch_many
+        Scarica una lista di URL in parallelo.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            list[str] urls -> Gli URL da scaricare
+            int concurrency -> Numero massimo di richieste contemporanee
+            int timeout -> Timeout di ogni richiesta in secondi
+            int retries -> Numero di tentativi per URL
+        Valore di ritorno:
+            dict[str, FetchResponse | None] -> Mappa URL -> risposta (None per gli URL falliti)
+        '''
+        unique_urls = list(dict.fromkeys(urls))
+        sem = asyncio.Semaphore(concurrency)
+        responses = await asyncio.gather(*(self._one(u, sem, timeout, retries) for u in unique_urls))
+        return dict(zip(unique_urls, responses))
+
+    def fetch(self, urls: list[str], concurrency: int = 20, timeout: int = 30, retries: int = 3) -> dict[str, FetchResponse | None]:
+        '''
+        Funzione: fetch
+        Wrapper sincrono di fetch_many per i chiamanti non asincroni.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            list[str] urls -> Gli URL da scaricare
+            int concurrency -> Numero massimo di richieste contemporanee
+            int timeout -> Timeout di ogni richiesta in secondi
+            int retries -> Numero di tentativi per URL
+        Valore di ritorno:
+            dict[str, FetchResponse | None] -> Mappa URL -> risposta (None per gli URL falliti)
+        '''
+        return asyncio.run(self.fetch_many(urls, concurrency, timeout, retries))
+
+    def close(self) -> None:
+        '''
+        Funzione: close
+        Chiude il fetcher sottostante, solo se è stato creato da questa istanza.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        if self._owns_fetcher:
+            self.fetcher.close()
@@ -10,8 +10,9 @@ from scraper.parser import WebParser
 from scraper.utils.robots_parser import RobotsParser, RobotsData
 from db.manager import DatabaseManager
 from pathlib import Path
-from scraper.utils.extractors import extract_emails, extract_phone_numbers, filter_phone_numbers, filter_emails
-from scraper.utils.web_analysis import detect_framework, detect_js_libraries, detect_analytics
+from scraper.utils.extractors import extract_emails, extract_phone_numbers, filter_phone_numbers, filter_emails, region_for_domain
+from scraper.utils.web_analysis import PageSignals, detect_framework, detect_js_libraries, detect_analytics, scan_page
+from scraper.utils.osint_sources import find_brand_social_profiles
 import json
 
 
@@ -431,7 +432,7 @@ class Crawler:
         if not self.respect_robots or not self.robots_data:
             return True
             
-        return self.robots_parser.is_allowed(url, self.robots_data.rules)
+        return self.robots_parser.is_allowed(url, self.robots_data.sorted_rules)
 
     def start_crawl(self, start_url: str, depth_limit: int = 2, politeness_delay: float = 1.0, perform_osint_on_pages: bool = False, save_to_disk: bool = True) -> dict:
         '''
@@ -595,7 +596,7 @@ class Crawler:
 
                 try:
                     page_emails = extract_emails(page_content_text)
-                    page_phones = extract_phone_numbers(page_content_text)
+                    page_phones = extract_phone_numbers(page_content_text, region_for_domain(self.base_domain))
                     filtered_emails = filter_emails(page_emails, self.base_domain, logger)
                     filtered_phones = filter_phone_numbers(page_phones)
 
@@ -624,10 +625,11 @@ class Crawler:
                     # Detect technologies
                     page_tech = {}
                     soup_from_parser = BeautifulSoup(page_content_text, 'html.parser')
+                    page_signals: PageSignals = scan_page(soup_from_parser, page_content_text)
 
-                    tech_frameworks = detect_framework(soup_from_parser, page_response.headers, page_content_text, current_url)
-                    tech_js = detect_js_libraries(soup_from_parser, page_content_text)
-                    tech_analytics = detect_analytics(page_content_text)
+                    tech_frameworks = detect_framework(soup_from_parser, page_response.headers, page_content_text, current_url, page_signals)
+                    tech_js = detect_js_libraries(soup_from_parser, page_content_text, page_signals)
+                    tech_analytics = detect_analytics(page_content_text, page_signals)
 
                     if tech_frameworks and tech_frameworks != "Unknown" and tech_frameworks != []: page_tech["framework_cms"] = tech_frameworks
                     if tech_js: page_tech["js_libraries"] = tech_js
@@ -642,8 +644,6 @@ class Crawler:
         if perform_osint_on_pages:
             # Cerca profili social per il dominio/brand alla fine del crawling
             try:
-                from scraper.utils.osint_sources import find_brand_social_profiles
-                
                 # Pulizia del nome del dominio per la ricerca social
                 clean_brand = self.base_domain.lower()
                 clean_brand = clean_brand.replace('www.', '')
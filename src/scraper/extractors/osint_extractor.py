@@ -1,6 +1,9 @@
 from datetime import datetime
+from itertools import islice
+import ipaddress
 import json
 import logging
+import os
 from pathlib import Path
 import re
 from typing import Any, Dict, List, Optional, Set, cast
@@ -13,9 +16,9 @@ from db.manager import DatabaseManager
 from scraper.fetcher import WebFetcher
 from scraper.parser import WebParser
 
-from ..utils.data_processing import standardize_for_json, extract_structured_fields
+from ..utils.data_processing import standardize_for_json, extract_structured_fields, dumps_json, loads_json
 from ..utils.validators import validate_domain
-from ..utils.extractors import extract_emails, filter_emails,  extract_phone_numbers, filter_phone_numbers
+from ..utils.extractors import extract_emails_iter, filter_emails,  extract_phone_numbers, filter_phone_numbers
 from ..utils.clients import fetch_dns_records, fetch_hunterio, fetch_whois, fetch_shodan, check_email_breaches
 from ..utils.osint_sources import (
     fetch_domain_osint,
@@ -29,6 +32,21 @@ from urllib.parse import urlparse
 
 logger = logging.getLogger("osint.extractor")
 
+# Soglie (limite superiore incluso) -> etichetta colorata per i livelli di rischio/impronta
+_EMAIL_RISK_LEVELS = (
+    (0, f"{Fore.YELLOW}LOW{Style.RESET_ALL}"),
+    (2, f"{Fore.YELLOW}MEDIUM{Style.RESET_ALL}"),
+    (5, f"{Fore.RED}HIGH{Style.RESET_ALL}"),
+    (float("inf"), f"{Fore.RED}CRITICAL{Style.RESET_ALL}"),
+)
+_SOCIAL_FOOTPRINT_LEVELS = (
+    (0, f"{Fore.YELLOW}Minimal{Style.RESET_ALL}"),
+    (3, f"{Fore.YELLOW}Low{Style.RESET_ALL}"),
+    (7, f"{Fore.YELLOW}Moderate{Style.RESET_ALL}"),
+    (12, f"{Fore.RED}High{Style.RESET_ALL}"),
+    (float("inf"), f"{Fore.RED}Extensive{Style.RESET_ALL}"),
+)
+
 
 class OSINTExtractor:
     '''
@@ -53,7 +71,7 @@ class OSINTExtractor:
         self.dirs = dirs or {}
 
 # GESTIONE DI OGNI OGGETTO ANALIZZATO
-    def entity(self, target: str, entity_type: str) -> dict[str, Any]:
+    def entity(self, target: str, entity_type: str, run_shodan: bool = False) -> dict[str, Any]:
        '''
        Funzione: entity
        Coordina l'estrazione dei dati OSINT per una specifica entità (dominio, email, username) da tutte le fonti configurate.
@@ -61,6 +79,7 @@ class OSINTExtractor:
            self -> Riferimento all'istanza della classe
            str target -> L'identificativo dell'entità da analizzare
            str entity_type -> Il tipo di entità (dominio, email, username)
+           bool run_shodan -> True se l'utente ha acconsentito alla scansione Shodan (solo domini)
        Valore di ritorno:
            dict[str, Any] -> I risultati dell'analisi OSINT per l'entità specificata
        '''
@@ -73,7 +92,7 @@ class OSINTExtractor:
 
        if entity_type == "domain":
            self.logger.debug(f"Processing domain data for {target}")
-           data_to_save = fetch_domain_osint(target, api_keys=self.api_keys, logger=self.logger) # scansione dominio
+           data_to_save = fetch_domain_osint(target, api_keys=self.api_keys, logger=self.logger, run_shodan=run_shodan) # scansione dominio
            source_type_for_saving = "domain"
        elif entity_type == "email":
            self.logger.debug(f"Processing email data for {target}")
@@ -168,7 +187,6 @@ class OSINTExtractor:
 
         # Verifica se l'input è un IP
         try:
-            import ipaddress
             is_ip = bool(ipaddress.ip_address(target))
         except ValueError:
             is_ip = False
@@ -278,8 +296,8 @@ class OSINTExtractor:
                 (
                     entity_id,
                     source,
-                    json.dumps(data_standardized),
-                    json.dumps(structured_fields),
+                    dumps_json(data_standardized),
+                    dumps_json(structured_fields),
                 ),
             )
         self.logger.debug(f"OSINT profile saved for entity ID {entity_id}, source {source}.")
@@ -318,11 +336,11 @@ class OSINTExtractor:
 
                         # use centralized extractors for robustness
                         try:
-                            emails_found.update(extract_emails(v))
+                            emails_found.update(extract_emails_iter(v))
                         except Exception:
                             # fallback to central extractor again (best-effort)
                             try:
-                                emails_found.update(extract_emails(v))
+                                emails_found.update(extract_emails_iter(v))
                             except Exception:
                                 pass
 
@@ -340,10 +358,10 @@ class OSINTExtractor:
                     find_contacts_recursive(i)
             elif isinstance(item, str):
                 try:
-                    emails_found.update(extract_emails(item))
+                    emails_found.update(extract_emails_iter(item))
                 except Exception:
                     try:
-                        emails_found.update(extract_emails(item))
+                        emails_found.update(extract_emails_iter(item))
                     except Exception:
                         pass
                 try:
@@ -447,8 +465,8 @@ class OSINTExtractor:
             for p_row in profiles_rows:
                 source = p_row["source"]
                 try:
-                    extracted = json.loads(p_row["extracted_fields"]) if p_row.get("extracted_fields") else {} # struttura i campi estratti
-                    raw = json.loads(p_row.get("raw_data")) if p_row.get("raw_data") else {} # struttura i dati grezzi
+                    extracted = loads_json(p_row["extracted_fields"]) if p_row.get("extracted_fields") else {} # struttura i campi estratti
+                    raw = loads_json(p_row.get("raw_data")) if p_row.get("raw_data") else {} # struttura i dati grezzi
                     profiles_data[source] = {
                         "extracted": extracted,
                         "raw": raw,
@@ -571,12 +589,13 @@ class OSINTExtractor:
         self.logger.debug(f"Attempting to retrieve full profile for entity ID: '{entity_id}'")
         return self._build_full_profile(entity_id) # chiama il metodo per costruire il profilo completo
 
-    def profile_domain(self, domain: str, force_recheck: bool = False) -> dict[str, Any]:
+    def profile_domain(self, domain: str, force_recheck: bool = False, run_shodan: bool = False) -> dict[str, Any]:
         '''
         Avvia il processo di profilazione OSINT per un dominio web.
         Valida l'input e delega al metodo entity.
         Args:
             domain: Il dominio da profilare
+            run_shodan: True se l'utente ha acconsentito alla scansione Shodan
         Returns:
             Il profilo OSINT completo per il dominio, o un dizionario di errore.
         '''
@@ -592,7 +611,7 @@ class OSINTExtractor:
 
         self.logger.info(f"Profiling clean domain: {clean_domain}")
         # Chiama il metodo entity per gestire il flusso di lavoro 
-        return self.entity(clean_domain, "domain")
+        return self.entity(clean_domain, "domain", run_shodan=run_shodan)
 
     # Metodo pubblico chiamato dalla CLI per profilare un indirizzo email
     def profile_email(self, email: str) -> dict[str, Any]:
@@ -615,7 +634,6 @@ class OSINTExtractor:
         email = email.strip()
         
         # Basic email validation with regex
-        import re
         email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         if not re.match(email_pattern, email):
             self.logger.warning(f"Email format validation failed for: {email}")
@@ -716,29 +734,33 @@ class OSINTExtractor:
         
         # Have I Been Pwned data
         hibp_data = email_data.get("hibp", {})
-        if hibp_data and not hibp_data.get("error"):
+        hibp_ok = bool(hibp_data) and not hibp_data.get("error")
+        breaches_list = (hibp_data.get("breaches") or []) if hibp_ok else []
+        pastes_list = (hibp_data.get("pastes") or []) if hibp_ok else []
+        breach_count = len(breaches_list)
+        paste_count = len(pastes_list)
+
+        if hibp_ok:
             print(f"\n{Fore.RED}[HAVE I BEEN PWNED - BREACH DATA]{Style.RESET_ALL}")
             
-            breaches = hibp_data.get("breaches", [])
-            if breaches:
-                print(f"  Found in {len(breaches)} data breach(es):")
-                for breach in breaches[:5]:  # Show first 5 breaches
+            if breaches_list:
+                print(f"  Found in {breach_count} data breach(es):")
+                for breach in islice(breaches_list, 5):  # Show first 5 breaches
                     print(f"    • {breach.get('Name', 'Unknown')}")
                     print(f"      Date: {breach.get('BreachDate', 'Unknown')}")
                     print(f"      Accounts: {breach.get('PwnCount', 'Unknown'):,}")
                     print(f"      Data: {', '.join(breach.get('DataClasses', []))}")
                     print()
                 
-                if len(breaches) > 5:
-                    print(f"    ... and {len(breaches) - 5} more breaches")
+                if breach_count > 5:
+                    print(f"    ... and {breach_count - 5} more breaches")
             else:
                 print(f"  {Fore.YELLOW}✓ No breaches found{Style.RESET_ALL}")
             
             # Paste data
-            pastes = hibp_data.get("pastes", [])
-            if pastes:
-                print(f"\n  {Fore.YELLOW}Found in {len(pastes)} paste(s):{Style.RESET_ALL}")
-                for paste in pastes[:3]:  # Show first 3 pastes
+            if pastes_list:
+                print(f"\n  {Fore.YELLOW}Found in {paste_count} paste(s):{Style.RESET_ALL}")
+                for paste in islice(pastes_list, 3):  # Show first 3 pastes
                     print(f"    • Source: {paste.get('Source', 'Unknown')}")
                     print(f"      Date: {paste.get('Date', 'Unknown')}")
                     print(f"      Title: {paste.get('Title', 'No title')}")
@@ -763,7 +785,6 @@ class OSINTExtractor:
                 print(f"  Provider Type: {Fore.YELLOW}Custom/Corporate Domain{Style.RESET_ALL}")
             
             # Basic format validation
-            import re
             if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
                 print(f"  Format: {Fore.GREEN}Valid{Style.RESET_ALL}")
             else:
@@ -780,19 +801,16 @@ class OSINTExtractor:
             
             if emails:
                 print(f"  Emails found: {len(emails)}")
-                for contact in emails[:5]:
+                for contact in islice(emails, 5):
                     print(f"    • {contact.get('value', 'N/A')} (from: {contact.get('source', 'Unknown')})")
             
             if phones:
                 print(f"  Phone numbers: {len(phones)}")
-                for contact in phones[:5]:
+                for contact in islice(phones, 5):
                     print(f"    • {contact.get('value', 'N/A')} (from: {contact.get('source', 'Unknown')})")
         
         # Enhanced Summary
         print(f"\n{Fore.CYAN}[SUMMARY]{Style.RESET_ALL}")
-        breach_count = len(hibp_data.get("breaches", [])) if hibp_data and not hibp_data.get("error") else 0
-        paste_count = len(hibp_data.get("pastes", [])) if hibp_data and not hibp_data.get("error") else 0
-        
         print(f"  Email: {email}")
         
         # Enhanced verification status
@@ -825,8 +843,9 @@ class OSINTExtractor:
         
         # Social platform results
         platforms = social_data.get("platforms", {})
+        found_platforms = []
+        n_found = 0
         if platforms:
-            found_platforms = []
             not_found_platforms = []
             error_platforms = []
             
@@ -838,10 +857,15 @@ class OSINTExtractor:
                         error_platforms.append((platform, data))
                     else:
                         not_found_platforms.append(platform)
+
+            n_total = len(platforms)
+            n_found = len(found_platforms)
+            n_not_found = len(not_found_platforms)
+            n_err = len(error_platforms)
             
             # Found profiles
             if found_platforms:
-                print(f"\n{Fore.YELLOW}[FOUND PROFILES] ({len(found_platforms)} platforms){Style.RESET_ALL}")
+                print(f"\n{Fore.YELLOW}[FOUND PROFILES] ({n_found} platforms){Style.RESET_ALL}")
                 for platform, data in found_platforms:
                     print(f"  ✓ {platform.upper()}")
                     print(f"    URL: {data.get('url', 'N/A')}")
@@ -854,15 +878,14 @@ class OSINTExtractor:
             
             # Statistics
             print(f"\n{Fore.CYAN}[STATISTICS]{Style.RESET_ALL}")
-            print(f"  Total Platforms Checked: {len(platforms)}")
-            print(f"  ✓ Found: {Fore.YELLOW}{len(found_platforms)}{Style.RESET_ALL}")
-            print(f"  ✗ Not Found: {Fore.YELLOW}{len(not_found_platforms)}{Style.RESET_ALL}")
-            print(f"  ⚠ Errors: {Fore.RED}{len(error_platforms)}{Style.RESET_ALL}")
+            print(f"  Total Platforms Checked: {n_total}")
+            print(f"  ✓ Found: {Fore.YELLOW}{n_found}{Style.RESET_ALL}")
+            print(f"  ✗ Not Found: {Fore.YELLOW}{n_not_found}{Style.RESET_ALL}")
+            print(f"  ⚠ Errors: {Fore.RED}{n_err}{Style.RESET_ALL}")
             
-            # Coverage percentage
-            if len(platforms) > 0:
-                coverage = (len(found_platforms) / len(platforms)) * 100
-                print(f"  Coverage: {coverage:.1f}%")
+            # Coverage percentage (platforms non vuoto in questo ramo)
+            coverage = (n_found / n_total) * 100
+            print(f"  Coverage: {coverage:.1f}%")
             
             # Platform breakdown by category
             social_platforms = []
@@ -895,7 +918,7 @@ class OSINTExtractor:
             # Errors summary
             if error_platforms:
                 print(f"\n{Fore.RED}[ERRORS ENCOUNTERED]{Style.RESET_ALL}")
-                for platform, data in error_platforms[:5]:  # Show first 5 errors
+                for platform, data in islice(error_platforms, 5):  # Show first 5 errors
                     print(f"  ⚠ {platform}: {data.get('error', 'Unknown error')}")
         
         # Additional analysis
@@ -912,8 +935,8 @@ class OSINTExtractor:
         # Summary
         print(f"\n{Fore.CYAN}[SUMMARY]{Style.RESET_ALL}")
         print(f"  Username: {username}")
-        print(f"  Active Profiles: {len(found_platforms) if found_platforms else 0}")
-        print(f"  Digital Footprint: {self._assess_social_footprint(len(found_platforms) if found_platforms else 0)}")
+        print(f"  Active Profiles: {n_found}")
+        print(f"  Digital Footprint: {self._assess_social_footprint(n_found)}")
         
         # Recommendations
         if found_platforms:
@@ -934,15 +957,7 @@ class OSINTExtractor:
             str -> Livello di rischio colorato per la visualizzazione
         '''
         total_exposures = breach_count + paste_count
-        
-        if total_exposures == 0:
-            return f"{Fore.YELLOW}LOW{Style.RESET_ALL}"
-        elif total_exposures <= 2:
-            return f"{Fore.YELLOW}MEDIUM{Style.RESET_ALL}"
-        elif total_exposures <= 5:
-            return f"{Fore.RED}HIGH{Style.RESET_ALL}"
-        else:
-            return f"{Fore.RED}CRITICAL{Style.RESET_ALL}"
+        return next(level for threshold, level in _EMAIL_RISK_LEVELS if total_exposures <= threshold)
 
     def _assess_social_footprint(self, profile_count: int) -> str:
         '''
@@ -954,16 +969,7 @@ class OSINTExtractor:
         Valore di ritorno:
             str -> Descrizione dell'impronta digitale colorata per la visualizzazione
         '''
-        if profile_count == 0:
-            return f"{Fore.YELLOW}Minimal{Style.RESET_ALL}"
-        elif profile_count <= 3:
-            return f"{Fore.YELLOW}Low{Style.RESET_ALL}"
-        elif profile_count <= 7:
-            return f"{Fore.YELLOW}Moderate{Style.RESET_ALL}"
-        elif profile_count <= 12:
-            return f"{Fore.RED}High{Style.RESET_ALL}"
-        else:
-            return f"{Fore.RED}Extensive{Style.RESET_ALL}"
+        return next(level for threshold, level in _SOCIAL_FOOTPRINT_LEVELS if profile_count <= threshold)
 
     def _offer_additional_actions(self, profile_data: dict, target_identifier: str) -> None:
         '''
@@ -1058,7 +1064,7 @@ class OSINTExtractor:
     def get_database_size(self, db_name: str) -> float:
         """Restituisce la dimensione del database in MB."""
         try:
-            size = Path(self.databases[db_name]).stat().st_size
+            size = os.stat(self.databases[db_name]).st_size
             return size / (1024 * 1024)  # Converti in MB
         except Exception as e:
             logger.error(f"Errore lettura dimensione database {db_name}: {e}")
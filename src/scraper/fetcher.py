@@ -1,22 +1,133 @@
+import codecs
 import hashlib
+import io
+import json
 import logging
 import os
 import random
+import re
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, NamedTuple,  Union
+from typing import Any, Dict, Tuple, Union
+from urllib.parse import urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from .utils.clients import _safe_get
 
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger("scraper.fetcher")
 
-class FetchResponse(NamedTuple): 
+STREAM_CHUNK_SIZE = 65536 # dimensione dei blocchi letti dal body in streaming
+MEM_CACHE_MAXSIZE = 1024 # numero massimo di risposte tenute in memoria
+FAILED_TTL = 600 # secondi durante i quali un URL fallito non viene ritentato
+RETRY_BACKOFF_BASE = 0.5 # secondi, raddoppiati ad ogni tentativo
+RETRY_BACKOFF_CAP = 8.0 # attesa massima tra due tentativi
+MAX_REDIRECTS = 10 # lunghezza massima di una catena di redirect
+ZSTD_LEVEL = 3 # livello di compressione dei file di cache
+
+_zstd_contexts = threading.local() # i contesti zstd non sono thread-safe: uno per thread
+
+_uniform = random.uniform
+
+
+@lru_cache(maxsize=4096)
+def _url_hash(url: str) -> str:
+    '''
+    Funzione: _url_hash
+    Calcola (e memorizza) l'hash BLAKE2b a 64 bit di un URL, usato come nome del file di cache.
+    Parametri formali:
+        str url -> L'URL da codificare
+    Valore di ritorno:
+        str -> L'hash esadecimale di 16 caratteri
+    '''
+    return hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _codec_for(encoding: str) -> codecs.CodecInfo:
+    '''
+    Funzione: _codec_for
+    Risolve (una sola volta per codifica) il codec usato per decodificare i contenuti.
+    Parametri formali:
+        str encoding -> Nome della codifica
+    Valore di ritorno:
+        codecs.CodecInfo -> Il codec corrispondente (solleva LookupError se sconosciuto)
+    '''
+    return codecs.lookup(encoding)
+
+
+def _zstd_compressor() -> "zstd.ZstdCompressor":
+    '''
+    Funzione: _zstd_compressor
+    Restituisce il compressore zstd del thread corrente, creandolo al primo uso.
+    Valore di ritorno:
+        zstd.ZstdCompressor -> Compressore riutilizzabile
+    '''
+    cctx = getattr(_zstd_contexts, "cctx", None)
+    if cctx is None:
+        cctx = _zstd_contexts.cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+    return cctx
+
+
+def _zstd_decompressor() -> "zstd.ZstdDecompressor":
+    '''
+    Funzione: _zstd_decompressor
+    Restituisce il decompressore zstd del thread corrente, creandolo al primo uso.
+    Valore di ritorno:
+        zstd.ZstdDecompressor -> Decompressore riutilizzabile
+    '''
+    dctx = getattr(_zstd_contexts, "dctx", None)
+    if dctx is None:
+        dctx = _zstd_contexts.dctx = zstd.ZstdDecompressor()
+    return dctx
+
+_HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w\-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'charset=["\']?([\w\-]+)', re.IGNORECASE)
+
+
+def _detect_encoding(headers: requests.structures.CaseInsensitiveDict, content: bytes) -> str | None:
+    '''
+    Funzione: _detect_encoding
+    Determina la codifica senza analizzare l'intero body: charset dell'header Content-Type,
+    poi <meta charset> nei primi 1024 byte, poi UTF-8 se valido; il rilevamento statistico è l'ultima risorsa.
+    Parametri formali:
+        requests.structures.CaseInsensitiveDict headers -> Intestazioni della risposta
+        bytes content -> Contenuto della risposta
+    Valore di ritorno:
+        str | None -> Il nome della codifica, None se non determinabile
+    '''
+    match = _HEADER_CHARSET_RE.search(headers.get("Content-Type", ""))
+    if match:
+        return match.group(1)
+
+    match = _META_CHARSET_RE.search(content[:1024])
+    if match:
+        return match.group(1).decode("ascii")
+
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return requests.compat.chardet.detect(content)["encoding"]
+
+@dataclass(slots=True, frozen=True)
+class FetchResponse:
     '''
     Funzione: FetchResponse
     Rappresenta una risposta completa da una richiesta HTTP.
     Attributi:
-        NamedTuple -> Classe per rappresentare una tupla con nomi di attributi
+        dataclass(slots=True, frozen=True) -> Struttura immutabile con __slots__, più compatta di una NamedTuple
     
     Parametri formali:
         status_code: int -> Codice di stato HTTP della risposta
@@ -59,94 +170,381 @@ class WebFetcher:
             "Accept-Language": "en-US,en;q=0.5",
         }
 
+        # Sessione condivisa: riusa le connessioni TCP/TLS verso lo stesso host
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0) # i retry sono gestiti manualmente
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
         self.delay_range = delay_range
-        self.last_request_time: float = 0.0
+        self.last_request_time: dict[str, float] = {} # host -> timestamp ultima richiesta
+        self._lock = threading.Lock() # protegge politeness e cache in memoria con fetch_batch
+        self._closing = threading.Event() # interrompe le attese di politeness/backoff alla chiusura
+        self._failed: dict[str, float] = {} # URL -> timestamp dell'ultimo fallimento definitivo
 
         self.cache_enabled = cache_dir is not None
         if self.cache_enabled:
             self.cache_dir = Path(cache_dir)
             os.makedirs(self.cache_dir, exist_ok=True)
+            self._created_shards: set[str] = set() # sottodirectory di cache già create
+            self._mem_cache: OrderedDict[str, FetchResponse] = OrderedDict() # LRU in memoria davanti alla cache su disco
+            self._load_failed()
             logger.info(f"Cache attivata in {self.cache_dir}")
 
+    def close(self) -> None:
+        '''
+        Funzione: close
+        Chiude la sessione HTTP rilasciando le connessioni del pool e salva gli URL falliti in cache.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        self._closing.set()
+        self._save_failed()
+        self.session.close()
+
+    def _load_failed(self) -> None:
+        '''
+        Funzione: _load_failed
+        Carica da cache_dir/_failed.json gli URL falliti ancora entro FAILED_TTL.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        failed_path = self.cache_dir / "_failed.json"
+        if not failed_path.exists():
+            return
+        try:
+            with open(failed_path, encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            self._failed = {u: ts for u, ts in data.items() if now - ts < FAILED_TTL}
+        except Exception as e:
+            logger.warning(f"Errore lettura URL falliti da {failed_path}: {e}")
+
+    def _save_failed(self) -> None:
+        '''
+        Funzione: _save_failed
+        Salva in cache_dir/_failed.json gli URL falliti ancora entro FAILED_TTL.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        if not self.cache_enabled:
+            return
+        now = time.time()
+        with self._lock:
+            data = {u: ts for u, ts in self._failed.items() if now - ts < FAILED_TTL}
+        try:
+            with open(self.cache_dir / "_failed.json", "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except Exception as e:
+            logger.warning(f"Impossibile salvare gli URL falliti: {e}")
+
+    def __enter__(self) -> "WebFetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def _get_cache_path(self, url: str) -> Path:
         '''
         Funzione: _get_cache_path
-        Genera un percorso file univoco per l'URL nella cache.
+        Genera un percorso file univoco per l'URL nella cache (hash BLAKE2b a 64 bit).
+        I file sono distribuiti in sottodirectory per i primi 2 caratteri dell'hash, per evitare directory enormi.
+        Nota: le voci create con il vecchio schema MD5 non vengono più trovate e vanno riscaricate.
         Parametri formali:
             self -> Riferimento all'istanza della classe
             str url -> L'URL per cui generare il percorso cache
         Valore di ritorno:
             Path -> Percorso completo del file di cache
         '''
-        url_hash = hashlib.md5(url.encode()).hexdigest() # formatta l'url in un hash md5
-        return self.cache_dir / f"{url_hash}.html"
+        url_hash = _url_hash(url)
+        return self.cache_dir / url_hash[:2] / f"{url_hash[2:]}.bin"
 
-    def _check_cache(self, url: str) -> str | None:
+    def _ensure_shard(self, cache_path: Path) -> None:
         '''
-        Funzione: _check_cache
-        Verifica se l'URL è in cache e restituisce il contenuto testuale.
+        Funzione: _ensure_shard
+        Crea la sottodirectory di cache del file se non è già stata creata in questa sessione.
         Parametri formali:
             self -> Riferimento all'istanza della classe
-            str url -> L'URL da cercare in cache
+            Path cache_path -> Percorso del file di cache
         Valore di ritorno:
-            Optional[str] -> Il contenuto della pagina se presente in cache, altrimenti None
+            None -> La funzione non restituisce un valore
+        '''
+        shard = cache_path.parent.name
+        if shard not in self._created_shards:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._created_shards.add(shard)
+
+    def migrate_cache(self) -> int:
+        '''
+        Funzione: migrate_cache
+        Sposta i file di cache salvati nella directory piatta nelle rispettive sottodirectory.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            int -> Numero di file spostati
         '''
         if not self.cache_enabled:
-            return None
+            return 0
 
-        cache_path = self._get_cache_path(url)
-        if cache_path.exists():
-            logger.debug(f"Cache hit per {url}")
+        moved = 0
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or not path.name.endswith((".bin", ".meta.json")):
+                continue
+            url_hash, _, suffix = path.name.partition(".")
+            target = self.cache_dir / url_hash[:2] / f"{url_hash[2:]}.{suffix}"
             try:
-                with open(cache_path, encoding="utf-8") as f:
-                    return f.read()
+                self._ensure_shard(target)
+                path.replace(target)
+                moved += 1
+            except OSError as e:
+                logger.warning(f"Impossibile migrare il file di cache {path}: {e}")
+        logger.info(f"Migrati {moved} file di cache in {self.cache_dir}")
+        return moved
+
+    def _check_cache(self, cache_path: Path, url: str, hops: int = 0) -> FetchResponse | None:
+        '''
+        Funzione: _check_cache
+        Verifica se l'URL è in cache e ricostruisce la risposta dai byte grezzi e dai metadati.
+        Se l'URL è un redirect salvato, segue la catena in cache fino alla risposta finale.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            Path cache_path -> Percorso di cache dell'URL (da _get_cache_path)
+            str url -> L'URL da cercare in cache
+            int hops -> Redirect già seguiti (limite MAX_REDIRECTS)
+        Valore di ritorno:
+            FetchResponse | None -> La risposta salvata se presente in cache, altrimenti None
+        '''
+        meta_path = cache_path.with_suffix(".meta.json")
+        if meta_path.exists():
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                redirect_to = meta.get("redirect_to")
+                if redirect_to:
+                    if hops >= MAX_REDIRECTS:
+                        return None
+                    return self._check_cache(self._get_cache_path(redirect_to), redirect_to, hops + 1)
+                if not cache_path.exists():
+                    return None
+                compressed = meta.get("compression") == "zstd"
+                if compressed and not ZSTD_AVAILABLE:
+                    return None
+                logger.debug(f"Cache hit per {url}")
+                with open(cache_path, "rb") as f:
+                    content = f.read()
+                if compressed:
+                    # stream_writer non registra la dimensione nel frame: serve un decompressobj
+                    content = _zstd_decompressor().decompressobj().decompress(content)
+                return FetchResponse(
+                    status_code=meta["status"],
+                    content=content,
+                    headers=requests.structures.CaseInsensitiveDict(meta.get("headers", {})),
+                    url=meta.get("url", url),
+                    encoding=meta.get("encoding"),
+                )
             except Exception as e:
                 logger.warning(f"Errore lettura cache per {url}: {e}")
 
         return None
 
-    def _save_to_cache(self, url: str, content: str) -> bool:
+    def _save_to_cache(self, cache_path: Path, url: str, response: FetchResponse, partial_path: Path) -> bool:
         '''
         Funzione: _save_to_cache
-        Salva il contenuto testuale nella cache.
+        Salva nella cache il body già scritto in streaming e un file .meta.json con status, codifica e headers.
         Parametri formali:
             self -> Riferimento all'istanza della classe
+            Path cache_path -> Percorso di cache dell'URL (da _get_cache_path)
             str url -> L'URL associato al contenuto
-            str content -> Il contenuto HTML da salvare
+            FetchResponse response -> La risposta da salvare
+            Path partial_path -> File temporaneo già scritto in streaming col body da _read_body
         Valore di ritorno:
             bool -> True se il salvataggio è avvenuto con successo, False altrimenti
         '''
-        if not self.cache_enabled:
+        if response.content is None:
             return False
 
         try:
-            cache_path = self._get_cache_path(url)
-            with open(cache_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            self._ensure_shard(cache_path)
+            partial_path.replace(cache_path)
+            meta = {
+                "status": response.status_code,
+                "encoding": response.encoding,
+                "headers": dict(response.headers),
+                "url": response.url,
+                "compression": "zstd" if ZSTD_AVAILABLE else None,
+            }
+            with open(cache_path.with_suffix(".meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
             return True
         except Exception as e:
             logger.warning(f"Impossibile salvare in cache {url}: {e}")
             return False
 
-    def _respect_politeness(self) -> None:
+    def _save_redirect(self, cache_path: Path, url: str, status_code: int, redirect_to: str) -> None:
         '''
-        Funzione: _respect_politeness
-        Attende per rispettare le politiche di politeness (ritardo tra richieste).
+        Funzione: _save_redirect
+        Salva in cache un passo di una catena di redirect (solo metadati, senza body).
         Parametri formali:
             self -> Riferimento all'istanza della classe
+            Path cache_path -> Percorso di cache dell'URL che redirige
+            str url -> L'URL che redirige
+            int status_code -> Codice di stato del redirect
+            str redirect_to -> URL di destinazione assoluto
         Valore di ritorno:
             None -> La funzione non restituisce un valore
         '''
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
+        try:
+            self._ensure_shard(cache_path)
+            with open(cache_path.with_suffix(".meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"status": status_code, "url": url, "redirect_to": redirect_to}, f)
+        except Exception as e:
+            logger.warning(f"Impossibile salvare in cache il redirect di {url}: {e}")
+
+    def _revalidation_headers(self, cache_path: Path | None, url: str) -> tuple[FetchResponse | None, dict[str, str]]:
+        '''
+        Funzione: _revalidation_headers
+        Recupera la copia in cache di un URL e gli header per rivalidarla con una GET condizionale.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            Path | None cache_path -> Percorso di cache dell'URL (None se la cache è disattivata)
+            str url -> L'URL da rivalidare
+        Valore di ritorno:
+            tuple[FetchResponse | None, dict[str, str]] -> (copia in cache o None, header condizionali)
+        '''
+        stale = self._check_cache(cache_path, url) if cache_path is not None else None
+        conditional_headers = {}
+        if stale is not None:
+            if stale.headers.get("ETag"):
+                conditional_headers["If-None-Match"] = stale.headers["ETag"]
+            if stale.headers.get("Last-Modified"):
+                conditional_headers["If-Modified-Since"] = stale.headers["Last-Modified"]
+        return stale, conditional_headers
 
+    def _remember(self, url: str, response: FetchResponse) -> None:
+        '''
+        Funzione: _remember
+        Inserisce una risposta nella cache LRU in memoria, scartando la meno recente oltre MEM_CACHE_MAXSIZE.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str url -> L'URL della risposta
+            FetchResponse response -> La risposta da memorizzare
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        with self._lock:
+            self._mem_cache[url] = response
+            self._mem_cache.move_to_end(url)
+            if len(self._mem_cache) > MEM_CACHE_MAXSIZE:
+                self._mem_cache.popitem(last=False)
+
+    def _recall(self, url: str) -> FetchResponse | None:
+        '''
+        Funzione: _recall
+        Cerca una risposta nella cache LRU in memoria, marcandola come usata di recente.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str url -> L'URL da cercare
+        Valore di ritorno:
+            FetchResponse | None -> La risposta memorizzata o None
+        '''
+        with self._lock:
+            cached = self._mem_cache.get(url)
+            if cached is not None:
+                self._mem_cache.move_to_end(url)
+            return cached
+
+    def _read_body(self, response: requests.Response, partial_path: Path | None) -> bytes:
+        '''
+        Funzione: _read_body
+        Legge il body in streaming a blocchi, scrivendolo contemporaneamente sul file temporaneo di cache.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            requests.Response response -> Risposta aperta con stream=True
+            Path | None partial_path -> File temporaneo di cache (None se la risposta non va salvata)
+        Valore di ritorno:
+            bytes -> Il contenuto completo della risposta
+        '''
+        buffer = io.BytesIO()
+        try:
+            if partial_path is None:
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    buffer.write(chunk)
+            else:
+                with open(partial_path, "wb") as raw:
+                    # Con zstandard installato il file di cache viene compresso al volo
+                    f = _zstd_compressor().stream_writer(raw, closefd=False) if ZSTD_AVAILABLE else raw
+                    try:
+                        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                            buffer.write(chunk)
+                            f.write(chunk)
+                    finally:
+                        if f is not raw:
+                            f.close()
+        except Exception:
+            if partial_path is not None:
+                partial_path.unlink(missing_ok=True) # niente file di cache troncati
+            raise
+        finally:
+            response.close()
+        return buffer.getvalue()
+
+    def _backoff(self, attempt: int) -> None:
+        '''
+        Funzione: _backoff
+        Attende prima di un nuovo tentativo con backoff esponenziale "full jitter", limitato a RETRY_BACKOFF_CAP.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            int attempt -> Numero di tentativi già falliti
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        sleep_time = _uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+        logger.debug(f"Attendo {sleep_time:.2f} secondi prima di riprovare")
+        self._closing.wait(sleep_time)
+
+    def next_allowed_time(self, url: str) -> float:
+        '''
+        Funzione: next_allowed_time
+        Restituisce l'istante (time.time()) dal quale è possibile inviare una nuova richiesta all'host dell'URL.
+        Permette a uno scheduler di attendere senza bloccare il thread, servendo nel frattempo altri host.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str url -> L'URL da richiedere
+        Valore di ritorno:
+            float -> Timestamp del prossimo slot disponibile per l'host
+        '''
+        host = urlparse(url).netloc
+        with self._lock:
+            return self.last_request_time.get(host, 0.0) + self.delay_range[0]
+
+    def _respect_politeness(self, url: str) -> None:
+        '''
+        Funzione: _respect_politeness
+        Attende per rispettare le politiche di politeness (ritardo tra richieste allo stesso host).
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            str url -> L'URL che sta per essere richiesto
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        host = urlparse(url).netloc
         min_delay = self.delay_range[0]
-        if elapsed < min_delay:
-            sleep_time = min_delay - elapsed
-            logger.debug(f"Attesa di {sleep_time:.2f}s per politeness")
-            time.sleep(sleep_time)
+        # Prenota lo slot sotto lock così thread concorrenti sullo stesso host restano distanziati
+        with self._lock:
+            current_time = time.time()
+            sleep_time = max(0.0, self.last_request_time.get(host, 0.0) + min_delay - current_time)
+            self.last_request_time[host] = current_time + sleep_time
 
-        self.last_request_time = time.time()
+        if sleep_time > 0:
+            logger.debug(f"Attesa di {sleep_time:.2f}s per politeness")
+            self._closing.wait(sleep_time)
 
     def fetch(self, url: str, force_download: bool = False, timeout: int = 30, retries: int = 3) -> str | None:
         '''
@@ -161,12 +559,13 @@ class WebFetcher:
         Valore di ritorno:
             str | None -> Il contenuto testuale della pagina o None in caso di fallimento
         '''
+        # La cache è gestita da fetch_full_response
         response_obj = self.fetch_full_response(url, force_download, timeout, retries)
-        # Se la risposta è in cache e non forziamo il download, restituiamo il contenuto dalla cache
         if response_obj and response_obj.content:
             try:
-                # Prova a decodificare il contenuto in base alla codifica apparente
-                return response_obj.content.decode(response_obj.encoding if response_obj.encoding else 'utf-8', errors='replace')
+                # Decodifica con il codec già risolto per questa codifica (stateless, sicuro tra thread)
+                codec = _codec_for(response_obj.encoding or 'utf-8')
+                return codec.decode(response_obj.content, 'replace')[0]
             except Exception as e:
                 logger.warning(f"Errore decodifica contenuto testuale per {url}: {e}")
                 return None
@@ -185,31 +584,143 @@ class WebFetcher:
         Valore di ritorno:
             FetchResponse | None -> Un oggetto FetchResponse contenente i dati della risposta, o None in caso di fallimento
         '''
-        self._respect_politeness()
+        # Percorso di cache calcolato una sola volta per tutta la richiesta
+        cache_path = self._get_cache_path(url) if self.cache_enabled else None
+
+        # Un hit in cache evita sia la rete sia l'attesa di politeness
+        if cache_path is not None:
+            if force_download:
+                with self._lock:
+                    self._mem_cache.pop(url, None)
+            else:
+                cached = self._recall(url)
+                if cached is not None:
+                    return cached
+                cached = self._check_cache(cache_path, url)
+                if cached is not None:
+                    self._remember(url, cached)
+                    return cached
+
+        # URL fallito di recente: evita di ripetere retry e attese
+        if not force_download and time.time() - self._failed.get(url, 0.0) < FAILED_TTL:
+            logger.debug(f"Salto {url}: fallito negli ultimi {FAILED_TTL}s")
+            return None
+
+        # Con force_download la copia in cache (se presente) viene rivalidata con una GET condizionale
+        stale, conditional_headers = self._revalidation_headers(cache_path, url) if force_download else (None, {})
+
+        requested_url = url # chiave per cache in memoria e URL falliti anche dopo i redirect
+        redirects = 0
+        self._respect_politeness(url)
         attempt = 0
         while attempt < retries:
             try:
                 logger.info(f"Download completo {url} (tentativo {attempt+1}/{retries})")
-                response = _safe_get(url, headers=self.headers, timeout=timeout, allow_redirects=True)
+                # Si usa session.get e non session.send con una PreparedRequest riutilizzata: send non unisce
+                # cookie di sessione né proxy/CA da ambiente, e il merge degli header costa microsecondi
+                # contro i secondi di politeness per richiesta.
+                response = _safe_get(url, headers=conditional_headers or None, timeout=timeout, allow_redirects=False, session=self.session, stream=True)
 
-                content_bytes = response.content
+                if response.status_code == 304 and stale is not None:
+                    logger.debug(f"{url} non modificato, uso la copia in cache")
+                    response.close()
+                    self._remember(requested_url, stale)
+                    self._failed.pop(requested_url, None)
+                    return stale
 
-                return FetchResponse(
+                # Redirect seguiti a mano: ogni passo della catena viene salvato in cache
+                if response.is_redirect:
+                    if redirects >= MAX_REDIRECTS:
+                        # Catena troppo lunga (o loop): fallimento, il body del 3xx non va né restituito né salvato
+                        response.close()
+                        logger.error(f"Troppi redirect (oltre {MAX_REDIRECTS}) durante il download completo di {requested_url}")
+                        self._failed[requested_url] = time.time()
+                        return None
+                    next_url = urljoin(url, response.headers["Location"])
+                    response.close()
+                    if cache_path is not None:
+                        self._save_redirect(cache_path, url, response.status_code, next_url)
+                    redirects += 1
+                    url = next_url
+                    cache_path = self._get_cache_path(url) if self.cache_enabled else None
+                    if cache_path is not None and not force_download:
+                        cached = self._check_cache(cache_path, url)
+                        if cached is not None:
+                            self._remember(requested_url, cached)
+                            return cached
+                    if force_download:
+                        stale, conditional_headers = self._revalidation_headers(cache_path, url)
+                    self._respect_politeness(url)
+                    continue
+
+                # Solo gli errori lato server meritano un nuovo tentativo; i 4xx vengono restituiti subito
+                if response.status_code >= 500 and attempt + 1 < retries:
+                    logger.warning(f"Risposta {response.status_code} durante il download completo di {url}")
+                    response.close()
+                    attempt += 1
+                    self._backoff(attempt)
+                    continue
+
+                partial_path = None
+                if cache_path is not None and response.ok:
+                    partial_path = cache_path.with_suffix(".part")
+                    self._ensure_shard(partial_path)
+                content_bytes = self._read_body(response, partial_path)
+
+                response_obj = FetchResponse(
                     status_code=response.status_code,
                     content=content_bytes,
                     headers=response.headers,
                     url=response.url,
-                    encoding=response.apparent_encoding
+                    encoding=_detect_encoding(response.headers, content_bytes)
                 )
+                if partial_path is not None:
+                    if self._save_to_cache(cache_path, url, response_obj, partial_path):
+                        self._remember(requested_url, response_obj)
+                self._failed.pop(requested_url, None)
+                return response_obj
 
             except requests.RequestException as e:
                 logger.warning(f"Errore durante il download completo di {url}: {e}")
 
             attempt += 1
             if attempt < retries:
-                sleep_time = random.uniform(2, 5) * attempt
-                logger.debug(f"Attendo {sleep_time:.2f} secondi prima di riprovare")
-                time.sleep(sleep_time)
+                self._backoff(attempt)
 
         logger.error(f"Impossibile scaricare (completo) {url} dopo {retries} tentativi")
-        return None
\ No newline at end of file
+        self._failed[requested_url] = time.time()
+        return None
+
+    def fetch_batch(self, urls: list[str], max_workers: int | None = None, force_download: bool = False, timeout: int = 30, retries: int = 3) -> dict[str, FetchResponse | None]:
+        '''
+        Funzione: fetch_batch
+        Scarica più URL in parallelo con un pool di thread, condividendo sessione, cache e politeness per host.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+            list[str] urls -> Gli URL da scaricare
+            int | None max_workers -> Numero di thread (default: numero di CPU * 5)
+            bool force_download -> Forzare il download (ignora cache)
+            int timeout -> Timeout di ogni richiesta in secondi
+            int retries -> Numero di tentativi per URL
+        Valore di ritorno:
+            dict[str, FetchResponse | None] -> Mappa URL -> risposta (None per gli URL falliti)
+        '''
+        results: dict[str, FetchResponse | None] = {}
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return results
+
+        workers = max_workers or (os.cpu_count() or 4) * 5
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.fetch_full_response, u, force_download, timeout, retries): u
+                for u in unique_urls
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    logger.warning(f"Errore durante il download in batch di {url}: {e}")
+                    results[url] = None
+        return results
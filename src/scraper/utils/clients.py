@@ -1,41 +1,415 @@
 # src/scraper/utils/clients.py
 #  Contiene funzioni per interagire con API esterne o librerie specifiche per ottenere dati (WHOIS, DNS, Shodan, Hunter.io, HIBP)
+import asyncio
+import copy
+import functools
+import ipaddress
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
-import shodan # Per Shodan
-from dns import resolver as dns_resolver # Per DNS
-from typing import List, Dict, Any, Optional
+import re
+import shelve
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
 from datetime import datetime, timezone # Per la gestione delle date in WHOIS
 import sys
 import time
-from waybackpy import WaybackMachineCDXServerAPI
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from urllib.parse import quote
 from colorama import Fore, Style
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # È una buona pratica avere un logger per modulo
 logger = logging.getLogger(__name__)
 
+RETRY_TOTAL = 5 # Tentativi massimi gestiti da urllib3 per le API
+RETRY_BACKOFF_FACTOR = 2 # Backoff esponenziale tra i tentativi (secondi)
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504) # Status considerati transitori
+
+
+def _session() -> requests.Session:
+    '''
+    Funzione: _session
+    Crea la sessione HTTP condivisa dai client API, con connection pooling e retry con backoff gestiti da urllib3.
+    Valore di ritorno:
+        requests.Session -> La sessione configurata
+    '''
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        respect_retry_after_header=True,
+        raise_on_status=False, # Dopo l'ultimo tentativo restituisce la risposta, gestita da raise_for_status()
+    )
+    # HTTP/1.1 con keep-alive è sufficiente: i token bucket in _LIMITERS tengono le richieste verso ogni
+    # provider quasi sequenziali, quindi una connessione riusata dal pool copre già il caso che il
+    # multiplexing HTTP/2 ottimizzerebbe, senza aggiungere httpx/h2 alle dipendenze
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _session()
+
+
+def _json_body(response: requests.Response) -> Any:
+    '''
+    Funzione: _json_body
+    Decodifica il corpo JSON di una risposta direttamente dai byte, con orjson se disponibile.
+    Parametri formali:
+        requests.Response response -> La risposta HTTP da decodificare
+    Valore di ritorno:
+        Any -> Il contenuto JSON decodificato (solleva json.JSONDecodeError se non valido)
+    '''
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content) # orjson.JSONDecodeError è una sottoclasse di json.JSONDecodeError
+    return json.loads(response.content)
+
+# Stessa directory data/ della radice del progetto usata dalla CLI (ScraperCLI.data_dir), indipendente dalla directory corrente
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+API_CACHE_PATH = DATA_DIR / "api_cache" / "responses" # Cache su disco delle risposte API (shelve)
+API_CACHE_TTL = 86400 # Validità delle risposte in cache (secondi)
+_api_cache_lock = threading.Lock() # shelve non è thread-safe e i lookup possono girare in thread
 
-def _safe_get(url: str, *, headers: dict | None = None, timeout: int = 10, max_retries: int = 3, backoff_factor: float = 0.5, verify: bool = True, allow_redirects: bool = True):
+
+def _cache_get(endpoint: str, target: str) -> Any:
+    '''
+    Funzione: _cache_get
+    Restituisce la risposta in cache per la coppia (endpoint, target) se ancora entro API_CACHE_TTL.
+    Parametri formali:
+        str endpoint -> Nome del servizio (es. "hunterio", "hibp", "wayback", "shodan")
+        str target -> Il target interrogato (email, dominio, IP)
+    Valore di ritorno:
+        Any -> La risposta salvata, o None se assente, scaduta o se la cache non è leggibile
+    '''
+    key = f"{endpoint}:{target}"
+    try:
+        with _api_cache_lock, shelve.open(str(API_CACHE_PATH)) as db:
+            entry = db.get(key)
+    except Exception as e:
+        logger.debug(f"API cache read failed for {key}: {e}")
+        return None
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.time() - stored_at > API_CACHE_TTL:
+        return None
+    logger.debug(f"API cache hit for {key}")
+    return value
+
+
+def _cache_put(endpoint: str, target: str, value: Any) -> None:
+    '''
+    Funzione: _cache_put
+    Salva su disco la risposta per la coppia (endpoint, target). Gli errori di scrittura vengono solo loggati.
+    Parametri formali:
+        str endpoint -> Nome del servizio
+        str target -> Il target interrogato
+        Any value -> La risposta da salvare (deve essere serializzabile con pickle)
+    Valore di ritorno:
+        None -> La funzione non restituisce un valore
+    '''
+    key = f"{endpoint}:{target}"
+    try:
+        API_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with _api_cache_lock, shelve.open(str(API_CACHE_PATH)) as db:
+            db[key] = (time.time(), value)
+    except Exception as e:
+        logger.debug(f"API cache write failed for {key}: {e}")
+
+
+# Parametri di query con credenziali (es. api_key di Hunter.io): requests li riporta nel testo delle eccezioni
+_SECRET_PARAM_RE = re.compile(r'(?i)([?&](?:api_?key|apikey|key|token|access_token)=)[^&#\s\'"]+')
+
+
+def _redact_secrets(text: Any) -> str:
+    '''
+    Funzione: _redact_secrets
+    Maschera i valori dei parametri di query con credenziali in un URL o nel messaggio di un'eccezione, prima di loggarlo.
+    Parametri formali:
+        Any text -> URL, eccezione o messaggio da ripulire (convertito con str)
+    Valore di ritorno:
+        str -> Il testo con i valori delle credenziali sostituiti da ***
+    '''
+    return _SECRET_PARAM_RE.sub(r'\1***', str(text))
+
+
+def _safe_get(url: str, *, params: dict | None = None, headers: dict | None = None, timeout: int = 10, max_retries: int = 3, backoff_factor: float = 0.5, verify: bool = True, allow_redirects: bool = True, session: requests.Session | None = None, stream: bool = False):
     """Perform requests.get with retries and exponential backoff.
 
+    If a session is given the request goes through its connection pool.
     Returns the requests.Response on success or raises the last RequestException on failure.
     """
+    getter = session.get if session is not None else requests.get
     attempt = 0
     while True:
         try:
-            return requests.get(url, headers=headers, timeout=timeout, verify=verify, allow_redirects=allow_redirects)
+            return getter(url, params=params, headers=headers, timeout=timeout, verify=verify, allow_redirects=allow_redirects, stream=stream)
         except requests.exceptions.RequestException as e:
             attempt += 1
             if attempt > max_retries:
-                logger.error(f"Failed to GET {url} after {max_retries} attempts: {e}")
+                logger.error(f"Failed to GET {_redact_secrets(url)} after {max_retries} attempts: {_redact_secrets(e)}")
                 raise
             sleep_time = backoff_factor * (2 ** (attempt - 1))
-            logger.debug(f"Request to {url} failed (attempt {attempt}/{max_retries}), retrying in {sleep_time}s: {e}")
+            logger.debug(f"Request to {_redact_secrets(url)} failed (attempt {attempt}/{max_retries}), retrying in {sleep_time}s: {_redact_secrets(e)}")
             time.sleep(sleep_time)
 
 
+# === Import differiti delle librerie pesanti ===
+# shodan e dnspython caricano molti moduli: vengono importati solo al primo lookup che li usa
+@functools.cache
+def _load_shodan():
+    import shodan # Per Shodan
+    return shodan
+
+
+@functools.cache
+def _load_dns_resolver():
+    from dns import resolver as dns_resolver # Per DNS
+    return dns_resolver
+
+
+# === Rate limiting per provider ===
+RATE_LIMIT_LOW_WATERMARK = 0.1 # Frazione di quota residua (X-RateLimit-Remaining) sotto cui rallentare
+
+
+class TokenBucket:
+    '''
+    Funzione: TokenBucket
+    Limitatore token bucket thread-safe: acquire() blocca finché non è disponibile un token, invece di lasciar partire richieste destinate al 429.
+    Parametri formali:
+        self -> Riferimento all'istanza della classe
+        float rate -> Token generati al secondo
+        int burst -> Numero massimo di token accumulabili
+    Valore di ritorno:
+        None -> Il costruttore non restituisce un valore esplicito
+    '''
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        '''
+        Funzione: acquire
+        Preleva un token, attendendo se il bucket è vuoto. Il token viene prenotato sotto lock, così i thread concorrenti si mettono in coda.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def drain(self) -> None:
+        '''
+        Funzione: drain
+        Svuota il bucket, così la prossima richiesta attende un intero intervallo di ricarica.
+        Parametri formali:
+            self -> Riferimento all'istanza della classe
+        Valore di ritorno:
+            None -> La funzione non restituisce un valore
+        '''
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = time.monotonic()
+
+
+_LIMITERS: Dict[str, TokenBucket] = {
+    "haveibeenpwned.com": TokenBucket(rate=1 / 1.5, burst=1), # Piano base HIBP: 1 richiesta ogni 1.5s
+    "api.hunter.io": TokenBucket(rate=10, burst=10),
+    "api.shodan.io": TokenBucket(rate=1, burst=1), # Piano free Shodan: 1 richiesta al secondo
+}
+
+
+def _throttle_on_headers(host: str, response: requests.Response) -> None:
+    '''
+    Funzione: _throttle_on_headers
+    Rallenta il limitatore dell'host quando gli header X-RateLimit indicano che la quota residua è quasi esaurita.
+    Parametri formali:
+        str host -> L'host del provider (chiave di _LIMITERS)
+        requests.Response response -> La risposta appena ricevuta
+    Valore di ritorno:
+        None -> La funzione non restituisce un valore
+    '''
+    try:
+        remaining = int(response.headers["X-RateLimit-Remaining"])
+        limit = int(response.headers["X-RateLimit-Limit"])
+    except (KeyError, TypeError, ValueError):
+        return
+    if limit > 0 and remaining < limit * RATE_LIMIT_LOW_WATERMARK:
+        logger.debug(f"Rate limit quota low for {host} ({remaining}/{limit}), throttling")
+        _LIMITERS[host].drain()
+
+
+# === Circuit breaker per provider ===
+CIRCUIT_FAILURE_THRESHOLD = 3 # Fallimenti consecutivi dopo cui il circuito si apre
+CIRCUIT_MAX_EXPONENT = 8 # Apertura massima del circuito: 2**8 secondi
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Sollevata quando il circuito di un provider è aperto e la richiesta viene saltata."""
+
+
+@dataclass
+class CircuitState:
+    '''
+    Funzione: CircuitState
+    Stato del circuit breaker di un host: dopo CIRCUIT_FAILURE_THRESHOLD fallimenti consecutivi le richieste vengono saltate per 2**fallimenti secondi.
+    '''
+    failures: int = 0
+    open_until: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def is_open(self) -> bool:
+        return time.time() < self.open_until
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self.open_until = time.time() + 2 ** min(self.failures, CIRCUIT_MAX_EXPONENT)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+
+
+_BREAKERS: Dict[str, CircuitState] = defaultdict(CircuitState)
+
+
+def _api_get(host: str, url: str, **kwargs) -> requests.Response:
+    '''
+    Funzione: _api_get
+    Esegue una GET verso un provider API sulla sessione condivisa, applicando circuit breaker, rate limit e throttling sugli header.
+    Parametri formali:
+        str host -> L'host del provider (chiave di _BREAKERS e _LIMITERS)
+        str url -> L'URL da richiedere
+        **kwargs -> Argomenti aggiuntivi per _safe_get (params, headers, timeout, ...)
+    Valore di ritorno:
+        requests.Response -> La risposta ricevuta (solleva CircuitOpenError se il circuito è aperto)
+    '''
+    breaker = _BREAKERS[host]
+    if breaker.is_open():
+        logger.warning(f"Circuit open for {host}, skipping request")
+        raise CircuitOpenError(f"{host} temporarily unavailable (circuit open)")
+
+    limiter = _LIMITERS.get(host)
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        # I retry (anche su 429/5xx e timeout) sono gestiti dall'adapter della sessione
+        response = _safe_get(url, max_retries=0, session=_SESSION, **kwargs)
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+
+    if response.status_code in RETRY_STATUS_FORCELIST:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if limiter is not None:
+        _throttle_on_headers(host, response)
+    return response
+
+
+# === Orchestratore lookup concorrenti ===
+LOOKUP_MAX_WORKERS = 32 # Thread condivisi per i lookup esterni eseguiti dalle coroutine
+
+# Pool a livello di modulo: asyncio.run crea un nuovo loop (e un nuovo executor di default) a ogni chiamata,
+# mentre questi thread restano vivi tra una scansione e l'altra
+_LOOKUP_EXECUTOR = ThreadPoolExecutor(max_workers=LOOKUP_MAX_WORKERS, thread_name_prefix="osint-lookup")
+
+
+def submit_lookup(fn: Callable[..., Any], *args: Any) -> Future:
+    '''
+    Funzione: submit_lookup
+    Avvia un client sincrono nel pool condiviso dei lookup e restituisce subito, così il chiamante può lavorare nel frattempo.
+    Parametri formali:
+        Callable fn -> La funzione client da eseguire
+        Any args -> Gli argomenti posizionali della funzione
+    Valore di ritorno:
+        Future -> Il future da cui leggere il risultato con .result()
+    '''
+    return _LOOKUP_EXECUTOR.submit(fn, *args)
+
+
+async def run_lookup(fn: Callable[..., Any], *args: Any) -> Any:
+    '''
+    Funzione: run_lookup
+    Esegue un client sincrono nel pool condiviso dei lookup senza bloccare l'event loop.
+    Parametri formali:
+        Callable fn -> La funzione client da eseguire
+        Any args -> Gli argomenti posizionali della funzione
+    Valore di ritorno:
+        Any -> Il risultato della funzione
+    '''
+    return await asyncio.get_running_loop().run_in_executor(_LOOKUP_EXECUTOR, fn, *args)
+
+
+async def gather_lookups_async(lookups: Dict[str, Tuple[Callable[..., Any], tuple]]) -> Dict[str, Any]:
+    '''
+    Funzione: gather_lookups_async
+    Esegue in parallelo più lookup esterni indipendenti (WHOIS, DNS, Shodan, Hunter.io, HIBP, Wayback).
+    I client restano sincroni: ognuno gira in un thread del pool condiviso, così il tempo totale è quello del lookup più lento.
+    Parametri formali:
+        dict[str, tuple[Callable, tuple]] lookups -> Mappa nome -> (funzione client, argomenti posizionali)
+    Valore di ritorno:
+        dict[str, Any] -> Mappa nome -> risultato del client, o {"error": ...} se il client ha sollevato un'eccezione
+    '''
+    names = list(lookups)
+    outcomes = await asyncio.gather(
+        *(run_lookup(fn, *args) for fn, args in lookups.values()),
+        return_exceptions=True,
+    )
+    results: Dict[str, Any] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Lookup {name} failed: {outcome}", exc_info=outcome)
+            outcome = {"error": f"{name} lookup failed: {outcome}"}
+        results[name] = outcome
+    return results
+
+
+def gather_lookups(lookups: Dict[str, Tuple[Callable[..., Any], tuple]]) -> Dict[str, Any]:
+    '''
+    Funzione: gather_lookups
+    Wrapper sincrono di gather_lookups_async per i chiamanti non asincroni.
+    Parametri formali:
+        dict[str, tuple[Callable, tuple]] lookups -> Mappa nome -> (funzione client, argomenti posizionali)
+    Valore di ritorno:
+        dict[str, Any] -> Mappa nome -> risultato del client
+    '''
+    return asyncio.run(gather_lookups_async(lookups))
+
+
 # === Wayback Machine Client ===
+WAYBACK_CDX_URL = "https://web.archive.org/cdx/search/cdx" # Endpoint CDX di Wayback Machine
+
+
 def fetch_wayback_snapshots(url: str, limit: int = 5) -> Dict [str, Any]:
     '''
     Funzione: fetch_wayback_snapshots
@@ -47,35 +421,53 @@ def fetch_wayback_snapshots(url: str, limit: int = 5) -> Dict [str, Any]:
         dict[str, Any] -> Un dizionario contenente i dati degli snapshot o un messaggio di errore
     '''
 
+    cached = _cache_get("wayback", f"{url}|{limit}")
+    if cached is not None:
+        return cached
+
     try:
         logger.debug(f"Fetching Wayback Machine snapshots for URL: {url} with limit {limit}")
         print(f"Cercando snapshot per {url} con limite {limit}...")  # Per debug
 
-        cdx_api = WaybackMachineCDXServerAPI(url, user_agent="Browsint Research Bot")
-        cdx_api.limit = limit  # Imposta il limite di snapshot da recuperare
-        snapshots = cdx_api.snapshots()
-
-        if not snapshots:
-            logger.info(f"No snapshots found for {url}.")
-            return {"info": f"No snapshots found for {url}."}
+        # Interroga direttamente il CDX server sulla sessione condivisa (pool, retry e cache TLS),
+        # con limite e filtro sullo status applicati lato server così non vengono trasferite righe inutili
+        response = _api_get(
+            "web.archive.org",
+            WAYBACK_CDX_URL,
+            params={
+                "url": url,
+                "output": "json",
+                "fl": "timestamp,original,statuscode,mimetype,digest",
+                "filter": "statuscode:200",
+                "limit": limit,
+            },
+            headers={"User-Agent": "Browsint Research Bot"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        rows = _json_body(response) if response.content else []
 
-        # Converti i risultati in un formato più leggibile
+        # Converti i risultati in un formato più leggibile (la prima riga del CDX è l'intestazione dei campi)
         results = []
-        for s in snapshots:
+        for timestamp, original, statuscode, mimetype, digest in islice(rows, 1, limit + 1):
+            archive_url = f"https://web.archive.org/web/{timestamp}/{original}"
             results.append({
-                "timestamp": s.timestamp,
-                "url": s.archive_url,  # URL dell'archivio effettivo
-                "original_url": s.original,
-                "status_code": s.statuscode,
-                "mime_type": s.mimetype,
-                "diges": s.digest,  # Hash del contenuto
+                "timestamp": timestamp,
+                "url": archive_url,  # URL dell'archivio effettivo
+                "original_url": original,
+                "status_code": statuscode,
+                "mime_type": mimetype,
+                "diges": digest,  # Hash del contenuto
             })
 
-            print(f"Trovato snapshot numero {len(results)}:{s.archive_url}")
-            if len(results) > 5:
-                break
+            print(f"Trovato snapshot numero {len(results)}:{archive_url}")
+
+        if not results:
+            logger.info(f"No snapshots found for {url}.")
+            return {"info": f"No snapshots found for {url}."}
 
         logger.debug(f"Found {len(results)} snapshots for {url}.")
+        _cache_put("wayback", f"{url}|{limit}", {"snapshots": results})
         return {"snapshots": results}
 
     except requests.exceptions.RequestException as e:
@@ -87,6 +479,8 @@ def fetch_wayback_snapshots(url: str, limit: int = 5) -> Dict [str, Any]:
     
 
 # === Hunter.io Client ===
+HUNTER_VERIFIER_URL = "https://api.hunter.io/v2/email-verifier" # Endpoint di verifica email di Hunter.io
+
 def fetch_hunterio(email: str, api_key: Optional[str]) -> Dict[str, Any]:
     '''
     Funzione: _fetch_hunterio
@@ -101,28 +495,36 @@ def fetch_hunterio(email: str, api_key: Optional[str]) -> Dict[str, Any]:
         logger.info("Hunter.io API key not provided. Skipping Hunter.io lookup.")
         return {"error": "API key for Hunter.io not provided"}
 
+    cached = _cache_get("hunterio", email)
+    if cached is not None:
+        return cached
+
     try:
         logger.debug(f"Fetching Hunter.io data for {email}")
-        url = f"https://api.hunter.io/v2/email-verifier?email={email}&api_key={api_key}"
-        response = _safe_get(url, timeout=10)
+        response = _api_get(
+            "api.hunter.io",
+            HUNTER_VERIFIER_URL,
+            params={"email": email, "api_key": api_key}, # codificati da requests (es. '+' e '&' nell'email)
+            timeout=10,
+        )
         response.raise_for_status()  # Solleva un'eccezione per status codes 4xx/5xx
         
-        if response.text:
-            hunter_data = response.json()
+        if response.content:
+            hunter_data = _json_body(response)
             logger.debug(f"Hunter.io response for {email}: {hunter_data}")
+            _cache_put("hunterio", email, hunter_data)
             return hunter_data
         logger.debug(f"Hunter.io returned empty response for {email}.")
         return {"error": "Empty response from Hunter.io"}
         
     except requests.exceptions.HTTPError as http_err:
-        logger.error(f"Hunter.io API HTTP error for {email}: {http_err} - Response: {response.text if 'response' in locals() else 'N/A'}")
-        return {"error": f"HTTP error {http_err.response.status_code} from Hunter.io: {response.text if 'response' in locals() else str(http_err)}"}
-    except requests.exceptions.ReadTimeout as e:
-        logger.error(f"Hunter.io API request timed out for {email}: {e}")
-        return {"error": f"Timeout error durning Hunter.io request: {str(e)}"}
+        # Il messaggio di raise_for_status contiene l'URL completo, api_key compresa
+        logger.error(f"Hunter.io API HTTP error for {email}: {_redact_secrets(http_err)} - Response: {response.text if 'response' in locals() else 'N/A'}")
+        return {"error": f"HTTP error {http_err.response.status_code} from Hunter.io: {response.text if 'response' in locals() else _redact_secrets(http_err)}"}
     except requests.exceptions.RequestException as req_err:
-        logger.error(f"Hunter.io API request error for {email}: {req_err}", exc_info=True)
-        return {"error": f"Request error during Hunter.io fetch: {str(req_err)}"}
+        # Niente exc_info: il traceback riporterebbe l'URL con api_key in chiaro
+        logger.error(f"Hunter.io API request error for {email}: {_redact_secrets(req_err)}")
+        return {"error": f"Request error during Hunter.io fetch: {_redact_secrets(req_err)}"}
     except json.JSONDecodeError as json_err:
         response_text = response.text if 'response' in locals() and hasattr(response, 'text') else 'N/A'
         logger.error(
@@ -149,17 +551,24 @@ def check_email_breaches(email: str, api_key: Optional[str]) -> List[Dict[str, A
         logger.info("HIBP API key not configured. Skipping breach check.")
         return [] # Restituisce lista vuota se la chiave non c'è
 
+    cached = _cache_get("hibp", email.strip())
+    if cached is not None:
+        return cached
+
     try:
         logger.debug(f"Checking HIBP for breaches for email: {email}")
-        response = _safe_get(
-            f"https://haveibeenpwned.com/api/v3/breachedaccount/{email.strip()}",
+        response = _api_get(
+            "haveibeenpwned.com",
+            f"https://haveibeenpwned.com/api/v3/breachedaccount/{quote(email.strip(), safe='')}",
             headers={"hibp-api-key": api_key, "User-Agent": "BrowsintOSINTTool/1.0"},
             timeout=15,
         )
         response.raise_for_status()
         if response.status_code == 200:
             logger.debug(f"HIBP data found for {email}")
-            return response.json()
+            breaches = _json_body(response)
+            _cache_put("hibp", email.strip(), breaches)
+            return breaches
         elif response.status_code == 404:
             logger.debug(f"No breaches found for {email} on HIBP (404).")
             return []
@@ -186,10 +595,84 @@ def check_email_breaches(email: str, api_key: Optional[str]) -> List[Dict[str, A
         return []
 
 # === WHOIS Client ===
+def _to_list(value: Any, transform: Callable[[Any], Any]) -> List[Any]:
+    '''
+    Funzione: _to_list
+    Normalizza un campo WHOIS che può essere un valore singolo o una lista, scartando gli elementi vuoti.
+    Parametri formali:
+        Any value -> Il valore grezzo (singolo, lista o tupla)
+        Callable transform -> Trasformazione applicata a ogni elemento
+    Valore di ritorno:
+        list[Any] -> La lista degli elementi trasformati
+    '''
+    if value is None:
+        return []
+    seq = value if isinstance(value, (list, tuple)) else (value,)
+    return [transform(x) for x in seq if x]
+
+
+def _lower_str(value: Any) -> str:
+    return str(value).lower()
+
+
+def _to_aware_utc(dt_val: Any) -> Optional[datetime]:
+    # Normalize to timezone-aware datetimes in UTC for safe comparisons
+    if isinstance(dt_val, datetime):
+        if dt_val.tzinfo is None:
+            return dt_val.replace(tzinfo=timezone.utc)
+        return dt_val.astimezone(timezone.utc)
+    # try parse ISO-like strings
+    try:
+        parsed = datetime.fromisoformat(str(dt_val))
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+WHOIS_CACHE_TTL = 3600 # Validità in secondi dei risultati WHOIS tenuti in memoria
+WHOIS_CACHE_MAXSIZE = 1024 # numero massimo di target in cache (LRU)
+_WHOIS_EXCLUDED_KEYS = frozenset({"status"}) # Campi WHOIS normalizzati a parte
+_whois_cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+_whois_cache_lock = threading.Lock()
+
+
 def fetch_whois(target: str) -> Dict[str, Any]:
     '''
     Funzione: _fetch_whois
     Recupera i dati WHOIS di un dominio o indirizzo IP utilizzando la libreria python-whois o ipwhois.
+    I risultati validi restano in memoria per WHOIS_CACHE_TTL secondi (al più WHOIS_CACHE_MAXSIZE target), così le lookup ripetute nella stessa sessione non interrogano di nuovo i registri.
+    Parametri formali:
+        str target -> Il dominio o indirizzo IP per cui recuperare i dati WHOIS
+    Valore di ritorno:
+        dict[str, Any] -> Un dizionario contenente i dati WHOIS o un errore
+    '''
+    with _whois_cache_lock:
+        entry = _whois_cache.get(target)
+        if entry is not None and time.time() - entry[0] < WHOIS_CACHE_TTL:
+            _whois_cache.move_to_end(target)
+        elif entry is not None:
+            del _whois_cache[target] # scaduto: libera subito la memoria
+            entry = None
+    if entry is not None:
+        logger.debug(f"WHOIS cache hit for {target}")
+        return copy.deepcopy(entry[1]) # copia: il chiamante può modificare il risultato
+
+    result = _lookup_whois(target)
+    if "error" not in result:
+        with _whois_cache_lock:
+            _whois_cache[target] = (time.time(), copy.deepcopy(result))
+            _whois_cache.move_to_end(target)
+            if len(_whois_cache) > WHOIS_CACHE_MAXSIZE:
+                _whois_cache.popitem(last=False)
+    return result
+
+
+def _lookup_whois(target: str) -> Dict[str, Any]:
+    '''
+    Funzione: _lookup_whois
+    Esegue la lookup WHOIS vera e propria (senza cache) per fetch_whois.
     Parametri formali:
         str target -> Il dominio o indirizzo IP per cui recuperare i dati WHOIS
     Valore di ritorno:
@@ -197,7 +680,6 @@ def fetch_whois(target: str) -> Dict[str, Any]:
     '''
     try:
         # Verifica se l'input è un IP
-        import ipaddress
         try:
             ip = ipaddress.ip_address(target)
             is_ip = True
@@ -250,73 +732,29 @@ def fetch_whois(target: str) -> Dict[str, Any]:
                 return {"error": "WHOIS lookup returned no data."}
 
             # Converti l'oggetto in dizionario se non lo è già
-            if not isinstance(whois_info, dict):
-                processed_info = {}
-                # Estrai solo gli attributi non nulli
-                for key, value in vars(whois_info).items():
-                    if value is not None and key != "status":  # Escludiamo lo status che gestiamo separatamente
-                        processed_info[key] = value
-            else:
-                processed_info = {k: v for k, v in whois_info.items() if v is not None and k != "status"}
+            # Estrai solo gli attributi non nulli, escludendo lo status che gestiamo separatamente
+            fields = whois_info.items() if isinstance(whois_info, dict) else whois_info.__dict__.items()
+            processed_info = {k: v for k, v in fields if v is not None and k not in _WHOIS_EXCLUDED_KEYS}
 
             # Gestisci lo status separatamente perché potrebbe essere una lista o una stringa
             status = whois_info.status
             if status:
-                if isinstance(status, (list, tuple)):
-                    processed_info["status"] = [str(s) for s in status if s]
-                else:
-                    processed_info["status"] = [str(status)]
-
-            # Standardizza i campi delle date
-            date_fields = ["creation_date", "expiration_date", "updated_date"]
-            for field in date_fields:
+                processed_info["status"] = _to_list(status, str)
+
+            # Standardizza i campi delle date (per le liste tiene la più recente)
+            for field in ("creation_date", "expiration_date", "updated_date"):
                 value = processed_info.get(field)
                 if not value:
                     continue
+                dates = [d for d in _to_list(value, _to_aware_utc) if d]
+                if dates:
+                    processed_info[field] = max(dates).isoformat()
 
-                # Normalize to timezone-aware datetimes in UTC for safe comparisons
-                def _to_aware_utc(dt_val):
-                    if isinstance(dt_val, datetime):
-                        if dt_val.tzinfo is None:
-                            return dt_val.replace(tzinfo=timezone.utc)
-                        return dt_val.astimezone(timezone.utc)
-                    # try parse ISO-like strings
-                    try:
-                        parsed = datetime.fromisoformat(str(dt_val))
-                        if parsed.tzinfo is None:
-                            return parsed.replace(tzinfo=timezone.utc)
-                        return parsed.astimezone(timezone.utc)
-                    except Exception:
-                        return None
-
-                if isinstance(value, (list, tuple)):
-                    dates = []
-                    for d in value:
-                        a = _to_aware_utc(d)
-                        if a:
-                            dates.append(a)
-                    if dates:
-                        processed_info[field] = max(dates).isoformat()
-                else:
-                    a = _to_aware_utc(value)
-                    if a:
-                        processed_info[field] = a.isoformat()
-
-            # Standardizza i name servers
-            name_servers = processed_info.get("name_servers", [])
-            if name_servers:
-                if isinstance(name_servers, (list, tuple)):
-                    processed_info["name_servers"] = [str(ns).lower() for ns in name_servers if ns]
-                else:
-                    processed_info["name_servers"] = [str(name_servers).lower()]
-
-            # Standardizza gli indirizzi email
-            emails = processed_info.get("emails", [])
-            if emails:
-                if isinstance(emails, (list, tuple)):
-                    processed_info["emails"] = [str(e).lower() for e in emails if e]
-                else:
-                    processed_info["emails"] = [str(emails).lower()]
+            # Standardizza i name servers e gli indirizzi email
+            for field in ("name_servers", "emails"):
+                value = processed_info.get(field)
+                if value:
+                    processed_info[field] = _to_list(value, _lower_str)
 
             if not any(processed_info.get(k) for k in ["domain_name", "registrar", "creation_date", "name_servers"]):
                 logger.warning(f"WHOIS lookup for {target} returned incomplete data.")
@@ -330,6 +768,10 @@ def fetch_whois(target: str) -> Dict[str, Any]:
         return {"error": f"WHOIS lookup failed: {str(e)}"}
 
 # === Shodan Client ===
+SHODAN_MAX_WORKERS = 16 # Thread massimi per le lookup Shodan per IP
+SHODAN_TRANSIENT_ERRORS = ("rate limit", "Unable to connect") # APIError che contano come guasto del servizio
+
+
 def fetch_shodan(ip_addresses: List[str], api_key: Optional[str]) -> Dict[str, Any]:
     '''
     Funzione: _fetch_shodan
@@ -346,54 +788,80 @@ def fetch_shodan(ip_addresses: List[str], api_key: Optional[str]) -> Dict[str, A
     if not ip_addresses:
         logger.debug("No IP addresses provided for Shodan lookup.")
         return {"info": "No IP addresses provided", "data_by_ip": {}, "summary": {}}
+    ip_addresses = list(dict.fromkeys(ip_addresses)) # Rimuove i duplicati mantenendo l'ordine: ogni IP costa un credito Shodan
 
     results: Dict[str, Any] = {
         "ips_queried": ip_addresses,
         "data_by_ip": {}, # Dati grezzi per ogni IP
-        "summary": {      # Riepilogo aggregato
-            "ports": set(),
-            "hostnames": set(),
-            "organizations": set(),
-            "isps": set(),
-            "vulnerabilities": set() # Per i CVE o 'vulns'
+        "summary": {      # Riepilogo aggregato (dict usati come set ordinati)
+            "ports": {},
+            "hostnames": {},
+            "organizations": {},
+            "isps": {},
+            "vulnerabilities": {} # Per i CVE o 'vulns'
         }
     }
 
+    try:
+        shodan = _load_shodan()
+    except ImportError as e:
+        logger.error(f"Shodan library not available: {e}")
+        return {"error": f"Shodan library not available: {e}"}
+
     try:
         logger.debug(f"Initializing Shodan API for IPs: {ip_addresses}")
         api = shodan.Shodan(api_key)
 
-        for ip in ip_addresses:
+        def _query_one(ip: str) -> Tuple[str, Dict[str, Any]]:
+            # Restituisce (ip, dati host) oppure (ip, dizionario di errore); gira in un thread del pool
+            breaker = _BREAKERS["api.shodan.io"]
             try:
                 logger.debug(f"Querying Shodan for IP: {ip}")
-                host_info = api.host(ip)
+                host_info = _cache_get("shodan", ip)
+                if host_info is None:
+                    if breaker.is_open():
+                        logger.warning(f"Circuit open for Shodan, skipping IP {ip}")
+                        return ip, {"error": "Shodan temporarily unavailable (circuit open)"}
+                    _LIMITERS["api.shodan.io"].acquire()
+                    host_info = api.host(ip)
+                    breaker.record_success()
+                    _cache_put("shodan", ip, host_info)
+                return ip, host_info
+            except shodan.APIError as e_ip: # Errore specifico per un IP (es. IP non trovato, rate limit)
+                logger.warning(f"Shodan API Error for IP {ip}: {e_ip}")
+                if any(marker in str(e_ip) for marker in SHODAN_TRANSIENT_ERRORS):
+                    breaker.record_failure()
+                return ip, {"error": str(e_ip), "status_code": e_ip.value if hasattr(e_ip, 'value') else None}
+            except Exception as e_host: # Errore generico per un singolo IP
+                breaker.record_failure()
+                logger.error(f"Unexpected error fetching Shodan data for IP {ip}: {e_host}", exc_info=True)
+                return ip, {"error": f"Unexpected error: {str(e_host)}"}
+
+        with ThreadPoolExecutor(max_workers=min(SHODAN_MAX_WORKERS, len(ip_addresses))) as executor:
+            futures = [executor.submit(_query_one, ip) for ip in ip_addresses]
+            for future in as_completed(futures):
+                ip, host_info = future.result()
                 results["data_by_ip"][ip] = host_info # Salva tutti i dati per quell'IP
+                if "error" in host_info:
+                    continue
 
-                # Aggiorna il riepilogo
+                # Aggiorna il riepilogo (nel thread principale, quindi senza lock)
+                summary = results["summary"]
                 if host_info.get("ports"):
-                    results["summary"]["ports"].update(host_info["ports"])
+                    summary["ports"].update(dict.fromkeys(host_info["ports"]))
                 if host_info.get("hostnames"):
-                    results["summary"]["hostnames"].update(host_info["hostnames"])
+                    summary["hostnames"].update(dict.fromkeys(host_info["hostnames"]))
                 if host_info.get("org"):
-                    results["summary"]["organizations"].add(host_info["org"])
+                    summary["organizations"][host_info["org"]] = None
                 if host_info.get("isp"):
-                    results["summary"]["isps"].add(host_info["isp"])
+                    summary["isps"][host_info["isp"]] = None
                 if host_info.get("vulns"): # 'vulns' è la chiave usata da Shodan per i CVE
-                    results["summary"]["vulnerabilities"].update(host_info["vulns"])
-            
-            except shodan.APIError as e_ip: # Errore specifico per un IP (es. IP non trovato, rate limit)
-                logger.warning(f"Shodan API Error for IP {ip}: {e_ip}")
-                results["data_by_ip"][ip] = {"error": str(e_ip), "status_code": e_ip.value if hasattr(e_ip, 'value') else None}
-            except Exception as e_host: # Errore generico per un singolo IP
-                logger.error(f"Unexpected error fetching Shodan data for IP {ip}: {e_host}", exc_info=True)
-                results["data_by_ip"][ip] = {"error": f"Unexpected error: {str(e_host)}"}
-        
-        # Converti i set in liste ordinate per la serializzazione JSON e una migliore leggibilità
-        results["summary"]["ports"] = sorted(list(results["summary"]["ports"]))
-        results["summary"]["hostnames"] = sorted(list(results["summary"]["hostnames"]))
-        results["summary"]["organizations"] = sorted(list(results["summary"]["organizations"]))
-        results["summary"]["isps"] = sorted(list(results["summary"]["isps"]))
-        results["summary"]["vulnerabilities"] = sorted(list(results["summary"]["vulnerabilities"]))
+                    summary["vulnerabilities"].update(dict.fromkeys(host_info["vulns"]))
+
+        # Converti i set in liste ordinate per la serializzazione JSON e una migliore leggibilità (un solo sort per campo)
+        summary = results["summary"]
+        for field in summary:
+            summary[field] = sorted(summary[field])
 
         logger.debug(f"Shodan lookup successful for IPs: {ip_addresses}")
         return results
@@ -406,6 +874,45 @@ def fetch_shodan(ip_addresses: List[str], api_key: Optional[str]) -> Dict[str, A
         return {"error": f"Unexpected Shodan client error: {str(e_main)}"}
 
 # === DNS Client ===
+# Formattazione delle risposte DNS per tipo di record; A, AAAA, NS, CNAME e PTR usano _dns_default
+def _dns_mx(answers: Iterable) -> List[str]:
+    return sorted([f"{r.preference} {str(r.exchange).rstrip('.')}" for r in answers])
+
+
+def _dns_soa(answers: Iterable) -> List[str]:
+    # Di solito c'è un solo record SOA
+    for r in answers:
+        return [
+            f"mname={str(r.mname).rstrip('.')} rname={str(r.rname).rstrip('.')} serial={r.serial} refresh={r.refresh} retry={r.retry} expire={r.expire} minimum={r.minimum}"
+        ]
+    return []
+
+
+def _dns_txt(answers: Iterable) -> List[str]:
+    # Concatena le stringhe TXT se sono spezzate (come da RFC)
+    return ["".join(s.decode("utf-8", "ignore") for s in r.strings) for r in answers]
+
+
+def _dns_srv(answers: Iterable) -> List[str]:
+    return sorted([f"priority={r.priority} weight={r.weight} port={r.port} target={str(r.target).rstrip('.')}" for r in answers])
+
+
+def _dns_caa(answers: Iterable) -> List[str]:
+    return [f"flags={r.flags} tag={r.tag.decode()} value=\"{r.value.decode()}\"" for r in answers]
+
+
+def _dns_default(answers: Iterable) -> List[str]:
+    return sorted([str(r).rstrip(".") for r in answers])
+
+
+_DNS_HANDLERS: Dict[str, Callable[[Iterable], List[str]]] = {
+    "MX": _dns_mx,
+    "SOA": _dns_soa,
+    "TXT": _dns_txt,
+    "SRV": _dns_srv,
+    "CAA": _dns_caa,
+}
+
 def fetch_dns_records(domain: str) -> Dict[str, List[str]]:
     '''
     Funzione: _fetch_dns_records
@@ -417,6 +924,7 @@ def fetch_dns_records(domain: str) -> Dict[str, List[str]]:
         dict[str, list[str]] -> Un dizionario contenente i record DNS per vari tipi (A, MX, TXT, ecc.)
     '''
     records: Dict[str, List[str]] = {}
+    dns_resolver = _load_dns_resolver()
     resolver = dns_resolver.Resolver()
     resolver.nameservers = ['8.8.8.8', '1.1.1.1', '9.9.9.9'] # Google, Cloudflare, Quad9
     resolver.timeout = 3.0 # Timeout per singola query
@@ -426,31 +934,26 @@ def fetch_dns_records(domain: str) -> Dict[str, List[str]]:
     record_types = ["A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME", "SRV", "CAA", "PTR"] # PTR è più per IP ma lo includo
     logger.debug(f"Fetching DNS records for domain: {domain} (Types: {', '.join(record_types)})")
 
-    for rtype in record_types:
+    def _resolve_one(rtype: str) -> Any:
+        # Restituisce le risposte o l'eccezione sollevata, gestita poi nell'ordine dei tipi
+        logger.debug(f"Querying {rtype} records for {domain}")
         try:
-            logger.debug(f"Querying {rtype} records for {domain}")
-            answers = resolver.resolve(domain, rtype)
-            current_rtype_records = []
-            if rtype == "MX":
-                current_rtype_records = sorted([f"{r.preference} {str(r.exchange).rstrip('.')}" for r in answers])
-            elif rtype == "SOA":
-                # Di solito c'è un solo record SOA
-                if answers:
-                    r = answers[0]
-                    current_rtype_records = [
-                        f"mname={str(r.mname).rstrip('.')} rname={str(r.rname).rstrip('.')} serial={r.serial} refresh={r.refresh} retry={r.retry} expire={r.expire} minimum={r.minimum}"
-                    ]
-            elif rtype == "TXT":
-                # Concatena le stringhe TXT se sono spezzate (come da RFC)
-                current_rtype_records = ["".join(s.decode("utf-8", "ignore") for s in r.strings) for r in answers]
-            elif rtype == "SRV":
-                current_rtype_records = sorted([f"priority={r.priority} weight={r.weight} port={r.port} target={str(r.target).rstrip('.')}" for r in answers])
-            elif rtype == "CAA":
-                current_rtype_records = [f"flags={r.flags} tag={r.tag.decode()} value=\"{r.value.decode()}\"" for r in answers]
-            elif rtype == "PTR" and domain.endswith(".in-addr.arpa"): # Solo per reverse DNS
-                 current_rtype_records = sorted([str(r).rstrip(".") for r in answers])
-            elif rtype != "PTR": # A, AAAA, NS, CNAME
-                current_rtype_records = sorted([str(r).rstrip(".") for r in answers])
+            return resolver.resolve(domain, rtype)
+        except Exception as e:
+            return e
+
+    # Le query sono indipendenti: partono tutte insieme, il tempo totale è quello della più lenta
+    with ThreadPoolExecutor(max_workers=len(record_types)) as executor:
+        outcomes = list(executor.map(_resolve_one, record_types))
+
+    for rtype, answers in zip(record_types, outcomes):
+        try:
+            if isinstance(answers, Exception):
+                raise answers
+            if rtype == "PTR" and not domain.endswith(".in-addr.arpa"): # PTR solo per reverse DNS
+                current_rtype_records = []
+            else:
+                current_rtype_records = _DNS_HANDLERS.get(rtype, _dns_default)(answers)
             
             if current_rtype_records:
                 records[rtype] = current_rtype_records
@@ -1,18 +1,82 @@
 # Contiene funzioni per manipolare o standardizzare i dati raccolti.
 
+import json
 from datetime import datetime
 from typing import Any
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps_json(item: Any) -> str:
+    """Serializza item in una stringa JSON, con orjson (in C) se disponibile.
+
+    Le chiavi non stringa vengono convertite come fa json.dumps; per ciò che orjson
+    rifiuta (es. interi oltre 64 bit) si ripiega su json.dumps.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(item)
+
+def loads_json(text: str | bytes) -> Any:
+    """Deserializza una stringa JSON, con orjson se disponibile (solleva json.JSONDecodeError se non valida)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text) # orjson.JSONDecodeError è una sottoclasse di json.JSONDecodeError
+    return json.loads(text)
+
+def _has_datetime(item: Any) -> bool:
+    """Verifica (con uno stack esplicito, senza ricorsione) se item contiene un datetime."""
+    stack = [item]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, datetime):
+            return True
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
 # Chiamato da json_serial in cli/scraper_cli.py per serializzare datetime
 def standardize_for_json(item: Any) -> Any:
-    """Standardizza i dati per la serializzazione JSON."""
+    """Standardizza i dati per la serializzazione JSON.
+
+    Se non ci sono datetime l'oggetto viene restituito così com'è; altrimenti viene
+    ricostruito iterativamente con i datetime convertiti in stringhe ISO.
+    """
+    if not _has_datetime(item):
+        return item
     if isinstance(item, datetime):
         return item.isoformat()
-    if isinstance(item, dict):
-        return {k: standardize_for_json(v) for k, v in item.items()}
-    if isinstance(item, list):
-        return [standardize_for_json(v) for v in item]
-    return item
+
+    root: Any = {} if isinstance(item, dict) else []
+    stack = [(item, root)]
+    while stack:
+        src, dst = stack.pop()
+        is_dict = isinstance(src, dict)
+        for key, value in (src.items() if is_dict else enumerate(src)):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, (dict, list)):
+                child: Any = {} if isinstance(value, dict) else []
+                stack.append((value, child))
+                value = child
+            if is_dict:
+                dst[key] = value
+            else:
+                dst.append(value)
+    return root
+
+_DOMAIN_WHOIS_KEYS = ("registrar", "creation_date", "expiration_date", "org") # Campi WHOIS copiati come stringhe
+
+def _as_str(value: Any) -> str:
+    """Converte value in stringa solo se non lo è già."""
+    return value if isinstance(value, str) else str(value)
 
 # Chiamato da OSINTExtractor per strutturare i dati grezzi
 def extract_structured_fields(data: dict[str, Any], source_type: str) -> dict[str, Any]:
@@ -29,25 +93,17 @@ def extract_structured_fields(data: dict[str, Any], source_type: str) -> dict[st
         structured: dict[str, Any] = {}
         if source_type == "domain":
             if whois_data := data.get("whois"):
-                structured.update(
-                    {
-                        "registrar": str(whois_data.get("registrar", "")),
-                        "creation_date": str(whois_data.get("creation_date", "")),
-                        "expiration_date": str(whois_data.get("expiration_date", "")),
-                        "domain_name": str(whois_data.get("domain_name", whois_data.get("domain", ""))),
-                        "org": str(whois_data.get("org", "")),
-                        "name_servers": whois_data.get("name_servers", [])
-                    }
-                )
+                for key in _DOMAIN_WHOIS_KEYS:
+                    structured[key] = _as_str(whois_data.get(key) or "")
+                structured["domain_name"] = _as_str(whois_data.get("domain_name", whois_data.get("domain", "")))
+                structured["name_servers"] = whois_data.get("name_servers", [])
             if shodan_data := data.get("shodan"):
                 structured.update(
-                    {
-                        "ip": shodan_data.get("ip_str", ""),
-                        "ports": shodan_data.get("ports", []),
-                        "hostnames": shodan_data.get("hostnames", []),
-                        "isp": shodan_data.get("isp", ""),
-                        "org": shodan_data.get("org", "")
-                    }
+                    ip=shodan_data.get("ip_str", ""),
+                    ports=shodan_data.get("ports", []),
+                    hostnames=shodan_data.get("hostnames", []),
+                    isp=shodan_data.get("isp", ""),
+                    org=shodan_data.get("org", ""),
                 )
             if dns_data := data.get("dns"):
                 structured["dns_records"] = dns_data
@@ -68,10 +124,12 @@ def extract_structured_fields(data: dict[str, Any], source_type: str) -> dict[st
         elif source_type == "email":
             if hunter_info := data.get("hunterio"):
                 hunter_data_content = hunter_info.get("data", hunter_info)
-                structured["hunterio_status"] = hunter_data_content.get("status", hunter_data_content.get("result"))
-                structured["hunterio_score"] = hunter_data_content.get("score", 0)
-                structured["hunterio_disposable"] = hunter_data_content.get("disposable", False)
-                structured["hunterio_webmail"] = hunter_data_content.get("webmail", False)
+                structured.update(
+                    hunterio_status=hunter_data_content.get("status", hunter_data_content.get("result")),
+                    hunterio_score=hunter_data_content.get("score", 0),
+                    hunterio_disposable=hunter_data_content.get("disposable", False),
+                    hunterio_webmail=hunter_data_content.get("webmail", False),
+                )
 
             if breaches_info := data.get("breaches"):
                 if isinstance(breaches_info, list):
@@ -84,7 +142,7 @@ def extract_structured_fields(data: dict[str, Any], source_type: str) -> dict[st
         elif source_type == "social":
             if profiles_data := data.get("profiles"):
                 found_profiles = {
-                    platform: details.get("url")
+                    platform: details["url"]
                     for platform, details in profiles_data.items()
                     if details.get("exists")
                 }
@@ -3,71 +3,201 @@
 import re
 import phonenumbers
 import logging
-from typing import Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Set
+
+try:
+    import re2 # google-re2: motore DFA a tempo lineare, usato per la scansione dell'intero testo
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
 
 logger = logging.getLogger("osint.extractors")
 
-# Chiamato da OSINTExtractor per estrarre email
-def extract_emails(text: str) -> set:
+# === Pattern precompilati (compilati una sola volta all'import del modulo) ===
+# EMAIL_RE e i pattern dei contatti (più sotto) scorrono l'intera pagina: con re2 la scansione resta lineare anche su testi enormi.
+# Gli altri pattern lavorano su stringhe brevi e SEQ_RE usa lookahead non supportati da RE2.
+_EMAIL_PATTERN = r'\b[A-Za-z0-9][A-Za-z0-9._%+-]{1,64}@(?:[A-Za-z0-9-]{1,63}\.){1,8}[A-Za-z]{2,63}\b'
+EMAIL_RE = re2.compile(_EMAIL_PATTERN) if RE2_AVAILABLE else re.compile(_EMAIL_PATTERN)
+r'''
+Pattern regex per identificare indirizzi email:
+- \b[A-Za-z0-9][A-Za-z0-9._%+-]{1,64} - Inizia con un carattere alfanumerico seguito da uno o più caratteri alfanumerici, punti, trattini o underscore
+- @ - Segue il simbolo @
+- (?:[A-Za-z0-9-]{1,63}\.){1,8} - Segue uno o più domini, ciascuno composto da 1 a 63 caratteri alfanumerici o trattini, seguito da un punto
+- [A-Za-z]{2,63} - Termina con un dominio di primo livello di 2 a 63 caratteri alfanumerici
+- \b - Assicura che l'email sia delimitata da spazi o altri caratteri non alfanumerici
+- Il pattern è progettato per essere flessibile e catturare la maggior parte degli indirizzi email validi, POTREBBE INCLUDERE FALSI POSITIVI!
+'''
+
+EXCLUDED_LOCAL_RES = (
+    re.compile(r'^[0-9a-f]{32}@'), # MD5 hash pattern
+    re.compile(r'^[0-9a-f]{8}[0-9a-f]{4}[0-9a-f]{4}[0-9a-f]{4}[0-9a-f]{12}@'), # UUID pattern
+)
+
+# Pattern regex per identificare local part che sembrano ID univoci o hash
+UUID_RE = re.compile(r'[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}', re.IGNORECASE)
+LONG_HEX_RE = re.compile(r'[0-9a-f]{12,64}', re.IGNORECASE)
+r'''
+Pattern regex per identificare local part che sembrano UUID o lunghe stringhe esadecimali:
+- [0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}:
+    - Inizia con 8 caratteri esadecimali, seguiti da un trattino opzionale
+    - Poi 4 caratteri esadecimali, un altro trattino opzionale
+    - Poi 4 caratteri esadecimali, un altro trattino opzionale
+    - Poi 4 caratteri esadecimali, un altro trattino opzionale
+    - Infine 12 caratteri esadecimali
+- [0-9a-f]{12,64}:
+    - Da 12 a 64 caratteri esadecimali, senza trattini
+I pattern non hanno ancore: vanno usati con fullmatch, che verifica l'intera stringa
+Questi pattern sono progettati per catturare local part che sembrano UUID o hash
+'''
+
+DATE_RES = tuple(re.compile(p) for p in (
+    r'20\d{6}',
+    r'\d{8}',
+    r'\d{6}',
+    r'20\d{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])',
+    r'(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])20\d{2}',
+    r'(19|20)\d{2}\d{4}'
+))
+r'''
+Pattern regex per identificare date in formato:
+- 20\d{6}: Anno 20xx seguito da 6 cif
+- \d{8}: 8 cifre consecutive (potrebbe essere una data)
+- \d{6}: 6 cifre consecutive (potrebbe essere una data)
+- 20\d{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01]):
+    - Anno 20xx seguito da mese (01-12) e giorno (01-31)
+- (0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])20\d{2}:
+    - Mese (01-12) e giorno (01-31) seguito da anno 20xx
+- (19|20)\d{2}\d{4}:
+    - Anno 19xx o 20xx seguito da 4 cifre (potrebbe essere un numero di telefono o un codice)
+Questi pattern sono progettati per catturare date in vari formati comuni, ma potrebbero includere falsi positivi.
+'''
+
+IP_RE = re.compile(r'\d{1,3}(\.\d{1,3}){3}')
+r'''
+Pattern regex per identificare indirizzi IP:
+- \d{1,3}(\.\d{1,3}){3}:
+    - Inizia con 1-3 cifre, seguite da un punto e altre 1-3 cifre, ripetuto 3 volte
+    - Cattura indirizzi IP in formato IPv4, ma potrebbe includere falsi positivi
+'''
+
+SEQ_RE = re.compile(r'(?:0(?=1)|1(?=2)|2(?=3)|3(?=4)|4(?=5)|5(?=6)|6(?=7)|7(?=8)|8(?=9)){5,}\d')
+r'''
+Pattern regex per identificare sequenze numeriche:
+- (?:0(?=1)|1(?=2)|2(?=3)|3(?=4)|4(?=5)|5(?=6)|6(?=7)|7(?=8)|8(?=9)){5,}\d:
+    - Cattura sequenze numeriche in cui ogni cifra è seguita dalla successiva
+    - Ad esempio, "0123456789" o "1234567890"
+    - Il pattern è progettto per identificare sequenze numeriche lunghe, ma potrebbe includere falsi positivi
+'''
+
+EXCLUDED_DOMAINS = frozenset({
+    'example.com', 'domain.com', 'yoursite.com', 'yourdomain.com',
+    'example.org', 'email.com', 'test.com', 'sample.com'
+}) # Domini comuni di esempio o generici da escludere
+
+EXCLUDED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.css', '.js', '.pdf', '.doc', '.mp3', '.mp4') # tuple per str.endswith
+
+# Alternanza unica di tutti i pattern di date e della sequenza numerica, da usare con fullmatch:
+# filter_phone_numbers esegue un solo match per numero invece di uno per pattern
+EXCLUDE_PHONE_RE = re.compile('|'.join(p.pattern for p in (*DATE_RES, SEQ_RE)))
+
+_NONDIGIT_RE = re.compile(r'[^0-9]') # Rimuove in C tutto ciò che non è una cifra ASCII
+# Almeno 7 caratteri tra cifre e separatori tipici di un numero (anche la / di "06/1234567").
+# Nessun a capo tra i separatori: un candidato non deve unire numeri di righe diverse. In RE2 \d è solo ASCII, \p{Nd} tiene le cifre Unicode.
+_PHONE_DIGIT = r'\p{Nd}' if RE2_AVAILABLE else r'\d'
+# Separatori accettati anche da PhoneNumberMatcher: NBSP (da &nbsp;), spazio ideografico, trattini Unicode
+# (U+2010-U+2015, meno U+2212) e le varianti a larghezza piena. Caratteri letterali, non escape \u: RE2 non li supporta.
+_PHONE_SEPARATORS = ' \t\u00a0\u3000().+/\\-\u2010-\u2015\u2212\uff08\uff09\uff0d-\uff0f'
+_PHONE_CANDIDATE_PATTERN = _PHONE_DIGIT + r'[' + _PHONE_DIGIT + _PHONE_SEPARATORS + r']{5,}' + _PHONE_DIGIT
+# Email e candidati telefono in un'unica alternanza con gruppi nominati: una sola scansione del testo per entrambi
+_CONTACT_PATTERN = r'(?P<email>' + _EMAIL_PATTERN + r')|' + '(?P<phone>[+\uff0b]?' + _PHONE_CANDIDATE_PATTERN + r')'
+# Entrambi scorrono l'intera pagina come EMAIL_RE: con re2 la scansione resta lineare
+_PHONE_CANDIDATE_RE = re2.compile(_PHONE_CANDIDATE_PATTERN) if RE2_AVAILABLE else re.compile(_PHONE_CANDIDATE_PATTERN)
+_CONTACT_RE = re2.compile(_CONTACT_PATTERN) if RE2_AVAILABLE else re.compile(_CONTACT_PATTERN)
+
+# Domini di servizio noti che spesso non sono contatti utili
+SERVICE_DOMAINS = frozenset({
+    'sentry.io',
+    'sentry.wixpress.com',
+    'sentry-next.wixpress.com',
+    'contactprivacy.com',
+    'whois.tucows.com',
+    'domainsbyproxy.com',
+    'secureserver.net',
+    'hostmaster.sk',
+    'nic.it',
+    # Aggiungere altri domini di servizio o proxy noti qui
+})
+
+# Termini comuni nella local part che indicano un contatto legittimo
+MEANINGFUL_TERMS = frozenset({'info', 'contact', 'support', 'hello', 'sales', 'admin', 'contatti', 'assistenza', 'ufficio', 'office', 'segreteria', 'privacy', 'legal', 'team', 'staff', 'help', 'customer', 'clienti', 'richieste', 'richiesta', 'richieste generali', 'partnerships', 'marketing'})
+# Un'unica alternanza compilata verifica tutti i termini in una sola passata sulla local part
+MEANINGFUL_TERMS_RE = re.compile('|'.join(re.escape(t) for t in sorted(MEANINGFUL_TERMS, key=len, reverse=True)))
+
+
+def _filter_candidates(candidates: Iterable[str]) -> Iterator[str]:
     '''
-    Funzione: _extract_emails
-    Estrae indirizzi email da una stringa di testo con logica di validazione e filtro per i falsi positivi.
+    Funzione: _filter_candidates
+    Filtra i candidati trovati da EMAIL_RE scartando i falsi positivi (nomi di file, hash, domini di esempio, local part ripetitive).
+    È il ciclo caldo di extract_emails: tiene in variabili locali i riferimenti usati a ogni iterazione.
     Parametri formali:
-        self -> Riferimento all'istanza della classe
-        str text -> La stringa di testo da cui estrarre le email
+        Iterable[str] candidates -> Le stringhe trovate dalla regex
     Valore di ritorno:
-        set -> Un set contenente gli indirizzi email unici e validi trovati
-    '''
-    email_pattern = r'\b[A-Za-z0-9][A-Za-z0-9._%+-]{1,64}@(?:[A-Za-z0-9-]{1,63}\.){1,8}[A-Za-z]{2,63}\b' 
-    
-    '''
-    Pattern regex per identificare indirizzi email:
-    - \b[A-Za-z0-9][A-Za-z0-9._%+-]{1,64} - Inizia con un carattere alfanumerico seguito da uno o più caratteri alfanumerici, punti, trattini o underscore
-    - @ - Segue il simbolo @
-    - (?:[A-Za-z0-9-]{1,63}\.){1,8} - Segue uno o più domini, ciascuno composto da 1 a 63 caratteri alfanumerici o trattini, seguito da un punto
-    - [A-Za-z]{2,63} - Termina con un dominio di primo livello di 2 a 63 caratteri alfanumerici
-    - \b - Assicura che l'email sia delimitata da spazi o altri caratteri non alfanumerici
-    - Il pattern è progettato per essere flessibile e catturare la maggior parte degli indirizzi email validi, POTREBBE INCLUDERE FALSI POSITIVI!
+        Iterator[str] -> Le email valide, in minuscolo, una alla volta (possono ripetersi)
     '''
-    excluded_domains = [
-        'example.com', 'domain.com', 'yoursite.com', 'yourdomain.com',
-        'example.org', 'email.com', 'test.com', 'sample.com' 
-    ] # Domini comuni di esempio o generici da escludere
+    excluded_exts = EXCLUDED_EXTENSIONS
+    excluded_domains = EXCLUDED_DOMAINS
+    excluded_local_res = EXCLUDED_LOCAL_RES
 
-    excluded_patterns = [
-        r'^[0-9a-f]{32}@', # MD5 hash pattern
-        r'^[0-9a-f]{8}[0-9a-f]{4}[0-9a-f]{4}[0-9a-f]{4}[0-9a-f]{12}@', # UUID pattern
-    ]
-
-    excluded_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.css', '.js', '.pdf', '.doc', '.mp3', '.mp4']
-
-    emails = set()
-    for e in re.findall(email_pattern, text): # trova tutte le regex nel text 
+    for e in candidates:
         e_lower = e.lower()
+        local_part, _, domain_part = e_lower.partition('@') # Parte locale e dominio con un solo split
 
-        if any(ext in e_lower for ext in excluded_extensions): 
+        # Nomi di file scambiati per email (es. logo@2x.png): l'estensione chiude il dominio o la parte locale
+        if e_lower.endswith(excluded_exts) or local_part.endswith(excluded_exts):
             continue
 
-        should_skip = False
-        for pattern in excluded_patterns:
-            if re.match(pattern, e_lower):
-                should_skip = True
-                break
-
-        if should_skip:
+        if any(pattern.match(e_lower) for pattern in excluded_local_res):
             continue
 
-        domain_part = e_lower.split('@')[1] # Ottieni la parte del dominio dell'email
-        if any(domain_part == excl_domain for excl_domain in excluded_domains): 
+        if domain_part in excluded_domains:
             continue
 
-        local_part = e_lower.split('@')[0] # Ottieni la parte locale dell'email
         if len(set(local_part)) <= 2 and len(local_part) > 4:
             continue
 
-        emails.add(e_lower) # aggiunge l'email al set se supera i controlli
+        yield e_lower # l'email supera i controlli
+
+
+def extract_emails_iter(text: str) -> Iterator[str]:
+    '''
+    Funzione: extract_emails_iter
+    Versione in streaming di extract_emails: restituisce le email valide man mano che vengono trovate,
+    così il chiamante può accumularle direttamente nel proprio set (es. emails.update(extract_emails_iter(text))).
+    Parametri formali:
+        str text -> La stringa di testo da cui estrarre le email
+    Valore di ritorno:
+        Iterator[str] -> Le email valide in minuscolo (possono ripetersi)
+    '''
+    if '@' not in text: # Nessuna email possibile: evita la scansione regex dell'intero testo
+        return
+    # finditer produce i candidati uno alla volta: nessuna lista intermedia di tutte le corrispondenze
+    yield from _filter_candidates(m.group(0) for m in EMAIL_RE.finditer(text))
+
+
+# Chiamato da OSINTExtractor per estrarre email
+def extract_emails(text: str) -> set:
+    '''
+    Funzione: _extract_emails
+    Estrae indirizzi email da una stringa di testo con logica di validazione e filtro per i falsi positivi.
+    Parametri formali:
+        self -> Riferimento all'istanza della classe
+        str text -> La stringa di testo da cui estrarre le email
+    Valore di ritorno:
+        set -> Un set contenente gli indirizzi email unici e validi trovati
+    '''
+    return set(extract_emails_iter(text))
 
-    return emails
 
 def filter_emails(emails: Set[str], domain: str, logger: logging.Logger, keep_service_emails: bool = False) -> Set[str]:
     '''
@@ -88,166 +218,147 @@ def filter_emails(emails: Set[str], domain: str, logger: logging.Logger, keep_se
     filtered_emails: Set[str] = set() # Inizializza un set per le email filtrate
     original_count = len(emails) # conta le email originali
     removed_count = 0
-
-    # Domini di servizio noti che spesso non sono contatti utili
-    service_domains = {
-        'sentry.io',
-        'sentry.wixpress.com',
-        'sentry-next.wixpress.com',
-        'contactprivacy.com',
-        'whois.tucows.com',
-        'domainsbyproxy.com',
-        'secureserver.net',
-        'hostmaster.sk',
-        'nic.it',
-        # Aggiungere altri domini di servizio o proxy noti qui
-    }
-
-    # Pattern regex per identificare local part che sembrano ID univoci o hash
-    uuid_pattern = re.compile(r'^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$', re.IGNORECASE)
-    long_hex_pattern = re.compile(r'^[0-9a-f]{12,64}$', re.IGNORECASE)
-
-    '''
-    Pattern regex per identificare local part che sembrano UUID o lunghe stringhe esadecimali:
-    - ^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$:
-        - Inizia con 8 caratteri esadecimali, seguiti da un trattino opzionale
-        - Poi 4 caratteri esadecimali, un altro trattino opzionale
-        - Poi 4 caratteri esadecimali, un altro trattino opzionale
-        - Poi 4 caratteri esadecimali, un altro trattino opzionale
-        - Infine 12 caratteri esadecimali
-    - ^[0-9a-f]{12,64}$:
-        - Inizia con 12 a 64 caratteri esadecimali, senza trattini
-    Questi pattern sono progettati per catturare local part che sembrano UUID o hash
-    '''
-    
-    # Termini comuni nella local part che indicano un contatto legittimo
-    meaningful_terms = {'info', 'contact', 'support', 'hello', 'sales', 'admin', 'contatti', 'assistenza', 'ufficio', 'office', 'segreteria', 'privacy', 'legal', 'team', 'staff', 'help', 'customer', 'clienti', 'richieste', 'richiesta', 'richieste generali', 'partnerships', 'marketing'}
+    # Contatori per categoria: un solo messaggio di debug a fine ciclo invece di uno per email
+    cnt_invalid = cnt_service = cnt_pattern = cnt_domain = cnt_meaningful = cnt_unmatched = 0
 
     # Normalizza il dominio per confronto
     normalized_domain = domain.lower()
-    # Considera anche sottodomini comuni come mail.dominio.com
-    normalized_mail_domain = f"mail.{normalized_domain}"
-    # Potresti voler considerare anche il dominio senza www se presente
-    normalized_domain_no_www = normalized_domain.replace("www.", "")
+    # Domini considerati interni: il dominio, il sottodominio mail.dominio.com e il dominio senza www
+    target_domains = frozenset(filter(None, (
+        normalized_domain,
+        f"mail.{normalized_domain}",
+        normalized_domain.replace("www.", ""),
+    )))
 
 
     for email in emails:
-        try:
-            # Assicurati che l'email abbia il formato atteso prima di splittare
-            if '@' not in email:
-                logger.debug(f"Skipping invalid email format during filtering: {email}")
-                removed_count += 1
-                continue
-
-            local_part, email_domain = email.split('@', 1)
-            local_part = local_part.lower()
-            email_domain = email_domain.lower()
-
-            # --- Regole di ESCLUSIONE ---
+        # Un solo lower() e un solo split per email (extract_emails restituisce già email minuscole)
+        local_part, _, email_domain = email.lower().partition('@')
+        if not email_domain: # Formato non valido: manca la '@'
+            cnt_invalid += 1
+            removed_count += 1
+            continue
 
-            # Escludi domini di servizio, a meno che non sia specificato di mantenerli
-            if email_domain in service_domains:
-                if not keep_service_emails: # Usa il parametro passato
-                    logger.debug(f"Filtering out service domain email: {email}")
-                    removed_count += 1
-                    continue
+        # Ordine dei controlli dal più frequente al più costoso: la maggior parte delle email
+        # appartiene al dominio del sito e viene accettata con un solo lookup nel set
 
-            # Escludi local part che sembrano UUID o lunghe stringhe esadecimali
-            if uuid_pattern.match(local_part) or long_hex_pattern.match(local_part):
-                 logger.debug(f"Filtering out email with pattern-like local part: {email}")
-                 removed_count += 1
-                 continue
-
-            # Aggiungi altre regole di esclusione se necessario (es. local part molto corte e generiche)
-            # if len(local_part) < 3 and local_part in {'a', 'test', 'user'}:
-            #    logger.debug(f"Filtering out short/generic local part email: {email}")
-            #    removed_count += 1
-            #    continue
-
-
-            # --- Regole di INCLUSIONE ---
-            # Se l'email non è stata esclusa, valutiamo se includerla
-
-            # Includi email che appartengono al dominio target o sottodomini comuni di mail
-            # Confronta anche con il dominio senza www
-            if email_domain == normalized_domain or \
-               email_domain == normalized_mail_domain or \
-               email_domain == normalized_domain_no_www:
-                logger.debug(f"Including email matching target domain: {email}")
-                filtered_emails.add(email)
-                continue
+        # Includi email che appartengono al dominio target o sottodomini comuni di mail
+        # Confronta anche con il dominio senza www
+        if email_domain in target_domains:
+            cnt_domain += 1
+            filtered_emails.add(email)
+            continue
 
-            # Includi email la cui local part contiene termini significativi
-            if any(term in local_part for term in meaningful_terms):
-                logger.debug(f"Including email with meaningful term in local part: {email}")
-                filtered_emails.add(email)
+        # Escludi domini di servizio, a meno che non sia specificato di mantenerli
+        if email_domain in SERVICE_DOMAINS:
+            if not keep_service_emails: # Usa il parametro passato
+                cnt_service += 1
+                removed_count += 1
                 continue
 
-            # Se l'email non è stata esclusa e non rientra nelle regole di inclusione esplicita,
-            # per default NON la aggiungiamo al set filtrato.
-            logger.debug(f"Filtering out email that did not match inclusion criteria: {email}")
-            removed_count += 1
-
+        # Includi email la cui local part contiene termini significativi
+        # (nessun termine è esadecimale puro: le regex UUID/hex non potrebbero comunque escluderle)
+        if MEANINGFUL_TERMS_RE.search(local_part):
+            cnt_meaningful += 1
+            filtered_emails.add(email)
+            continue
 
-        except Exception as e:
-            # Gestisci eventuali errori durante l'elaborazione di una singola email
-            logger.error(f"Error processing email {email} during filtering: {e}", exc_info=True)
+        # Escludi local part che sembrano UUID o lunghe stringhe esadecimali
+        if UUID_RE.fullmatch(local_part) or LONG_HEX_RE.fullmatch(local_part):
+            cnt_pattern += 1
             removed_count += 1
-            continue # Salta questa email
+            continue
 
+        # Aggiungi altre regole di esclusione se necessario (es. local part molto corte e generiche)
+        # if len(local_part) < 3 and local_part in {'a', 'test', 'user'}:
+        #    logger.debug(f"Filtering out short/generic local part email: {email}")
+        #    removed_count += 1
+        #    continue
+
+        # Se l'email non è stata esclusa e non rientra nelle regole di inclusione esplicita,
+        # per default NON la aggiungiamo al set filtrato.
+        cnt_unmatched += 1
+        removed_count += 1
+
+    logger.debug(
+        "filter_emails: invalid=%d service=%d pattern=%d unmatched=%d domain=%d meaningful=%d",
+        cnt_invalid, cnt_service, cnt_pattern, cnt_unmatched, cnt_domain, cnt_meaningful
+    )
     logger.info(f"Email filtering completed. Original: {original_count}, Removed: {removed_count}, Filtered: {len(filtered_emails)}")
 
     return filtered_emails
 
+# ccTLD nazionali usati come domini generici da siti senza legami con il paese (.io, .co, .tv, ...):
+# la regione del TLD darebbe un prefisso sbagliato ai numeri in formato nazionale
+VANITY_CCTLDS = frozenset({
+    'AC', 'AI', 'AM', 'AS', 'BZ', 'CC', 'CO', 'CX', 'FM', 'GD', 'GG', 'GS', 'IM',
+    'IO', 'LA', 'LY', 'ME', 'MS', 'MU', 'NU', 'PW', 'SC', 'SH', 'ST', 'TK', 'TO', 'TV', 'VC', 'VG', 'WS',
+})
+
+def region_for_domain(domain: str | None) -> str | None:
+    '''
+    Funzione: region_for_domain
+    Ricava la regione telefonica predefinita dal TLD nazionale di un dominio (es. esempio.it -> 'IT').
+    Parametri formali:
+        str | None domain -> Il dominio del sito analizzato
+    Valore di ritorno:
+        str | None -> Il codice regione ISO supportato da phonenumbers, None per TLD generici (.com, .org, ...) e ccTLD "di fantasia" (.io, .co, ...)
+    '''
+    if not domain:
+        return None
+    host = domain.partition(':')[0].rstrip('.') # netloc può contenere la porta
+    tld = host.rpartition('.')[2].upper()
+    if tld == 'UK': # unico ccTLD diverso dal codice ISO
+        tld = 'GB'
+    if tld in VANITY_CCTLDS:
+        return None
+    return tld if tld in phonenumbers.SUPPORTED_REGIONS else None
+
 # Chiamato da OSINTExtractor per estrarre numeri di telefono
-def extract_phone_numbers(text: str) -> set[str]:
+def extract_phone_numbers(text: str, default_region: str | None = None) -> set[str]:
     '''
     Estrae potenziali numeri di telefono da una stringa di testo.
     Args:
         text: La stringa di testo da cui estrarre i numeri
+        default_region: Regione per i numeri senza prefisso internazionale (es. 'IT', vedi region_for_domain)
     Returns:
         set[str]: Set di numeri di telefono formattati
     '''
     logger.debug("Starting phone number extraction using phonenumbers.")
     found_phones = set()
 
+    # PhoneNumberMatcher è una macchina a stati in Python puro: si salta se non c'è nessuna sequenza simile a un numero.
+    # Il pre-filtro deve accettare ogni separatore che il matcher riconosce (vedi _PHONE_SEPARATORS), o perde numeri.
+    if not _PHONE_CANDIDATE_RE.search(text):
+        return found_phones
+
     try:
-        matcher = phonenumbers.PhoneNumberMatcher(text, None)
+        # Leniency.POSSIBLE restituisce già solo numeri possibili: la validazione completa sui metadati non serve per i candidati
+        matcher = phonenumbers.PhoneNumberMatcher(text, default_region, leniency=phonenumbers.Leniency.POSSIBLE)
+        log_validity = logger.isEnabledFor(logging.DEBUG) # is_valid_number è costoso: solo se il debug è attivo
 
         for match in matcher:
             try:
                 phone_number = match.number
 
-                if phonenumbers.is_possible_number(phone_number):
-                    if phone_number.country_code and phone_number.national_number:
-                        try:
-                            # Prova prima formato E164
-                            formatted = phonenumbers.format_number(
-                                phone_number, 
-                                phonenumbers.PhoneNumberFormat.E164
-                            )
-                        except phonenumbers.NumberParseException:
-                            # Fallback su formato internazionale
-                            formatted = phonenumbers.format_number(
-                                phone_number,
-                                phonenumbers.PhoneNumberFormat.INTERNATIONAL
-                            )
-
-                        found_phones.add(formatted)
+                if phone_number.country_code and phone_number.national_number:
+                    # format_number lavora su un numero già analizzato e non solleva NumberParseException
+                    formatted = phonenumbers.format_number(phone_number, phonenumbers.PhoneNumberFormat.E164)
+
+                    found_phones.add(formatted)
+                    if log_validity:
                         logger.debug(
-                            f"Phone extracted: {formatted} "
-                            f"(Valid: {phonenumbers.is_valid_number(phone_number)})"
+                            "Phone extracted: %s (Valid: %s)",
+                            formatted, phonenumbers.is_valid_number(phone_number)
                         )
-                    else:
-                        # Gestione numeri senza prefisso internazionale
-                        cleaned_str = ''.join(filter(str.isdigit, str(match.raw_string)))
-                        if len(cleaned_str) >= 7:
-                            found_phones.add(cleaned_str)
-                            logger.debug(
-                                f"Added phone without country code: {cleaned_str}"
-                            )
                 else:
-                    logger.debug(f"Invalid phone match: {match.raw_string}")
+                    # Gestione numeri senza prefisso internazionale
+                    cleaned_str = _NONDIGIT_RE.sub('', str(match.raw_string))
+                    if len(cleaned_str) >= 7:
+                        found_phones.add(cleaned_str)
+                        logger.debug(
+                            "Added phone without country code: %s", cleaned_str
+                        )
 
             except Exception as e:
                 logger.warning(f"Error processing phone match: {e}")
@@ -257,7 +368,7 @@ def extract_phone_numbers(text: str) -> set[str]:
         logger.error(f"Phone extraction failed: {e}")
         return set()
 
-    logger.debug(f"Phone extraction completed. Found: {len(found_phones)}")
+    logger.debug("Phone extraction completed. Found: %d", len(found_phones))
     return found_phones
 
 def filter_phone_numbers(phone_numbers: set) -> set:
@@ -271,68 +382,16 @@ def filter_phone_numbers(phone_numbers: set) -> set:
     '''
     filtered_phones = set()
 
-    date_patterns = [
-        r'^20\d{6}$',
-        r'^\d{8}$',
-        r'^\d{6}$',
-        r'^20\d{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])$',
-        r'^(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])20\d{2}$',
-        r'^(19|20)\d{2}\d{4}$'
-    ]
-
-    ''' 
-    Pattern regex per identificare date in formato:
-    - ^20\d{6}$: Anno 20xx seguito da 6 cif
-    - ^\d{8}$: 8 cifre consecutive (potrebbe essere una data)
-    - ^\d{6}$: 6 cifre consecutive (potrebbe essere una data)
-    - ^20\d{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])$:
-        - Anno 20xx seguito da mese (01-12) e giorno (01-31)
-    - ^(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])20\d{2}$:
-        - Mese (01-12) e giorno (01-31) seguito da anno 20xx
-    - ^(19|20)\d{2}\d{4}$:
-        - Anno 19xx o 20xx seguito da 4 cifre (potrebbe essere un numero di telefono o un codice)
-    Questi pattern sono progettati per catturare date in vari formati comuni, ma potrebbero includere falsi positivi.
-    '''
-    ip_pattern = r'^\d{1,3}(\.\d{1,3}){3}$'
-
-    '''
-    Pattern regex per identificare indirizzi IP:
-    - ^\d{1,3}(\.\d{1,3}){3}$:
-        - Inizia con 1-3 cifre, seguite da un punto e altre 1-3 cifre, ripetuto 3 volte
-        - Cattura indirizzi IP in formato IPv4, ma potrebbe includere falsi positivi
-    '''
-    sequential_pattern = r'^(?:0(?=1)|1(?=2)|2(?=3)|3(?=4)|4(?=5)|5(?=6)|6(?=7)|7(?=8)|8(?=9)){5,}\d$'
-    
-    '''
-    Pattern regex per identificare sequenze numeriche:
-    - ^(?:0(?=1)|1(?=2)|2(?=3)|3(?=4)|4(?=5)|5(?=6)|6(?=7)|7(?=8)|8(?=9)){5,}\d$:
-        - Cattura sequenze numeriche in cui ogni cifra è seguita dalla successiva
-        - Ad esempio, "0123456789" o "1234567890"
-        - Il pattern è progettto per identificare sequenze numeriche lunghe, ma potrebbe includere falsi positivi
-    '''
-
     for phone in phone_numbers:
-        # Gestione del doppio + all'inizio
-        if phone.startswith('++'):
-            cleaned = '+' + ''.join(filter(str.isdigit, phone[2:]))
-        elif phone.startswith('+'):
-            cleaned = '+' + ''.join(filter(str.isdigit, phone[1:]))
-        else:
-            cleaned = ''.join(filter(str.isdigit, phone))
-
-        should_exclude = False
-        for pattern in date_patterns:
-            if re.match(pattern, cleaned):
-                should_exclude = True
-                break
+        # Uno o più + iniziali (es. il doppio ++) diventano un solo prefisso internazionale
+        digits_only = _NONDIGIT_RE.sub('', phone.lstrip('+'))
+        cleaned = '+' + digits_only if phone[:1] == '+' else digits_only
 
-        if should_exclude:
+        # Date e sequenze numeriche in un solo match
+        if EXCLUDE_PHONE_RE.fullmatch(cleaned):
             continue
 
-        if re.match(ip_pattern, phone):
-            continue
-
-        if re.match(sequential_pattern, cleaned):
+        if IP_RE.fullmatch(phone):
             continue
 
         if len(cleaned) == 10 and cleaned.startswith(('1', '2')):
@@ -349,3 +408,72 @@ def filter_phone_numbers(phone_numbers: set) -> set:
 
     return filtered_phones
 
+def extract_contacts(text: str, default_region: str | None = None) -> tuple[set[str], set[str]]:
+    '''
+    Funzione: extract_contacts
+    Estrae email e numeri di telefono con una sola scansione del testo: _CONTACT_RE separa i candidati
+    e PhoneNumberMatcher lavora solo sulle sequenze simili a numeri invece che sull'intera pagina.
+    Parametri formali:
+        str text -> La stringa di testo da cui estrarre i contatti
+        str | None default_region -> Regione per i numeri senza prefisso internazionale (vedi region_for_domain)
+    Valore di ritorno:
+        tuple[set[str], set[str]] -> Le email valide e i numeri di telefono trovati
+    '''
+    email_candidates: list[str] = []
+    phone_candidates: list[str] = []
+    for m in _CONTACT_RE.finditer(text):
+        if m.lastgroup == 'email':
+            email_candidates.append(m.group(0))
+        else:
+            phone_candidates.append(m.group(0))
+
+    emails = set(_filter_candidates(email_candidates))
+    # Una riga per candidato: il matcher non unisce numeri di righe diverse
+    phones = extract_phone_numbers('\n'.join(phone_candidates), default_region) if phone_candidates else set()
+    return emails, phones
+
+BATCH_CHUNKSIZE = 16 # Testi inviati a ogni processo worker per volta
+
+
+def _run_batch(func, texts: Iterable[str], workers: int | None) -> list[set[str]]:
+    '''
+    Funzione: _run_batch
+    Applica un estrattore a più testi distribuendoli su un pool di processi (l'estrazione è CPU-bound).
+    Parametri formali:
+        Callable func -> L'estrattore da applicare a ogni testo (funzione di modulo, quindi serializzabile)
+        Iterable[str] texts -> I testi da elaborare
+        int | None workers -> Numero di processi (None = numero di CPU)
+    Valore di ritorno:
+        list[set[str]] -> I risultati dell'estrattore, nello stesso ordine dei testi
+    '''
+    texts = list(texts)
+    if len(texts) < 2 or workers == 1:
+        return [func(t) for t in texts] # Avviare i processi non conviene per un solo testo
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, texts, chunksize=BATCH_CHUNKSIZE))
+
+
+def extract_emails_batch(texts: Iterable[str], workers: int | None = None) -> list[set[str]]:
+    '''
+    Funzione: extract_emails_batch
+    Esegue extract_emails su più testi in parallelo.
+    Parametri formali:
+        Iterable[str] texts -> I testi da cui estrarre le email
+        int | None workers -> Numero di processi (None = numero di CPU)
+    Valore di ritorno:
+        list[set[str]] -> Un set di email per ogni testo, nello stesso ordine
+    '''
+    return _run_batch(extract_emails, texts, workers)
+
+
+def extract_phone_numbers_batch(texts: Iterable[str], workers: int | None = None) -> list[set[str]]:
+    '''
+    Funzione: extract_phone_numbers_batch
+    Esegue extract_phone_numbers su più testi in parallelo: PhoneNumberMatcher è Python puro e CPU-bound.
+    Parametri formali:
+        Iterable[str] texts -> I testi da cui estrarre i numeri di telefono
+        int | None workers -> Numero di processi (None = numero di CPU)
+    Valore di ritorno:
+        list[set[str]] -> Un set di numeri per ogni testo, nello stesso ordine
+    '''
+    return _run_batch(extract_phone_numbers, texts, workers)
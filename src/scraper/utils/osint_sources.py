@@ -1,67 +1,163 @@
 # scraper/utils/osint_sources.py
 
+import asyncio
+import ipaddress
 import logging
 import re
 import time
 import random
 from typing import Any, Dict, List, Set, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import phonenumbers
-from colorama import Fore, Style
 import subprocess
+import tempfile
+import threading
 import json
 from pathlib import Path
 from datetime import datetime
+from collections import deque
+from urllib.parse import urlparse
 
 # Importa le utility già esistenti per le chiamate API e l'estrazione/filtraggio
-from .clients import fetch_whois, fetch_dns_records, fetch_shodan, fetch_hunterio, check_email_breaches, fetch_wayback_snapshots, _safe_get
-from .extractors import extract_emails, filter_emails, extract_phone_numbers, filter_phone_numbers
+from .clients import fetch_whois, fetch_dns_records, fetch_shodan, fetch_hunterio, check_email_breaches, fetch_wayback_snapshots, gather_lookups, gather_lookups_async, run_lookup, _safe_get
+from .extractors import extract_contacts, filter_emails, filter_phone_numbers, region_for_domain
+
+try:
+    import re2 # google-re2: matching a tempo lineare garantito, senza backtracking
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+_regex = re2 if RE2_AVAILABLE else re # _SHERLOCK_RE è compatibile con entrambi i motori
 
 logger = logging.getLogger("osint.sources")
 
+_PUBLIC_EMAIL_DOMAINS = frozenset({
+    'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com',
+    'protonmail.com', 'icloud.com', 'aol.com', 'live.com'
+}) # Provider email pubblici: le email su questi domini non identificano un'organizzazione
+
+
+# Riga di profilo trovato, es. "[+] Reddit: https://www.reddit.com/user/username"
+_SHERLOCK_RE = _regex.compile(r"^[ \t]*\[\+\][ \t]*(?P<site>[^:\r\n]+):[ \t]*(?P<url>[^\r\n]*)")
+SHERLOCK_OUTPUT_TAIL = 50 # Ultime righe di stdout di Sherlock conservate per il messaggio d'errore
+
+
+def _parse_sherlock_line(line: str, username: str, include_username: bool = False) -> Optional[tuple[str, dict]]:
+    '''
+    Funzione: _parse_sherlock_line
+    Analizza una riga dello stdout di Sherlock.
+    Parametri formali:
+        str line -> La riga di output
+        str username -> L'username cercato
+        bool include_username -> Se aggiungere l'username alle informazioni del profilo
+    Valore di ritorno:
+        tuple[str, dict] | None -> La coppia (sito, info) per le righe "[+]", None per tutte le altre
+    '''
+    m = _SHERLOCK_RE.match(line) # ancorata a inizio riga: nessuna divisione della stringa
+    if m is None:
+        return None
+    url = m.group("url").strip()
+    info = {
+        "url": url,
+        "status": "Claimed",
+        "exists": True,
+        "confidence": 1.0,
+    }
+    if include_username:
+        info["username"] = username
+    return m.group("site").strip(), info
 
-def _parse_sherlock_stdout(stdout: str, username: str, include_username: bool = False) -> dict:
-    """Parse sherlock stdout lines into a profiles dict.
 
-    Returns a dict mapping site -> info dict (url, exists, confidence, optionally username).
-    """
+def _run_sherlock(cmd: List[str], username: str, include_username: bool) -> tuple[dict, int]:
+    '''
+    Funzione: _run_sherlock
+    Esegue Sherlock e analizza lo stdout riga per riga mentre il processo è ancora in esecuzione,
+    senza accumulare l'intero output in memoria.
+    Parametri formali:
+        list[str] cmd -> Il comando da eseguire
+        str username -> L'username cercato
+        bool include_username -> Se aggiungere l'username alle informazioni di ogni profilo
+    Valore di ritorno:
+        tuple[dict, int] -> I profili trovati (sito -> info) e il numero di righe di output
+    Eccezioni:
+        subprocess.CalledProcessError -> Se Sherlock termina con un codice di uscita diverso da zero
+    '''
     results: dict = {}
-    try:
-        for line in stdout.splitlines():
-            if "[+]" in line:
-                try:
-                    # Example: [+] Reddit: https://www.reddit.com/user/username
-                    site = line.split("[+]", 1)[1].strip().split(":")[0].strip()
-                    url = line.split(":", 1)[1].strip()
-                    info = {
-                        "url": url,
-                        "status": "Claimed",
-                        "exists": True,
-                        "confidence": 1.0,
-                    }
-                    if include_username:
-                        info["username"] = username
-                    results[site] = info
-                except Exception:
-                    logger.debug(f"Failed to parse sherlock line: {line}")
-                    continue
-    except Exception:
-        logger.debug("Error parsing sherlock stdout")
-    return results
+    tail: deque[str] = deque(maxlen=SHERLOCK_OUTPUT_TAIL)
+    line_count = 0
+
+    # stderr su file temporaneo: una pipe non letta potrebbe riempirsi e bloccare Sherlock
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1) as proc:
+            for line in proc.stdout:
+                line_count += 1
+                tail.append(line)
+                logger.debug(f"Sherlock stdout: {line.rstrip()}")
+                parsed = _parse_sherlock_line(line, username, include_username)
+                if parsed:
+                    results[parsed[0]] = parsed[1]
+            returncode = proc.wait()
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+
+    if stderr:
+        logger.debug(f"Sherlock stderr: {stderr}")
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, output="".join(tail), stderr=stderr)
+    return results, line_count
 
 # === Funzioni per Fetching Dati Dominio ===
 
-# Usato dal OSINTExtractor per raccogliere dati dominio/IP
-def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger) -> dict[str, Any]:
+def _is_ip(target: str) -> bool:
     '''
-    Funzione: fetch_domain_osint
-    Raccoglie dati OSINT per un dominio o IP da varie fonti (WHOIS, DNS, Shodan).
+    Funzione: _is_ip
+    Verifica se il target è un indirizzo IP.
+    Parametri formali:
+        str target -> Il dominio o IP da verificare
+    Valore di ritorno:
+        bool -> True se il target è un indirizzo IP valido
+    '''
+    try:
+        return bool(ipaddress.ip_address(target))
+    except ValueError:
+        return False
+
+
+def _store_shodan(result: dict[str, Any], shodan_data: Any, logger) -> None:
+    '''
+    Funzione: _store_shodan
+    Salva nel risultato i dati Shodan o registra l'errore.
+    Parametri formali:
+        dict[str, Any] result -> Il dizionario dei risultati OSINT
+        Any shodan_data -> Il risultato di fetch_shodan
+        logger -> L'istanza del logger
+    Valore di ritorno:
+        None -> La funzione non restituisce un valore
+    '''
+    if shodan_data and not shodan_data.get("error"):
+        result["shodan"] = shodan_data
+        logger.debug("Shodan completato con successo.")
+    elif shodan_data and shodan_data.get("error"):
+        logger.warning(f"Shodan fallito: {shodan_data['error']}")
+    else:
+        logger.warning("Shodan non ha restituito dati.")
+
+
+async def fetch_domain_osint_async(target: str, api_keys: Dict[str, str], logger, run_shodan: bool) -> dict[str, Any]:
+    '''
+    Funzione: fetch_domain_osint_async
+    Raccoglie dati OSINT per un dominio o IP da varie fonti (WHOIS, DNS, Shodan, Wayback Machine).
+    WHOIS, DNS e Wayback sono indipendenti e vengono eseguiti in parallelo; Shodan parte appena il DNS ha risolto i record A.
 
     Args:
         target: Il dominio o IP da processare
         api_keys: Dizionario contenente le API keys necessarie
         logger: L'istanza del logger
+        run_shodan: True se l'utente ha acconsentito alla scansione Shodan
 
     Ritorno:
         dict[str, Any]        → Dizionario con i dati raccolti da WHOIS, DNS e Shodan (se possibile)
@@ -69,16 +165,23 @@ def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger) -> dict[st
     result: dict[str, Any] = {}
     logger.info(f"OSINT scan avviata per: {target}")
 
-    # Verifica se l'input è un IP
-    try:
-        import ipaddress
-        is_ip = bool(ipaddress.ip_address(target))
-    except ValueError:
-        is_ip = False
+    is_ip = _is_ip(target)
+    shodan_api_key = api_keys.get("shodan")
+
+    lookups = {"whois": (fetch_whois, (target,))}
+    if not is_ip:
+        lookups["dns"] = (fetch_dns_records, (target,))
+        lookups["wayback_machine"] = (fetch_wayback_snapshots, (target,))
+    elif shodan_api_key and run_shodan:
+        # Se è un IP, Shodan non dipende dal DNS e parte insieme agli altri lookup
+        logger.info(f"Eseguo Shodan lookup per l'IP: {target}")
+        lookups["shodan"] = (fetch_shodan, ([target], shodan_api_key))
+
+    logger.debug(f"Eseguo in parallelo {', '.join(lookups)} per {target}...")
+    data = await gather_lookups_async(lookups)
 
     # WHOIS
-    logger.debug(f"Eseguo WHOIS lookup per {target}...")
-    whois_data = fetch_whois(target)
+    whois_data = data["whois"]
     if whois_data and not whois_data.get("error"):
         result["whois"] = whois_data
         logger.debug("WHOIS completato con successo.")
@@ -90,32 +193,18 @@ def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger) -> dict[st
     # Se non è un IP, procedi con DNS lookup
     if not is_ip:
         # DNS
-        logger.debug(f"Eseguo DNS lookup per {target}...")
-        dns_data = fetch_dns_records(target)
+        dns_data = data["dns"]
         if dns_data and not dns_data.get("error"):
             result["dns"] = dns_data
             logger.debug("DNS completato con successo.")
 
             # SHODAN (se presenti A records e API key)
-            shodan_api_key = api_keys.get("shodan")
             if shodan_api_key:
                 resolved_ips: list[str] = dns_data.get("A", [])
                 if resolved_ips:
-                    try:
-                        user_choice = input(f"\n{Fore.YELLOW}Vuoi eseguire la scansione Shodan per {target}? (s/N): {Style.RESET_ALL}").lower()
-                    except Exception:
-                        user_choice = 'n'  # fallback in ambienti non interattivi
-
-                    if user_choice == 's':
+                    if run_shodan:
                         logger.info(f"Eseguo Shodan lookup sugli IP: {resolved_ips}")
-                        shodan_data = fetch_shodan(resolved_ips, shodan_api_key)
-                        if shodan_data and not shodan_data.get("error"):
-                            result["shodan"] = shodan_data
-                            logger.debug("Shodan completato con successo.")
-                        elif shodan_data and shodan_data.get("error"):
-                            logger.warning(f"Shodan fallito: {shodan_data['error']}")
-                        else:
-                            logger.warning("Shodan non ha restituito dati.")
+                        _store_shodan(result, await run_lookup(fetch_shodan, resolved_ips, shodan_api_key), logger)
                     else:
                         logger.info("Scansione Shodan saltata dall'utente.")
                 else:
@@ -128,32 +217,16 @@ def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger) -> dict[st
         else:
             logger.warning("DNS lookup non ha restituito dati o ha incontrato un errore imprevisto.")
     else:
-        # Se è un IP, esegui direttamente Shodan
-        shodan_api_key = api_keys.get("shodan")
-        if shodan_api_key:
-            try:
-                user_choice = input(f"\n{Fore.YELLOW}Vuoi eseguire la scansione Shodan per l'IP {target}? (s/N): {Style.RESET_ALL}").lower()
-            except Exception:
-                user_choice = 'n'  # fallback in ambienti non interattivi
-
-            if user_choice == 's':
-                logger.info(f"Eseguo Shodan lookup per l'IP: {target}")
-                shodan_data = fetch_shodan([target], shodan_api_key)
-                if shodan_data and not shodan_data.get("error"):
-                    result["shodan"] = shodan_data
-                    logger.debug("Shodan completato con successo.")
-                elif shodan_data and shodan_data.get("error"):
-                    logger.warning(f"Shodan fallito: {shodan_data['error']}")
-                else:
-                    logger.warning("Shodan non ha restituito dati.")
-            else:
-                logger.info("Scansione Shodan saltata dall'utente.")
-        else:
+        if not shodan_api_key:
             logger.info("Chiave API Shodan mancante. Skipping Shodan.")
+        elif run_shodan:
+            _store_shodan(result, data["shodan"], logger)
+        else:
+            logger.info("Scansione Shodan saltata dall'utente.")
 
      # === Wayback Machine ===
     if not is_ip:
-        wayback_data = fetch_wayback_snapshots(target)
+        wayback_data = data["wayback_machine"]
         if wayback_data and not wayback_data.get("error"):
             result["wayback_machine"] = wayback_data
             logger.debug("Wayback Machine completato con successo.")
@@ -169,6 +242,25 @@ def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger) -> dict[st
     return result
 
 
+# Usato dal OSINTExtractor per raccogliere dati dominio/IP
+def fetch_domain_osint(target: str, api_keys: Dict[str, str], logger, run_shodan: bool = False) -> dict[str, Any]:
+    '''
+    Funzione: fetch_domain_osint
+    Raccoglie dati OSINT per un dominio o IP da varie fonti (WHOIS, DNS, Shodan).
+    Non chiede nulla all'utente: il consenso per Shodan viene raccolto prima dal chiamante (CLI).
+
+    Args:
+        target: Il dominio o IP da processare
+        api_keys: Dizionario contenente le API keys necessarie
+        logger: L'istanza del logger
+        run_shodan: True se l'utente ha acconsentito alla scansione Shodan
+
+    Ritorno:
+        dict[str, Any]        → Dizionario con i dati raccolti da WHOIS, DNS e Shodan (se possibile)
+    '''
+    return asyncio.run(fetch_domain_osint_async(target, api_keys, logger, run_shodan))
+
+
 # === Funzioni per Fetching Dati Email ===
 
 # Usato dal OSINTExtractor per raccogliere dati email
@@ -188,10 +280,20 @@ def fetch_email_osint(email: str, api_keys: Dict[str, str], logger) -> Dict[str,
     result: Dict[str, Any] = {}
     logger.info(f"Running email OSINT fetch for {email}...")
 
-    # Hunter.io lookup
     hunter_api_key = api_keys.get("hunterio")
+    hibp_api_key = api_keys.get("hibp")
+
+    # Hunter.io e HIBP sono indipendenti: vengono interrogati in parallelo
+    lookups = {}
     if hunter_api_key:
-        hunter_data = fetch_hunterio(email, hunter_api_key)
+        lookups["hunterio"] = (fetch_hunterio, (email, hunter_api_key))
+    if hibp_api_key:
+        lookups["breaches"] = (check_email_breaches, (email, hibp_api_key))
+    data = gather_lookups(lookups) if lookups else {}
+
+    # Hunter.io lookup
+    if hunter_api_key:
+        hunter_data = data["hunterio"]
         if hunter_data and not hunter_data.get("error"):
             result["hunterio"] = hunter_data
             logger.debug(f"Hunter.io data fetched for {email}")
@@ -204,9 +306,8 @@ def fetch_email_osint(email: str, api_keys: Dict[str, str], logger) -> Dict[str,
         result["hunterio"] = {"error": "API key not provided"}
 
     # HIBP lookup
-    hibp_api_key = api_keys.get("hibp")
     if hibp_api_key:
-        breaches_data = check_email_breaches(email, hibp_api_key)
+        breaches_data = data["breaches"]
         if breaches_data:
             result["breaches"] = breaches_data
             if not breaches_data:
@@ -221,12 +322,10 @@ def fetch_email_osint(email: str, api_keys: Dict[str, str], logger) -> Dict[str,
         
         # Add basic email analysis when HIBP is not available
         domain = email.split('@')[1] if '@' in email else 'Unknown'
+        domain_lower = domain.lower()
         result["basic_analysis"] = {
             "domain": domain,
-            "provider_type": "public" if domain.lower() in [
-                'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com', 
-                'protonmail.com', 'icloud.com', 'aol.com', 'live.com'
-            ] else "custom",
+            "provider_type": "public" if domain_lower in _PUBLIC_EMAIL_DOMAINS else "custom",
             "note": "Limited analysis without HIBP API key"
         }
 
@@ -276,26 +375,14 @@ def fetch_social_osint(username: str, logger, dirs: Dict[str, Path]) -> Dict[str
         ]
         
         try:
-            # Esegui sherlock e cattura l'output
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            logger.debug(f"Sherlock stdout: {process.stdout}")
-            if process.stderr:
-                logger.debug(f"Sherlock stderr: {process.stderr}")
-            
-            # Parse Sherlock stdout using helper
-            results = _parse_sherlock_stdout(process.stdout, username, include_username=False)
+            # Esegui sherlock analizzando l'output man mano che viene prodotto
+            results, line_count = _run_sherlock(cmd, username, include_username=False)
 
             formatted_results = {
                 "profiles": results,
                 "summary": {
                     "username": username,
-                    "platforms_checked": len(process.stdout.splitlines()),
+                    "platforms_checked": line_count,
                     "profiles_found": len(results),
                     "report_file": str(output_file),
                 },
@@ -359,26 +446,14 @@ def find_brand_social_profiles(domain_or_brand_name: str, logger, dirs: Dict[str
         ]
         
         try:
-            # Esegui sherlock e cattura l'output
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            logger.debug(f"Sherlock stdout: {process.stdout}")
-            if process.stderr:
-                logger.debug(f"Sherlock stderr: {process.stderr}")
-            
-            # Parse Sherlock stdout using helper
-            results = _parse_sherlock_stdout(process.stdout, brand_name, include_username=True)
+            # Esegui sherlock analizzando l'output man mano che viene prodotto
+            results, line_count = _run_sherlock(cmd, brand_name, include_username=True)
 
             formatted_results = {
                 "profiles": results,
                 "summary": {
                     "username": brand_name,
-                    "platforms_checked": len(process.stdout.splitlines()),
+                    "platforms_checked": line_count,
                     "profiles_found": len(results),
                     "report_file": str(output_file),
                 },
@@ -403,118 +478,195 @@ def find_brand_social_profiles(domain_or_brand_name: str, logger, dirs: Dict[str
 
 # === Funzioni per Estrazione Contatti da Sito Web ===
 
-# Usato dal OSINTExtractor per raccogliere contatti da sito web
-def fetch_website_contacts(domain: str, ) -> Dict[str, List[str]]:
+# Percorsi in cui i siti pubblicano di solito i contatti ("" è la homepage); ogni voce costa una richiesta
+_CONTACT_PATHS = (
+    "",
+    "/contact",
+    "/contact-us",
+    "/contatti",
+    "/contacto",
+    "/about",
+    "/about-us",
+    "/chi-siamo",
+    "/impressum",
+    "/privacy-policy",
+    "/terms-of-service",
+    "/terms-and-conditions",
+    "/legal-notice",
+    "/team",
+)
+
+CONTACT_FETCH_CONCURRENCY = 8 # Pagine del sito scaricate contemporaneamente durante la ricerca dei contatti
+CONTACT_ENOUGH_EMAILS = 5 # Email filtrate oltre le quali (insieme ai telefoni) si smette di scaricare pagine
+CONTACT_ENOUGH_PHONES = 3 # Telefoni filtrati oltre i quali (insieme alle email) si smette di scaricare pagine
+CONTACT_PER_HOST_LIMIT = 8 # Richieste contemporanee verso lo stesso host, anche tra più scansioni in parallelo
+CONTACT_THROTTLE_STATUSES = (429, 503) # Status con cui il sito chiede di rallentare
+CONTACT_MAX_RETRIES = 3 # Nuovi tentativi dopo un 429/503
+CONTACT_MAX_BACKOFF = 30.0 # Attesa massima tra due tentativi (secondi)
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+def _contacts_session() -> requests.Session:
     '''
-    Funzione: fetch_website_contacts
-    Estrae informazioni di contatto (email, telefoni) dalle pagine comuni di un sito web.
-
-    Args:
-        domain: Il dominio del sito da cui estrarre i contatti
-        logger: L'istanza del logger
-
-    Returns:
-        Un dizionario contenente le liste di email e numeri di telefono trovati e filtrati
+    Funzione: _contacts_session
+    Crea la sessione condivisa per lo scaricamento delle pagine dei contatti: le connessioni TCP/TLS
+    verso il sito vengono riusate tra i percorsi e tra le scansioni invece di un handshake per richiesta.
+    Valore di ritorno:
+        requests.Session -> La sessione configurata
     '''
-    logger.info(f"Extracting contacts from website: {domain}")
-    contacts = {"emails": set(), "phone_numbers": set()}
+    session = requests.Session()
+    session.headers.update(_HEADERS)
+    # Pool dimensionato sulle richieste contemporanee per host (CONTACT_PER_HOST_LIMIT)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-    pages_to_check_paths = [
-        "", # Homepage
-        "/contact",
-        "/contact-us",
-        "/contatti",
-        "/contacto",
-        "/about",
-        "/about-us",
-        "/chi-siamo",
-        "/sobre-nos",
-        "/privacy-policy",
-        "/terms-of-service",
-         "/impressum", 
-         "/direttiva-cookies"
-         "/terms-and-conditions",
-        "/legal-notice",
-        "/faq",
-        "/help",
-        "/support",
-        "/customer-service",
-        "/customer-support",
-        "/team",
-        "/staff",
-        "/our-team",
-        "/our-staff",
-        "/team-members",
-        "/team-staff",
-        "/team-membership",
-        "/team-staff-members",
-        "/team-contacts",
-        "/team-contact",
-        "/team-contact-us",
-        "/team-contacto",
-        "/team-chi-siamo",
-        "/team-about",
-    ]
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-
-    for path in pages_to_check_paths:
-        # Try both HTTPS and HTTP, but prefer HTTPS
-        urls_to_try = [f"https://{domain}{path}"]
-        if not path.startswith("http"): # Avoid adding http scheme if path is already a full URL
-             urls_to_try.append(f"http://{domain}{path}")
 
+_SESSION = _contacts_session()
 
-        for url in urls_to_try:
-            try:
-                # Use a timeout and handle redirects
-                response = _safe_get(url, headers=headers, timeout=10, verify=False, allow_redirects=True)
+# Semafori per host: thread-safe e indipendenti dall'event loop, perché ogni scansione usa il proprio asyncio.run
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
 
-                # Only process if the request was successful (2xx status code)
-                if response.status_code >= 200 and response.status_code < 300:
-                    logger.debug(f"Successfully fetched {response.url} (original: {url}) with status {response.status_code}")
-                    page_content = response.text
 
-                    # Extract emails and phones using the utility functions
-                    found_emails = extract_emails(page_content)
-                    for email in found_emails:
-                        contacts["emails"].add(email)
+def _host_semaphore(host: str) -> threading.BoundedSemaphore:
+    '''
+    Funzione: _host_semaphore
+    Restituisce il semaforo che limita le richieste contemporanee verso un host, creandolo al primo uso.
+    Parametri formali:
+        str host -> L'host di destinazione
+    Valore di ritorno:
+        threading.BoundedSemaphore -> Il semaforo condiviso per l'host
+    '''
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = _host_semaphores[host] = threading.BoundedSemaphore(CONTACT_PER_HOST_LIMIT)
+        return sem
 
-                    found_phones = extract_phone_numbers(page_content)
-                    for phone in found_phones:
-                        contacts["phone_numbers"].add(phone)
 
-                    # If we successfully fetched the homepage, we might not need to try the http version immediately
-                    # But for other paths, it's safer to try both if the first fails.
-                    if path == "" and url.startswith("https"):
-                         break # If homepage HTTPS worked, no need for HTTP homepage immediately
+def _fetch_contact_page(url: str) -> tuple[Optional[str], bool]:
+    '''
+    Funzione: _fetch_contact_page
+    Scarica una pagina candidata per la ricerca dei contatti, rispettando il limite per host
+    e ripetendo con backoff esponenziale le richieste rifiutate con 429/503.
+    Parametri formali:
+        str url -> L'URL della pagina
+    Valore di ritorno:
+        tuple[str | None, bool] -> Il contenuto della pagina se la risposta è 2xx (altrimenti None)
+                                   e True se la connessione stessa è fallita (errore di rete o SSL)
+    '''
+    try:
+        # Il semaforo resta occupato anche durante il backoff: rallenta tutte le richieste verso l'host
+        with _host_semaphore(urlparse(url).netloc):
+            for attempt in range(CONTACT_MAX_RETRIES + 1):
+                # Use a timeout and handle redirects
+                response = _safe_get(url, timeout=10, verify=False, allow_redirects=True, session=_SESSION)
+                if response.status_code not in CONTACT_THROTTLE_STATUSES or attempt == CONTACT_MAX_RETRIES:
+                    break
+                delay = min(2 ** attempt + random.random(), CONTACT_MAX_BACKOFF)
+                logger.debug(f"{url} returned {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+    except requests.exceptions.ConnectionError as e: # include SSLError
+        logger.debug(f"Connection error fetching {url} for contact extraction: {e}")
+        return None, True
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Request error fetching {url} for contact extraction: {e}")
+        return None, False
+    except Exception as e:
+        logger.debug(f"Unexpected error processing {url} for contacts: {e}")
+        return None, False
+
+    # Only process if the request was successful (2xx status code)
+    if 200 <= response.status_code < 300:
+        logger.debug(f"Successfully fetched {response.url} (original: {url}) with status {response.status_code}")
+        return response.text, False
+    if response.status_code == 404:
+        logger.debug(f"Page not found for {url} (status 404).")
+    else:
+        logger.debug(f"Failed to fetch {url} with status code {response.status_code}")
+    return None, False
 
-                elif response.status_code == 404:
-                    logger.debug(f"Page not found for {url} (status 404).")
-                else:
-                    logger.debug(f"Failed to fetch {url} with status code {response.status_code}")
 
-            except requests.exceptions.RequestException as e:
-                logger.debug(f"Request error fetching {url} for contact extraction: {e}")
-                continue # Try next URL for this path/scheme
-            except Exception as e:
-                logger.debug(f"Unexpected error processing {url} for contacts: {e}")
-                continue # Try next URL for this path/scheme
+# Usato dal OSINTExtractor per raccogliere contatti da sito web
+async def fetch_website_contacts_async(domain: str) -> Dict[str, List[str]]:
+    '''
+    Funzione: fetch_website_contacts_async
+    Estrae informazioni di contatto (email, telefoni) dalle pagine comuni di un sito web.
+    Le pagine vengono scaricate in parallelo in HTTPS (in HTTP solo se la connessione HTTPS fallisce)
+    e la ricerca si interrompe appena sono stati trovati abbastanza contatti.
 
-        # After trying both http/https for a path, if we found contacts, maybe move to the next path faster?
-        # Or if a page (like homepage) was fetched successfully, we might stop trying http for it.
-        # This logic is already handled by the inner loop and break for homepage.
+    Args:
+        domain: Il dominio del sito da cui estrarre i contatti
 
+    Returns:
+        Un dizionario contenente le liste di email e numeri di telefono trovati e filtrati
+    '''
+    logger.info(f"Extracting contacts from website: {domain}")
+    contacts = {"emails": set(), "phone_numbers": set()}
 
-    # Filter the collected contacts using the utility functions
-    # Note: filter_emails requires the domain for internal/external check
-    filtered_emails_set = filter_emails(contacts["emails"], domain, logger) # Pass logger
-    filtered_phones_set = filter_phone_numbers(contacts["phone_numbers"]) # Pass logger if needed inside
+    region = region_for_domain(domain) # regione telefonica dal TLD, per i numeri in formato nazionale
+    sem = asyncio.Semaphore(CONTACT_FETCH_CONCURRENCY)
+
+    async def fetch(path: str) -> Optional[str]:
+        async with sem:
+            # _safe_get è bloccante: ogni richiesta gira in un thread, la latenza totale è quella delle pagine più lente
+            page_content, connection_failed = await asyncio.to_thread(_fetch_contact_page, f"https://{domain}{path}")
+        # HTTP solo se HTTPS non è raggiungibile; un 404 o un altro status HTTP vale anche per la versione HTTP
+        if connection_failed:
+            async with sem:
+                page_content, _ = await asyncio.to_thread(_fetch_contact_page, f"http://{domain}{path}")
+        return page_content
+
+    filtered_emails_set: Set[str] = set()
+    filtered_phones_set: Set[str] = set()
+    tasks = [asyncio.create_task(fetch(path)) for path in _CONTACT_PATHS]
+    try:
+        # Le pagine vengono elaborate appena arrivano, così la ricerca si ferma non appena ci sono abbastanza contatti
+        for next_page in asyncio.as_completed(tasks):
+            page_content = await next_page
+            if page_content is None:
+                continue
+            # Extract emails and phones in a single pass over the page
+            page_emails, page_phones = extract_contacts(page_content, region)
+
+            # I filtri valutano ogni contatto da solo: si filtrano solo quelli nuovi invece di rifiltrare tutto a ogni pagina
+            # Note: filter_emails requires the domain for internal/external check
+            new_emails = page_emails - contacts["emails"]
+            new_phones = page_phones - contacts["phone_numbers"]
+            contacts["emails"].update(new_emails)
+            contacts["phone_numbers"].update(new_phones)
+            if new_emails:
+                filtered_emails_set.update(filter_emails(new_emails, domain, logger))
+            if new_phones:
+                filtered_phones_set.update(filter_phone_numbers(new_phones))
+
+            if len(filtered_emails_set) >= CONTACT_ENOUGH_EMAILS and len(filtered_phones_set) >= CONTACT_ENOUGH_PHONES:
+                logger.debug(f"Enough contacts found for {domain}, skipping the remaining pages.")
+                break
+    finally:
+        # Le pagine non ancora richieste non partono; quelle già in corso terminano nel loro thread
+        for task in tasks:
+            task.cancel()
 
     logger.info(f"Finished contact extraction for {domain}. Emails found (filtered): {len(filtered_emails_set)}, Phones found (filtered): {len(filtered_phones_set)}")
 
     return {"emails": list(filtered_emails_set), "phone_numbers": list(filtered_phones_set)}
 
 
+def fetch_website_contacts(domain: str) -> Dict[str, List[str]]:
+    '''
+    Funzione: fetch_website_contacts
+    Wrapper sincrono di fetch_website_contacts_async per i chiamanti non asincroni.
+
+    Args:
+        domain: Il dominio del sito da cui estrarre i contatti
+
+    Returns:
+        Un dizionario contenente le liste di email e numeri di telefono trovati e filtrati
+    '''
+    return asyncio.run(fetch_website_contacts_async(domain))
@@ -1,12 +1,24 @@
+import functools
 import logging
 import re
+import sys
 from dataclasses import dataclass, field
-from typing import List, Set, Dict
-from urllib.parse import urljoin, urlparse
+from typing import List, Set, Dict, Tuple
+from urllib.parse import urlparse
 from colorama import Fore, Style
 
+try:
+    import re2 # google-re2: matching a tempo lineare garantito, senza backtracking
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+_regex = re2 if RE2_AVAILABLE else re # I pattern usano flag inline, compatibili con entrambi i motori
+
 logger = logging.getLogger("scraper.robots_parser")
 
+ROBOTS_CACHE_SIZE = 256 # robots.txt analizzati tenuti in memoria (chiave: contenuto e URL base)
+
 @dataclass
 class RobotsRule:
     path: str
@@ -25,11 +37,13 @@ class RobotsData:
         rules: List[RobotsRule] -> Lista di oggetti RobotsRule che rappresentano le regole di accesso
         sitemaps: List[str] -> Lista di URL di sitemap
         sensitive_paths: Set[str] -> Set di percorsi che sono considerati sensibili
+        sorted_rules: Tuple[Tuple[str, bool], ...] -> Coppie (path, allow) ordinate per lunghezza decrescente, usate da is_allowed
     '''
     rules: List[RobotsRule] = field(default_factory=list)
     sitemaps: List[str] = field(default_factory=list)
     sensitive_paths: Set[str] = field(default_factory=set)
     crawl_delay: float = 0.0
+    sorted_rules: Tuple[Tuple[str, bool], ...] = () # (path, allow) dalla regola più specifica, calcolato una volta da parse
 
     def to_dict(self) -> Dict:
         '''
@@ -53,19 +67,23 @@ class RobotsParser:
     Classe che analizza e gestisce i dati di un file robots.txt.
     Parametri formali:
         self -> Riferimento all'istanza della classe
-        SENSITIVE_PATTERNS -> Lista di pattern di percorsi sensibili
+        SENSITIVE_PATTERNS -> Lista di sottostringhe che identificano percorsi sensibili
     '''
+    # Sottostringhe letterali (non regex): wp-admin, administrator, api/internal, api/private e api/v<n>/admin
+    # sono già coperti da admin, internal e private, quindi non servono voci dedicate
     SENSITIVE_PATTERNS = [
-        r'admin', r'backup', r'staging', r'dev', r'test', r'beta',
-        r'wp-admin', r'administrator', r'login', r'user', r'console',
-        r'dashboard', r'private', r'secret', r'internal', r'config',
-        r'setup', r'install', r'phpmy', r'sql', r'database', r'db',
-        r'temp', r'tmp', r'old', r'bak', r'.git', r'.svn', r'.env',
-        r'api/internal', r'api/private', r'api/v\d+/admin'
+        'admin', 'backup', 'staging', 'dev', 'test', 'beta',
+        'login', 'user', 'console',
+        'dashboard', 'private', 'secret', 'internal', 'config',
+        'setup', 'install', 'phpmy', 'sql', 'database', 'db',
+        'temp', 'tmp', 'old', 'bak', '.git', '.svn', '.env',
     ]
 
-    def __init__(self):
-        self.sensitive_patterns = [re.compile(p, re.IGNORECASE) for p in self.SENSITIVE_PATTERNS]
+    # Regex compilate una volta come attributi di classe, condivise da tutte le istanze
+    # Un'unica alternanza di letterali escapati: una sola ricerca per percorso invece di una per pattern
+    _sensitive_re = _regex.compile("(?i)" + "|".join(re.escape(p) for p in SENSITIVE_PATTERNS))
+    # Direttive riconosciute a inizio riga; il valore si ferma al fine riga o a un commento
+    _robots_re = _regex.compile(r"(?m)^[ \t]*(?P<k>user-agent|allow|disallow|sitemap|crawl-delay)[ \t]*:[ \t]*(?P<v>[^\r\n#]*)")
 
     def _is_sensitive_path(self, path: str) -> bool:
         '''
@@ -77,7 +95,7 @@ class RobotsParser:
         Valore di ritorno: 
             bool -> True se il percorso è sensibile, False altrimenti
         '''
-        return any(pattern.search(path) for pattern in self.sensitive_patterns) 
+        return self._sensitive_re.search(path) is not None
 
     def parse(self, robots_content: str, base_url: str) -> RobotsData:
         '''
@@ -87,91 +105,92 @@ class RobotsParser:
             self -> Riferimento all'istanza della classe
             robots_content -> Contenuto del file robots.txt
             base_url -> URL base del sito
+        Valore di ritorno:
+            RobotsData -> Oggetto RobotsData contenente i dati estratti (condiviso dalla cache: da non modificare)
+        '''
+        return self._parse_cached(robots_content, base_url)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=ROBOTS_CACHE_SIZE)
+    def _parse_cached(robots_content: str, base_url: str) -> RobotsData:
+        '''
+        Funzione: _parse_cached
+        Analizza robots.txt memorizzando il risultato per (contenuto, URL base): più crawler sullo stesso sito non lo rianalizzano.
+        Parametri formali:
+            robots_content -> Contenuto del file robots.txt
+            base_url -> URL base del sito
         Valore di ritorno:
             RobotsData -> Oggetto RobotsData contenente i dati estratti
         '''
         data = RobotsData()
         current_agent = "*"
         in_relevant_agent = False
+        sensitive_search = RobotsParser._sensitive_re.search
 
-        for line in robots_content.splitlines():
-            line = line.strip().lower()
-            if not line or line.startswith('#'):
-                continue
+        # Una sola scansione in C del contenuto: le righe vuote, i commenti e le direttive sconosciute non producono match
+        for m in RobotsParser._robots_re.finditer(robots_content.lower()):
+            key, value = m.group('k'), m.group('v').strip()
 
-            if line.startswith('user-agent:'):
-                agent = line.split(':', 1)[1].strip()
-                in_relevant_agent = agent == '*'
-                current_agent = agent
+            if key == 'user-agent':
+                in_relevant_agent = value == '*'
+                current_agent = value
                 continue
 
             if current_agent != '*' and not in_relevant_agent:
                 continue
 
-            if line.startswith('allow:'):
-                path = line.split(':', 1)[1].strip()
-                full_path = urljoin(base_url, path)
-                rule = RobotsRule(path=path, allow=True, is_sensitive=self._is_sensitive_path(path)) 
+            if key == 'allow' or key == 'disallow':
+                rule = RobotsRule(path=value, allow=key == 'allow', is_sensitive=sensitive_search(value) is not None)
                 data.rules.append(rule)
                 if rule.is_sensitive:
-                    data.sensitive_paths.add(path) 
+                    data.sensitive_paths.add(value)
 
-            elif line.startswith('disallow:'):
-                path = line.split(':', 1)[1].strip()
-                full_path = urljoin(base_url, path)
-                rule = RobotsRule(path=path, allow=False, is_sensitive=self._is_sensitive_path(path))
-                data.rules.append(rule)
-                if rule.is_sensitive:
-                    data.sensitive_paths.add(path)
-
-            elif line.startswith('sitemap:'):
-                sitemap = line.split(':', 1)[1].strip()
-                data.sitemaps.append(sitemap)
+            elif key == 'sitemap':
+                data.sitemaps.append(value)
 
-            elif line.startswith('crawl-delay:'):
+            elif key == 'crawl-delay':
                 try:
-                    data.crawl_delay = float(line.split(':', 1)[1].strip())
+                    data.crawl_delay = float(value)
                 except ValueError:
                     pass
 
+        # Ordinamento per specificità fatto una volta sola qui invece che a ogni chiamata di is_allowed
+        data.sorted_rules = tuple(sorted(((r.path, r.allow) for r in data.rules), key=lambda x: -len(x[0])))
         return data
 
-    def is_allowed(self, url: str, rules: List[RobotsRule]) -> bool:
-        """Check if a URL is allowed based on robots rules"""
+    def is_allowed(self, url: str, sorted_rules: Tuple[Tuple[str, bool], ...]) -> bool:
+        """Check if a URL is allowed based on robots rules (RobotsData.sorted_rules, most specific first)"""
         path = urlparse(url).path
         if not path:
             path = "/"
 
-        # Sort rules by length (most specific first)
-        sorted_rules = sorted(rules, key=lambda x: len(x.path), reverse=True)
-        
-        for rule in sorted_rules:
-            if path.startswith(rule.path):
-                return rule.allow
+        for rule_path, allow in sorted_rules:
+            if path.startswith(rule_path):
+                return allow
         
         return True  # Default allow if no matching rules
 
     def print_analysis(self, data: RobotsData, base_url: str):
         """Print a colored analysis of robots.txt data"""
-        print(f"\n{Fore.CYAN}=== Robots.txt Analysis for {base_url} ==={Style.RESET_ALL}")
+        # Output accumulato e scritto con una sola write invece di un print per riga
+        parts = [f"\n{Fore.CYAN}=== Robots.txt Analysis for {base_url} ==={Style.RESET_ALL}"]
         
         if data.sensitive_paths:
-            print(f"\n{Fore.RED}🔍 Sensitive Paths Found:{Style.RESET_ALL}")
-            for path in sorted(data.sensitive_paths):
-                print(f"  • {path}")
+            parts.append(f"\n{Fore.RED}🔍 Sensitive Paths Found:{Style.RESET_ALL}")
+            parts.extend(f"  • {path}" for path in sorted(data.sensitive_paths))
         
-        print(f"\n{Fore.YELLOW}📋 Access Rules:{Style.RESET_ALL}")
+        parts.append(f"\n{Fore.YELLOW}📋 Access Rules:{Style.RESET_ALL}")
+        sensitive_mark = f" {Fore.RED}(!){Style.RESET_ALL}"
         for rule in data.rules:
             allow_text = 'Allow' if rule.allow else 'Disallow'
-            sensitive_mark = f" {Fore.RED}(!){Style.RESET_ALL}" if rule.is_sensitive else ""
-            print(f"  • {allow_text}: {rule.path}{sensitive_mark}")
+            parts.append(f"  • {allow_text}: {rule.path}{sensitive_mark if rule.is_sensitive else ''}")
         
         if data.sitemaps:
-            print(f"\n{Fore.BLUE}🗺 Sitemaps:{Style.RESET_ALL}")
-            for sitemap in data.sitemaps:
-                print(f"  • {sitemap}")
+            parts.append(f"\n{Fore.BLUE}🗺 Sitemaps:{Style.RESET_ALL}")
+            parts.extend(f"  • {sitemap}" for sitemap in data.sitemaps)
         
         if data.crawl_delay:
-            print(f"\n{Fore.MAGENTA}⏱ Crawl-delay: {data.crawl_delay} seconds{Style.RESET_ALL}")
+            parts.append(f"\n{Fore.MAGENTA}⏱ Crawl-delay: {data.crawl_delay} seconds{Style.RESET_ALL}")
         
-        print(f"\n{Fore.CYAN}{'='*50}{Style.RESET_ALL}\n")
\ No newline at end of file
+        parts.append(f"\n{Fore.CYAN}{'='*50}{Style.RESET_ALL}\n")
+        sys.stdout.write("\n".join(parts) + "\n")
\ No newline at end of file
@@ -3,6 +3,19 @@
 import re
 from colorama import Fore, Style
 
+_HOST_RE = re.compile(r"(?:https?://)?(?:www\.)?([^/?:]*)") # Estrae l'host da un input tipo URL (match ancorato all'inizio)
+
+_DOMAIN_RE = re.compile(r"^(?:(?!-)[a-z0-9-]{1,63}(?<!-)\.)+[a-z]{2,63}$")
+r'''
+Il pattern regex verifica che il dominio:
+^(?:(?!-) - Non inizi con un trattino
+[a-z0-9-]{1,63} - Contenga solo lettere minuscole, numeri e trattini, con una lunghezza da 1 a 63 caratteri
+(?<!-) - Non finisca con un trattino
+\.) - Seguito da un punto
+[a-z]{2,63}$ - Termini con un TLD di 2 a 63 caratteri (es. .com, .org, .it)
+Questo pattern è conforme agli standard dei nomi di dominio 
+'''
+
 # Chiamato da ScraperCLI per validare domini
 def validate_domain(domain: str) -> tuple[bool, str | None]:
         '''
@@ -20,29 +33,10 @@ def validate_domain(domain: str) -> tuple[bool, str | None]:
             print(f"{Fore.RED}✗ Nessun dominio inserito")
             return False, None
 
-        if domain.startswith(("http://", "https://")):
-            domain = domain.split("://", 1)[1]
-
-        domain = domain.split("/", 1)[0]
-        domain = domain.split("?", 1)[0]
-        domain = domain.split(":", 1)[0]
-
-        if domain.startswith("www."):
-            domain = domain[4:]
-
-        domain_pattern = r"^((?!-)[a-z0-9-]{1,63}(?<!-)\.)+[a-z]{2,63}$"
-
-        '''
-        Il pattern regex verifica che il dominio:
-        ^((?!-) - Non inizi con un trattino
-        [a-z0-9-]{1,63} - Contenga solo lettere minuscole, numeri e trattini, con una lunghezza da 1 a 63 caratteri
-        (?<!-) - Non finisca con un trattino
-        \.) - Seguito da un punto
-        [a-z]{2,63}$ - Termini con un TLD di 2 a 63 caratteri (es. .com, .org, .it)
-        Questo pattern è conforme agli standard dei nomi di dominio 
-        '''
+        # Schema, www., percorso, query e porta rimossi con un solo match
+        domain = _HOST_RE.match(domain).group(1)
 
-        if not re.match(domain_pattern, domain):
+        if not _DOMAIN_RE.match(domain):
             print(f"{Fore.RED}✗ Formato dominio non valido: '{domain}'. Usare: example.com")
             return False, None
 
@@ -1,110 +1,328 @@
 #  Contiene funzioni per analizzare il contenuto web per rilevare tecnologie, header, ecc
 # src/scraper/utils/web_analysis.py
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+import copy
 import re
 import logging
+import threading
+import time
 import requests # Aggiunto: necessario per fare la richiesta HTTP
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from .clients import _safe_get
-from typing import Dict, Any, List # Aggiunto: per type hinting
+from typing import Dict, Any, List, Set, Tuple # Aggiunto: per type hinting
+
+try:
+    import lxml # noqa: F401 (serve solo come backend di BeautifulSoup)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+HTML_PARSER = "lxml" if LXML_AVAILABLE else "html.parser" # parser in C quando disponibile, altrimenti quello puro Python
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Pattern dei nomi file delle librerie JS negli attributi src, compilati una sola volta all'import
+_JS_SCRIPT_PATTERNS: Dict[str, re.Pattern] = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in (
+        ("jQuery", r"jquery(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("React", r"react(-dom)?(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("AngularJS", r"angular(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("Angular", r"main\.(?:[a-f0-9]+\.)?js"),
+        ("Vue.js", r"vue(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("Bootstrap JS", r"bootstrap(-[0-9\.]*(\.bundle|\.min)?\.js|\.js)"),
+        ("Lodash", r"lodash(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("Moment.js", r"moment(-[0-9\.]*(\.min)?\.js|\.js)"),
+        ("GSAP", r"gsap(-[0-9\.]*(\.min)?\.js|\.js)|TweenMax"),
+        ("D3.js", r"d3(-[0-9\.]*(\.min)?\.js|\.js)"),
+    )
+}
+# Letterale obbligatorio di ciascun pattern -> libreria candidata da confermare col pattern completo
+_JS_SCRIPT_NEEDLES = {
+    "jquery": "jQuery",
+    "react": "React",
+    "angular": "AngularJS",
+    "main.": "Angular",
+    "vue": "Vue.js",
+    "bootstrap": "Bootstrap JS",
+    "lodash": "Lodash",
+    "moment": "Moment.js",
+    "gsap": "GSAP",
+    "tweenmax": "GSAP",
+    "d3": "D3.js",
+}
+# Un solo passaggio sul src trova tutti i letterali; il lookahead riporta anche le occorrenze sovrapposte
+_JS_SCRIPT_NEEDLES_RE = re.compile("(?=(" + "|".join(map(re.escape, _JS_SCRIPT_NEEDLES)) + "))")
+
+# Header di sicurezza controllati: (nome in minuscolo per la ricerca, nome mostrato)
+_SECURITY_HEADERS: Tuple[Tuple[str, str], ...] = (
+    ("strict-transport-security", "HSTS"),
+    ("content-security-policy", "CSP"),
+    ("x-frame-options", "X-Frame-Options"), # Mantieni il nome completo per chiarezza
+    ("x-content-type-options", "X-Content-Type-Options"), # Mantieni il nome completo
+    ("referrer-policy", "Referrer-Policy"),
+    ("permissions-policy", "Permissions-Policy"),
+    ("x-xss-protection", "X-XSS-Protection"), # Mantieni il nome completo
+)
+
+# Sonde sul contenuto HTML: (categoria, nome riportato, letterali che ne indicano la presenza)
+_CONTENT_PROBES: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("framework", "WordPress", ("wp-content", "wp-includes")),
+    ("framework", "Shopify", ("Powered by Shopify",)),
+    ("framework", "Squarespace", ("squarespace.com",)),
+    ("framework", "Wix", ("wix.com",)),
+    ("js", "jQuery (likely)", ("window.jQuery", "$(", "jQuery(")),
+    ("js", "React (likely)", ("React.createElement", "ReactDOM.render")),
+    ("js", "AngularJS (likely)", ("ng-app", "angular.module")),
+    ("js", "Vue.js (likely)", ("new Vue(",)),
+    ("analytics", "Google Analytics (Universal or GA4)", ("www.google-analytics.com/analytics.js", "gtag('config', 'UA-", "gtag('config', 'G-")),
+    ("analytics", "Google Tag Manager", ("googletagmanager.com/gtm.js",)),
+    ("analytics", "Facebook Pixel", ("connect.facebook.net/en_US/fbevents.js", "fbq('init'")),
+    ("analytics", "Matomo (Piwik)", ("matomo.js", "piwik.js", "_paq.push")),
+    ("analytics", "Hotjar", ("static.hotjar.com/c/hotjar-", "hj('event'")),
+    ("analytics", "HubSpot Analytics", ("js.hs-scripts.com/", "track HubSpot analytics")),
+)
+# Nomi delle sonde per categoria, nell'ordine di _CONTENT_PROBES: i risultati non dipendono dall'ordine di iterazione dei set
+_PROBE_NAMES: Dict[str, Tuple[str, ...]] = {
+    category: tuple(name for probe_category, name, _ in _CONTENT_PROBES if probe_category == category)
+    for category in ("framework", "js", "analytics")
+}
+# Sonda JS "(likely)" -> libreria che, se già confermata da un tag script, la rende superflua
+_JS_LIKELY_BASE: Dict[str, str] = {name: name.removesuffix(" (likely)") for name in _PROBE_NAMES["js"]}
+# Stesse sonde con i letterali in byte, per cercare direttamente nel corpo della risposta senza decodificarlo
+_CONTENT_PROBES_BYTES: Tuple[Tuple[str, str, Tuple[bytes, ...]], ...] = tuple(
+    (category, name, tuple(literal.encode() for literal in literals)) for category, name, literals in _CONTENT_PROBES
+)
+
+def _build_hyperscan_db():
+    '''
+    Funzione: _build_hyperscan_db
+    Compila tutte le sonde sul contenuto in un unico database Hyperscan in modalità block.
+    Parametri formali:
+        Nessuno
+    Valore di ritorno:
+        tuple -> (database, nomi per id) oppure (None, ()) se Hyperscan non è disponibile o la compilazione fallisce
+    '''
+    if not HYPERSCAN_AVAILABLE:
+        return None, ()
+    expressions, names = [], []
+    for _, name, literals in _CONTENT_PROBES:
+        for literal in literals:
+            expressions.append(re.escape(literal).encode())
+            names.append(name)
+    try:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=hyperscan.HS_FLAG_SINGLEMATCH, # basta il primo riscontro per ogni letterale
+        )
+    except hyperscan.error as e:
+        logging.getLogger(__name__).warning(f"Compilazione del database Hyperscan fallita, uso le ricerche Python: {e}")
+        return None, ()
+    return db, tuple(names)
+
+_HS_DB, _HS_NAMES = _build_hyperscan_db()
+_hs_local = threading.local() # lo scratch Hyperscan non può essere condiviso tra thread
+
+def _on_probe_hit(probe_id: int, start: int, end: int, flags: int, hits: Set[str]) -> None:
+    '''
+    Funzione: _on_probe_hit
+    Callback di Hyperscan: registra il nome della sonda riscontrata.
+    Parametri formali:
+        int probe_id -> Id dell'espressione riscontrata
+        int start, end, flags -> Offset e flag del riscontro (non usati)
+        Set[str] hits -> Insieme dei nomi riscontrati, passato come context
+    Valore di ritorno:
+        None -> La scansione prosegue
+    '''
+    hits.add(_HS_NAMES[probe_id])
+
+def _content_hits(html_content: str | bytes, category: str | None = None) -> Set[str]:
+    '''
+    Funzione: _content_hits
+    Applica le sonde di _CONTENT_PROBES al contenuto HTML: in un solo passaggio con Hyperscan se disponibile, altrimenti con ricerche letterali.
+    Parametri formali:
+        str | bytes html_content -> Contenuto HTML come stringa o come byte grezzi della risposta
+        str | None category -> Limita le ricerche letterali a una categoria ("framework", "js", "analytics"); None per tutte
+    Valore di ritorno:
+        Set[str] -> Nomi delle sonde riscontrate (con Hyperscan anche di altre categorie, il chiamante filtra)
+    '''
+    if _HS_DB is not None:
+        scratch = getattr(_hs_local, "scratch", None)
+        if scratch is None:
+            scratch = _hs_local.scratch = hyperscan.Scratch(_HS_DB)
+        data = html_content if isinstance(html_content, bytes) else html_content.encode("utf-8", "surrogatepass")
+        hits: Set[str] = set()
+        _HS_DB.scan(data, match_event_handler=_on_probe_hit, context=hits, scratch=scratch)
+        return hits
+
+    if isinstance(html_content, bytes):
+        # I letterali sono ASCII: si trovano nei byte così come nel testo decodificato
+        probes = _CONTENT_PROBES_BYTES
+    else:
+        probes = _CONTENT_PROBES
+    # Ogni letterale assente costa una scansione completa della pagina: si saltano le categorie non richieste
+    return {
+        name for probe_category, name, literals in probes
+        if (category is None or probe_category == category) and any(lit in html_content for lit in literals)
+    }
+
+@dataclass(slots=True)
+class PageSignals:
+    '''
+    Funzione: PageSignals
+    Raccoglie i segnali di una pagina estratti in un'unica visita dell'albero HTML e un'unica scansione del contenuto.
+    Attributi:
+        dataclass(slots=True) -> Struttura con __slots__, condivisa tra le funzioni detect_*
+
+    Parametri formali:
+        generator: str | None -> Contenuto del primo meta tag generator, None se assente o vuoto
+        meta_tags: Dict[str, str] -> Meta tag name/property (in minuscolo) -> content
+        script_srcs: List[str] -> Attributi src dei tag script
+        has_joomla_link: bool -> True se un tag link ha "joomla" nell'href
+        has_drupal_css: bool -> True se esiste un elemento con id "drupal-css"
+        content_hits: Set[str] -> Nomi delle sonde di _CONTENT_PROBES riscontrate nel contenuto
+
+    Valore di ritorno:
+        None -> Il costruttore non restituisce un valore esplicito
+    '''
+    generator: str | None = None
+    meta_tags: Dict[str, str] = field(default_factory=dict)
+    script_srcs: List[str] = field(default_factory=list)
+    has_joomla_link: bool = False
+    has_drupal_css: bool = False
+    content_hits: Set[str] = field(default_factory=set)
+
+def scan_page(soup: BeautifulSoup, html_content: str | bytes) -> PageSignals:
+    '''
+    Funzione: scan_page
+    Visita una sola volta i tag della pagina e applica le sonde letterali all'HTML, raccogliendo i segnali usati da detect_framework, detect_js_libraries e detect_technologies.
+    Parametri formali:
+        BeautifulSoup soup -> Oggetto BeautifulSoup del contenuto HTML
+        str | bytes html_content -> Contenuto HTML come stringa o byte
+    Valore di ritorno:
+        PageSignals -> I segnali estratti dalla pagina
+    '''
+    signals = PageSignals()
+    generator_seen = False
+
+    # descendants è un generatore: nessuna lista di tutti i tag viene materializzata
+    for tag in soup.descendants:
+        if not isinstance(tag, Tag):
+            continue # testo, commenti, doctype
+        name = tag.name
+        attrs = tag.attrs
+        if name == "meta":
+            meta_name = attrs.get("name")
+            content_meta = attrs.get("content")
+            if not generator_seen and meta_name and meta_name.lower() == "generator":
+                generator_seen = True # Conta solo il primo meta generator, come soup.find
+                signals.generator = content_meta or None
+            key = meta_name or attrs.get("property")
+            if key and content_meta:
+                signals.meta_tags[key.lower()] = content_meta
+        elif name == "script":
+            src = attrs.get("src")
+            if src is not None:
+                signals.script_srcs.append(src)
+        elif name == "link" and not signals.has_joomla_link:
+            href = attrs.get("href")
+            if href and "joomla" in href:
+                signals.has_joomla_link = True
+        if not signals.has_drupal_css and attrs.get("id") == "drupal-css":
+            signals.has_drupal_css = True
+
+    signals.content_hits = _content_hits(html_content)
+    return signals
 
 # Chiamato da Crawler per rilevare tecnologie usate dal sito
-def detect_framework(soup:BeautifulSoup, headers:dict, html_content:str, url:str) -> list | str:
+def detect_framework(soup:BeautifulSoup, headers:dict, html_content:str | bytes, url:str, signals: PageSignals | None = None) -> list | str:
     '''
     Funzione: detect_framework
     Rileva il framework web o il CMS utilizzato da un sito web.
     Parametri formali:
         soup -> Oggetto BeautifulSoup del contenuto HTML
         headers -> Dizionario degli header della risposta HTTP
-        html_content -> Contenuto HTML come stringa
+        html_content -> Contenuto HTML come stringa o byte
         url -> L'URL della pagina
+        signals -> Segnali già estratti con scan_page, calcolati qui se None
     Valore di ritorno:
         list | str -> Una lista di framework/CMS rilevati o la stringa "Unknown"
     '''
+    if signals is None:
+        signals = scan_page(soup, html_content)
     detected = []
 
-    generator_meta = soup.find("meta", attrs={"name": lambda x: x and x.lower() == "generator"})
-    if generator_meta and generator_meta.get("content"):
-        detected.append(generator_meta.get("content").strip())
+    generator = signals.generator.strip() if signals.generator else None
+    if generator:
+        detected.append(generator)
 
-    if "X-Powered-By" in headers:
-        detected.append(headers["X-Powered-By"].strip())
-    if "X-Generator" in headers:
-        detected.append(headers["X-Generator"].strip())
+    powered_by = headers.get("X-Powered-By")
+    if powered_by is not None:
+        detected.append(powered_by.strip())
+    header_generator = headers.get("X-Generator")
+    if header_generator is not None:
+        detected.append(header_generator.strip())
 
-    if "wp-content" in html_content or "wp-includes" in html_content:
-        detected.append("WordPress")
-    if soup.find(id="drupal-css"):
+    detected.extend(name for name in _PROBE_NAMES["framework"] if name in signals.content_hits)
+    if signals.has_drupal_css:
         detected.append("Drupal")
-    if any(tag.get("href") and "joomla" in tag.get("href") for tag in soup.find_all("link")):
+    if signals.has_joomla_link:
         detected.append("Joomla")
-    if "Powered by Shopify" in html_content:
-        detected.append("Shopify")
-    if "squarespace.com" in html_content:
-        detected.append("Squarespace")
-    if "wix.com" in html_content:
-        detected.append("Wix")
-
-    for script in soup.find_all("script", src=True):
-        src = script["src"]
+
+    for src in signals.script_srcs:
         if "wp-content" in src or "wp-includes" in src:
             detected.append("WordPress")
+            break # un solo riscontro basta
 
     if "/wp-admin" in url or "/wp-login" in url:
         detected.append("WordPress")
 
     if detected:
         # Preferisci il valore del meta tag generator se presente e rilevato
-        if generator_meta and generator_meta.get("content") in detected:
-            return generator_meta.get("content").strip()
-        return list(set(detected)) # Rimuovi duplicati
+        if generator:
+            return generator
+        return list(dict.fromkeys(detected)) # Rimuovi duplicati mantenendo l'ordine di rilevamento
     return "Unknown"
 
 # Chiamato da Crawler per rilevare librerie JS usate dal sito
-def detect_js_libraries(soup: BeautifulSoup, html_content: str) -> list:
+def detect_js_libraries(soup: BeautifulSoup, html_content: str | bytes, signals: PageSignals | None = None) -> list:
     '''
     Funzione: detect_js_libraries
     Rileva le librerie JavaScript comuni utilizzate in una pagina web.
     Parametri formali:
         soup -> Oggetto BeautifulSoup del contenuto HTML
-        html_content -> Contenuto HTML come stringa
+        html_content -> Contenuto HTML come stringa o byte
+        signals -> Segnali già estratti con scan_page, calcolati qui se None
     Valore di ritorno:
         list -> Una lista delle librerie JavaScript rilevate
     '''
+    if signals is None:
+        signals = scan_page(soup, html_content)
     libraries = set()
 
-    script_patterns = {
-        "jQuery": r"jquery(-[0-9\.]*(\.min)?\.js|\.js)",
-        "React": r"react(-dom)?(-[0-9\.]*(\.min)?\.js|\.js)",
-        "AngularJS": r"angular(-[0-9\.]*(\.min)?\.js|\.js)",
-        "Angular": r"main\.(?:[a-f0-9]+\.)?js",
-        "Vue.js": r"vue(-[0-9\.]*(\.min)?\.js|\.js)",
-        "Bootstrap JS": r"bootstrap(-[0-9\.]*(\.bundle|\.min)?\.js|\.js)",
-        "Lodash": r"lodash(-[0-9\.]*(\.min)?\.js|\.js)",
-        "Moment.js": r"moment(-[0-9\.]*(\.min)?\.js|\.js)",
-        "GSAP": r"gsap(-[0-9\.]*(\.min)?\.js|\.js)|TweenMax",
-        "D3.js": r"d3(-[0-9\.]*(\.min)?\.js|\.js)",
-    }
-
-    for script_tag in soup.find_all("script", src=True):
-        src = script_tag["src"]
-        for lib_name, pattern in script_patterns.items():
-            if re.search(pattern, src, re.IGNORECASE):
+    for src in signals.script_srcs:
+        candidates = {_JS_SCRIPT_NEEDLES[m.group(1)] for m in _JS_SCRIPT_NEEDLES_RE.finditer(src.lower())}
+        for lib_name in candidates - libraries:
+            if _JS_SCRIPT_PATTERNS[lib_name].search(src):
                 libraries.add(lib_name)
 
-    # Controlli basati sul contenuto HTML per maggiore robustezza
-    if re.search(r"window\.jQuery|\$\(|jQuery\(", html_content):
-        libraries.add("jQuery (likely)")
-
-    if "React.createElement" in html_content or "ReactDOM.render" in html_content:
-        libraries.add("React (likely)")
-    if "ng-app" in html_content or "angular.module" in html_content:
-        libraries.add("AngularJS (likely)")
-    if "new Vue(" in html_content:
-        libraries.add("Vue.js (likely)")
-
+    # Controlli basati sul contenuto HTML per maggiore robustezza, solo per le librerie non già confermate dagli script
+    for likely_name in _PROBE_NAMES["js"]:
+        if likely_name in signals.content_hits and _JS_LIKELY_BASE[likely_name] not in libraries:
+            libraries.add(likely_name)
 
-    return list(libraries) if libraries else []
+    return list(libraries)
 
 # Chiamato da Crawler per controllare header di sicurezza
 def check_security_headers(headers: dict) -> dict:
@@ -117,66 +335,161 @@ def check_security_headers(headers: dict) -> dict:
         dict -> Un dizionario contenente gli header di sicurezza trovati e i loro valori
     '''
     security_headers_found = {}
-    lower_headers = {k.lower(): v for k, v in headers.items()}
-
-    common_sec_headers = {
-        "Strict-Transport-Security": "HSTS",
-        "Content-Security-Policy": "CSP",
-        "X-Frame-Options": "X-Frame-Options", # Mantieni il nome completo per chiarezza
-        "X-Content-Type-Options": "X-Content-Type-Options", # Mantieni il nome completo
-        "Referrer-Policy": "Referrer-Policy",
-        "Permissions-Policy": "Permissions-Policy",
-        "X-XSS-Protection": "X-XSS-Protection", # Mantieni il nome completo
-    }
+    if isinstance(headers, CaseInsensitiveDict):
+        getter = headers.get # gli header di requests sono già case-insensitive
+    else:
+        getter = {k.lower(): v for k, v in headers.items()}.get
 
-    for header_name, display_name in common_sec_headers.items():
-        if header_name.lower() in lower_headers:
-            security_headers_found[display_name] = lower_headers[header_name.lower()]
+    for lookup_name, display_name in _SECURITY_HEADERS:
+        value = getter(lookup_name)
+        if value is not None:
+            security_headers_found[display_name] = value
 
     return security_headers_found
 
 # Chiamato da Crawler per rilevare servizi di analytics usati dal sito
-def detect_analytics(html_content: str) -> list:
+def detect_analytics(html_content: str | bytes, signals: PageSignals | None = None) -> list:
     '''
     Funzione: detect_analytics
     Rileva la presenza di script o pattern associati a servizi di analytics comuni nel contenuto HTML.
     Parametri formali:
-        str html_content -> Contenuto HTML della pagina come stringa
+        str | bytes html_content -> Contenuto HTML della pagina come stringa o byte
+        PageSignals | None signals -> Segnali già estratti con scan_page, se disponibili
     Valore di ritorno:
         list -> Una lista dei servizi di analytics rilevati
     '''
-    analytics_services = set()
+    content_hits = signals.content_hits if signals is not None else _content_hits(html_content, "analytics")
+    return [name for name in _PROBE_NAMES["analytics"] if name in content_hits]
 
-    if re.search(
-        r"www\.google-analytics\.com/analytics\.js|gtag\('config', 'UA-|gtag\('config', 'G-", html_content
-    ):
-        analytics_services.add("Google Analytics (Universal or GA4)")
 
-    if "googletagmanager.com/gtm.js" in html_content:
-        analytics_services.add("Google Tag Manager")
+# === FUNZIONE CONSOLIDATA PER IL RILEVAMENTO TECNOLOGIE ===
 
-    if "connect.facebook.net/en_US/fbevents.js" in html_content or "fbq('init'" in html_content:
-        analytics_services.add("Facebook Pixel")
+def _declared_charset(response: requests.Response) -> str | None:
+    '''
+    Funzione: _declared_charset
+    Restituisce il charset dichiarato nel Content-Type, così BeautifulSoup decodifica i byte senza indovinare.
+    Parametri formali:
+        requests.Response response -> La risposta HTTP
+    Valore di ritorno:
+        str | None -> Il charset dichiarato, None se assente (BeautifulSoup lo rileva dai meta tag o dai byte)
+    '''
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return None
 
-    if "matomo.js" in html_content or "piwik.js" in html_content or "_paq.push" in html_content:
-        analytics_services.add("Matomo (Piwik)")
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
 
-    if "static.hotjar.com/c/hotjar-" in html_content or "hj('event'" in html_content:
-        analytics_services.add("Hotjar")
 
-    if "js.hs-scripts.com/" in html_content or "track HubSpot analytics" in html_content:
-        analytics_services.add("HubSpot Analytics")
+def _tech_session() -> requests.Session:
+    '''
+    Funzione: _tech_session
+    Crea la sessione condivisa per il rilevamento tecnologie: le connessioni TCP/TLS restano aperte tra
+    un'analisi e l'altra dello stesso dominio (o di suoi sottodomini sullo stesso host).
+    Valore di ritorno:
+        requests.Session -> La sessione configurata
+    '''
+    session = requests.Session()
+    session.headers.update(_HEADERS)
+    # Pool dimensionato sui thread del pool condiviso dei lookup, da cui detect_technologies può essere lanciata (submit_lookup)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-    return list(analytics_services)
 
+_SESSION = _tech_session()
 
-# === FUNZIONE CONSOLIDATA PER IL RILEVAMENTO TECNOLOGIE ===
+TECH_CACHE_TTL = 3600 # Validità in secondi dei risultati tenuti in memoria per dominio
+TECH_CACHE_MAXSIZE = 1024 # numero massimo di domini in cache (LRU)
+_tech_cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+_tech_cache_lock = threading.Lock()
 
 # Chiamato da Crawler per rilevare tecnologie usate dal sito
 def detect_technologies(domain: str, logger: logging.Logger) -> Dict[str, Any]:
     '''
     Funzione: detect_technologies
     Rileva le tecnologie utilizzate da un sito web (framework, JS libs, server, headers, analytics).
+    I risultati validi restano in memoria per TECH_CACHE_TTL secondi, così le analisi ripetute dello stesso dominio non rifanno richiesta e parsing.
+
+    Parametri formali:
+        str domain -> Il dominio del sito per cui rilevare le tecnologie
+        logging.Logger logger -> L'istanza del logger da utilizzare per i messaggi
+
+    Valore di ritorno:
+        dict -> Un dizionario contenente le tecnologie rilevate o un errore
+    '''
+    with _tech_cache_lock:
+        entry = _tech_cache.get(domain)
+        if entry is not None and time.time() - entry[0] < TECH_CACHE_TTL:
+            _tech_cache.move_to_end(domain)
+        else:
+            entry = None
+    if entry is not None:
+        logger.debug(f"Technology cache hit for {domain}")
+        return copy.deepcopy(entry[1]) # copia: il chiamante può modificare il risultato
+
+    tech_data = _lookup_technologies(domain, logger)
+    if "error" not in tech_data:
+        with _tech_cache_lock:
+            _tech_cache[domain] = (time.time(), copy.deepcopy(tech_data))
+            _tech_cache.move_to_end(domain)
+            if len(_tech_cache) > TECH_CACHE_MAXSIZE:
+                _tech_cache.popitem(last=False)
+    return tech_data
+
+def _populate_tech_data(response: requests.Response, tech_data: Dict[str, Any]) -> None:
+    '''
+    Funzione: _populate_tech_data
+    Analizza una risposta HTTP (headers e contenuto) e aggiunge a tech_data le tecnologie rilevate.
+    Parametri formali:
+        requests.Response response -> La risposta HTTP della pagina principale del dominio
+        Dict[str, Any] tech_data -> Il dizionario dei risultati da completare
+    Valore di ritorno:
+        None -> Il dizionario viene modificato sul posto
+    '''
+    final_url = response.url
+    content = response.content # Byte grezzi: le sonde letterali non richiedono la decodifica di response.text
+
+    soup = BeautifulSoup(content, HTML_PARSER, from_encoding=_declared_charset(response))
+    signals = scan_page(soup, content) # Un'unica visita della pagina condivisa dai rilevatori
+
+    # Estrazione Meta Tags
+    if signals.meta_tags:
+        tech_data["meta_tags"] = signals.meta_tags
+
+    # Server Header
+    server = response.headers.get("Server")
+    if server is not None:
+        tech_data["web_server"] = server
+
+    # Rilevamento Framework/CMS (chiama la funzione locale)
+    frameworks = detect_framework(soup, response.headers, content, final_url, signals)
+    if frameworks and frameworks != "Unknown": # Controlla sia per lista non vuota che per "Unknown"
+        tech_data["framework_cms"] = frameworks
+
+    # Rilevamento JS Libraries (chiama la funzione locale)
+    js_libs = detect_js_libraries(soup, content, signals)
+    if js_libs:
+        tech_data["js_libraries"] = js_libs
+
+    # Controllo Security Headers (chiama la funzione locale)
+    security_headers = check_security_headers(response.headers)
+    if security_headers:
+        tech_data["security_headers"] = security_headers
+
+    # Rilevamento Analytics (chiama la funzione locale)
+    analytics = detect_analytics(content, signals)
+    if analytics:
+        tech_data["analytics"] = analytics
+
+def _lookup_technologies(domain: str, logger: logging.Logger) -> Dict[str, Any]:
+    '''
+    Funzione: _lookup_technologies
+    Esegue la richiesta HTTP e il rilevamento vero e proprio (senza cache) per detect_technologies.
 
     Questa funzione effettua la richiesta HTTP, analizza la risposta (headers, contenuto)
     e chiama le funzioni di rilevamento specifiche (framework, js, analytics, security headers).
@@ -193,58 +506,16 @@ def detect_technologies(domain: str, logger: logging.Logger) -> Dict[str, Any]:
 
     try:
         url = f"https://{domain}"
-        # Utilizza requests.get direttamente qui per fare la richiesta
+        # Richiesta tramite la sessione condivisa del modulo
         response = _safe_get(
             url,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-            },
             timeout=10,
             verify=True,
             allow_redirects=True,
+            session=_SESSION, # connessioni riusate e header del browser impostati sulla sessione
         )
         response.raise_for_status() # Solleva un'eccezione per status codes 4xx/5xx
-
-        final_url = response.url
-        content = response.text # Ottieni il contenuto testuale
-
-        soup = BeautifulSoup(content, "html.parser")
-
-        # Estrazione Meta Tags
-        meta_tags = {}
-        for meta in soup.find_all("meta"):
-            name = meta.get("name") or meta.get("property")
-            content_meta = meta.get("content") # Rinominato per evitare conflitto
-            if name and content_meta:
-                meta_tags[name.lower()] = content_meta
-        if meta_tags:
-            tech_data["meta_tags"] = meta_tags
-
-        # Server Header
-        if "Server" in response.headers:
-            tech_data["web_server"] = response.headers["Server"]
-
-        # Rilevamento Framework/CMS (chiama la funzione locale)
-        frameworks = detect_framework(soup, response.headers, content, final_url)
-        if frameworks and frameworks != "Unknown": # Controlla sia per lista non vuota che per "Unknown"
-             tech_data["framework_cms"] = frameworks
-
-        # Rilevamento JS Libraries (chiama la funzione locale)
-        js_libs = detect_js_libraries(soup, content)
-        if js_libs:
-            tech_data["js_libraries"] = js_libs
-
-        # Controllo Security Headers (chiama la funzione locale)
-        security_headers = check_security_headers(response.headers)
-        if security_headers:
-            tech_data["security_headers"] = security_headers
-
-        # Rilevamento Analytics (chiama la funzione locale)
-        analytics = detect_analytics(content)
-        if analytics:
-            tech_data["analytics"] = analytics
+        _populate_tech_data(response, tech_data)
 
         #logger.info(f"Technology detection successful for {domain}.")
 
@@ -254,44 +525,14 @@ def detect_technologies(domain: str, logger: logging.Logger) -> Dict[str, Any]:
             url_http = f"http://{domain}"
             # Riprova con HTTP se HTTPS fallisce per errore SSL
             response_http = _safe_get(
-                url_http, headers=response.headers if 'response' in locals() else {}, # Usa header originali se disponibili
-                timeout=10, allow_redirects=True, verify=False # verify=False per ignorare errori SSL nel fallback
+                url_http,
+                timeout=10, allow_redirects=True, verify=False, # verify=False per ignorare errori SSL nel fallback
+                session=_SESSION,
             )
             response_http.raise_for_status()
 
             # Ripeti l'analisi con la risposta HTTP
-            final_url = response_http.url
-            content = response_http.text
-            soup = BeautifulSoup(content, "html.parser")
-
-            meta_tags = {}
-            for meta in soup.find_all("meta"):
-                name = meta.get("name") or meta.get("property")
-                content_meta = meta.get("content") # Rinominato per evitare conflitto
-                if name and content_meta:
-                    meta_tags[name.lower()] = content_meta
-            if meta_tags:
-                tech_data["meta_tags"] = meta_tags
-
-            if "Server" in response_http.headers:
-                tech_data["web_server"] = response_http.headers["Server"]
-
-            frameworks = detect_framework(soup, response_http.headers, content, final_url)
-            if frameworks and frameworks != "Unknown":
-                 tech_data["framework_cms"] = frameworks
-
-            js_libs = detect_js_libraries(soup, content)
-            if js_libs:
-                tech_data["js_libraries"] = js_libs
-
-            security_headers = check_security_headers(response_http.headers)
-            if security_headers:
-                tech_data["security_headers"] = security_headers
-
-            analytics = detect_analytics(content)
-            if analytics:
-                tech_data["analytics"] = analytics
-
+            _populate_tech_data(response_http, tech_data)
             tech_data["note"] = "Analysis performed via HTTP fallback due to SSL error on HTTPS."
             logger.info(f"Technology detection successful via HTTP fallback for {domain}.")
 
@@ -0,0 +1,96 @@
+# Test degli estrattori di contatti: il pre-filtro dei candidati non deve perdere numeri rispetto alla scansione completa.
+
+import os
+import sys
+
+import phonenumbers
+import pytest
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.scraper.utils.extractors import extract_contacts, extract_phone_numbers, filter_phone_numbers, region_for_domain
+
+PHONE_SAMPLES = [
+    "Tel: 06/1234567",
+    "Call 030/2345678\nFax 030/2345679",
+    "Chiamaci al (06) 1234 5678 oppure scrivici",
+    "Phone: +39 06 1234 5678",
+    "tel. 02.12345678",
+    "+44 (0)20 7946 0958",
+    "Telefono 333 1234567 - Fax 06 98765432",
+    "Ufficio: 0039-06-12345678",
+    "(555) 123-4567",
+    "+1 (555) 123-4567 ext. 89",
+    "orari 9-18\n06 1234567",
+    "Tel.: +49 (0) 30 123456-0",
+    "0612345678\n0698765432",
+    "Numero verde 800 123 456",
+    "+33 1 23 45 67 89",
+    "06\t1234567",
+    "Tel: +39\u00a006\u00a01234\u00a05678",
+    "+39 06\u20131234\u20135678",
+    "call +1 (415) 555\u20112671",
+    "Fax 06\u22121234\u22125678",
+    "Tel\u00a0(06)\u00a01234\u20145678\nFax 06\u00a098765432",
+]
+
+
+def full_text_phones(text, region):
+    """Comportamento precedente: PhoneNumberMatcher sull'intero testo, senza pre-filtro."""
+    found = set()
+    for match in phonenumbers.PhoneNumberMatcher(text, region, leniency=phonenumbers.Leniency.POSSIBLE):
+        found.add(phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164))
+    return filter_phone_numbers(found)
+
+
+@pytest.mark.parametrize("region", ["IT", "DE", "US", "GB"])
+@pytest.mark.parametrize("text", PHONE_SAMPLES)
+def test_phone_recall_matches_full_text_scan(text, region):
+    """I candidati di _CONTACT_RE devono dare gli stessi numeri della scansione completa."""
+    expected = full_text_phones(text, region)
+    _, phones = extract_contacts(text, region)
+    assert filter_phone_numbers(phones) == expected
+    assert filter_phone_numbers(extract_phone_numbers(text, region)) == expected
+
+
+def test_slash_separated_number_is_kept_whole():
+    """Il formato "06/1234567" non deve essere spezzato in un numero più corto."""
+    _, phones = extract_contacts("Tel: 06/1234567", "IT")
+    assert phones == {"+39061234567"}
+
+
+def test_candidates_do_not_span_lines():
+    """Numeri su righe adiacenti restano candidati distinti."""
+    _, phones = extract_contacts("Tel 06 1234567\n02 7654321", "IT")
+    assert phones == {"+39061234567", "+39027654321"}
+
+
+@pytest.mark.parametrize("domain,region", [
+    ("esempio.it", "IT"),
+    ("example.co.uk", "GB"),
+    ("example.com", None),
+    ("example.io", None),
+    ("example.co", None),
+    ("www.example.tv:8080", None),
+])
+def test_region_for_domain(domain, region):
+    """Solo i ccTLD realmente nazionali danno una regione: i ccTLD di fantasia usano il default."""
+    assert region_for_domain(domain) == region
+
+
+def test_vanity_tld_does_not_assign_country_code():
+    """Un numero nazionale su un sito .io non deve ricevere il prefisso +246."""
+    _, phones = extract_contacts("Tel 06 1234567", region_for_domain("example.io"))
+    assert not any(phone.startswith("+246") for phone in phones)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Contatti:\u00a0+39\u00a006\u00a01234\u00a05678", {"+390612345678"}),
+    ("Tel. 06\u20131234\u20135678", {"+390612345678"}),
+    ("+1 (415) 555\u20112671", {"+14155552671"}),
+])
+def test_prefilter_keeps_pages_with_unicode_separators(text, expected):
+    """Una pagina i cui unici numeri usano NBSP o trattini Unicode non deve essere scartata dal pre-filtro."""
+    assert extract_phone_numbers(text, "IT") == expected
@@ -0,0 +1,78 @@
+# Test del WebFetcher: gestione dei redirect e della cache su disco, senza accesso alla rete.
+
+import os
+import sys
+
+import pytest
+import requests
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.scraper import fetcher as fetcher_module
+from src.scraper.async_fetcher import AsyncWebFetcher
+from src.scraper.fetcher import MAX_REDIRECTS, WebFetcher
+
+
+class RedirectResponse:
+    """Risposta finta che redirige sempre verso lo stesso URL."""
+
+    def __init__(self, url):
+        self.url = url
+        self.status_code = 302
+        self.is_redirect = True
+        self.ok = False
+        self.headers = requests.structures.CaseInsensitiveDict({"Location": url})
+        self.body_read = False
+
+    def iter_content(self, chunk_size):
+        self.body_read = True
+        yield b"<html>redirect</html>"
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def web_fetcher(tmp_path):
+    """Fixture per creare un WebFetcher con cache temporanea e senza attese di politeness."""
+    instance = WebFetcher(cache_dir=str(tmp_path), delay_range=(0.0, 0.0))
+    yield instance
+    instance.close()
+
+
+def test_redirect_loop_fails_without_caching(web_fetcher, monkeypatch):
+    """Un redirect verso sé stesso deve fallire dopo MAX_REDIRECTS senza salvare il body del 3xx."""
+    url = "http://example.com/loop"
+    responses = []
+
+    def fake_get(request_url, **kwargs):
+        response = RedirectResponse(request_url)
+        responses.append(response)
+        return response
+
+    monkeypatch.setattr(fetcher_module, "_safe_get", fake_get)
+
+    # force_download evita che la catena salvata in cache interrompa il ciclo prima del limite
+    assert web_fetcher.fetch_full_response(url, force_download=True) is None
+
+    assert len(responses) == MAX_REDIRECTS + 1
+    assert not any(response.body_read for response in responses)
+    cache_path = web_fetcher._get_cache_path(url)
+    assert not cache_path.exists(), "Il body del redirect non deve finire in cache."
+    assert not cache_path.with_suffix(".part").exists()
+    assert url in web_fetcher._failed
+
+
+def test_async_fetcher_closes_only_its_own_fetcher(web_fetcher, tmp_path, monkeypatch):
+    """AsyncWebFetcher non deve chiudere un WebFetcher ricevuto dal chiamante."""
+    closed = []
+    monkeypatch.setattr(web_fetcher, "close", lambda: closed.append("passed"))
+    AsyncWebFetcher(fetcher=web_fetcher).close()
+    assert closed == []
+
+    owned = AsyncWebFetcher(cache_dir=str(tmp_path / "owned"))
+    monkeypatch.setattr(owned.fetcher, "close", lambda: closed.append("owned"))
+    owned.close()
+    assert closed == ["owned"]
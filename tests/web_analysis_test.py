@@ -0,0 +1,49 @@
+# Test dei rilevatori di tecnologie: i risultati devono avere un ordine deterministico.
+
+import os
+import sys
+
+import pytest
+from bs4 import BeautifulSoup
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.scraper.utils import web_analysis
+from src.scraper.utils.web_analysis import detect_analytics, detect_framework
+
+PAGE = """
+<html><head>
+<script src="/wp-content/themes/site/main.js"></script>
+<script src="https://www.googletagmanager.com/gtm.js?id=GTM-1"></script>
+</head><body>
+<p>Powered by Shopify</p>
+<a href="https://www.wix.com/">wix.com</a>
+<a href="https://www.squarespace.com/">squarespace.com</a>
+<script>_paq.push(['trackPageView']); fbq('init', '1');</script>
+</body></html>
+"""
+
+
+@pytest.fixture(params=["hyperscan", "literal"])
+def probe_engine(request, monkeypatch):
+    """Fixture che esegue ogni test sia con Hyperscan (se installato) sia con le ricerche letterali."""
+    if request.param == "literal":
+        monkeypatch.setattr(web_analysis, "_HS_DB", None)
+    elif web_analysis._HS_DB is None:
+        pytest.skip("Hyperscan non disponibile")
+    return request.param
+
+
+def test_detect_framework_order_is_deterministic(probe_engine):
+    """Header prima, poi le sonde nell'ordine di _CONTENT_PROBES, senza duplicati."""
+    soup = BeautifulSoup(PAGE, "html.parser")
+    headers = {"X-Powered-By": "PHP/8.2"}
+    result = detect_framework(soup, headers, PAGE, "https://example.com/")
+    assert result == ["PHP/8.2", "WordPress", "Shopify", "Squarespace", "Wix"]
+
+
+def test_detect_analytics_order_is_deterministic(probe_engine):
+    """I servizi di analytics seguono l'ordine delle sonde."""
+    assert detect_analytics(PAGE) == ["Google Tag Manager", "Facebook Pixel", "Matomo (Piwik)"]